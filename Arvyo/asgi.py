@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Arvyo.settings')
 
 application = get_asgi_application()
+
+# Arquivos estáticos (pré-comprimidos, com cache imutável) respondidos antes do Django
+from ArvyoApp.staticserve import StaticFilesASGI  # noqa: E402
+
+application = StaticFilesASGI(application)
@@ -31,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista: mede consultas e tempos de toda a requisição (ver ArvyoApp/instrumentation.py)
+    'ArvyoApp.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -44,10 +46,17 @@ ROOT_URLCONF = 'Arvyo.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [os.path.join(BASE_DIR, 'ArvyohApp', 'resource', 'views')],
-        'APP_DIRS': True,
+        # DjangoTemplates que também mede o tempo de renderização de cada requisição
+        'BACKEND': 'ArvyoApp.instrumentation.InstrumentedDjangoTemplates',
+        # Só os templates dos apps. O carregador com cache compila cada template uma vez por
+        # processo (o runserver limpa esse cache quando um arquivo de template muda)
+        'DIRS': [],
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -64,14 +73,96 @@ WSGI_APPLICATION = 'Arvyo.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Conexões persistentes (CONN_MAX_AGE, em segundos) com verificação antes de reaproveitar.
+# Em transações `atomic()` o SQLite pega a trava de escrita já no BEGIN (IMMEDIATE):
+# quem chega depois espera até `timeout` segundos em vez de falhar com "database is locked".
+# A "réplica" é o mesmo arquivo aberto só para leitura, usada pelas views de leitura
+# pesada (ver ArvyoApp/database.py).
+
+SQLITE_PATH = Path(os.getenv('DJANGO_SQLITE_PATH', BASE_DIR / 'db.sqlite3'))
+CONN_MAX_AGE = int(os.getenv('DJANGO_CONN_MAX_AGE', '600'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': SQLITE_PATH,
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{SQLITE_PATH}?mode=ro',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['ArvyoApp.database.ReadReplicaRouter']
+
+# Aplicados a cada conexão nova (ArvyoApp/database.py). Em WAL leitores e escritor não se
+# bloqueiam, e synchronous=NORMAL só sincroniza o disco nos checkpoints. mmap_size e
+# cache_size (negativo = KiB, por conexão) mantêm as páginas quentes em memória.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32000,
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Em um único nó o locmem (por processo) ou o file-based (compartilhado entre os
+# workers) bastam; as entradas por usuário são invalidadas por versão (ver ArvyoApp/caching.py).
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'arvyo'),
     }
 }
 
 
+# Logging
+# https://docs.djangoproject.com/en/5.1/topics/logging/
+# Uma linha JSON por requisição no logger "ArvyoApp.requests" (INFO); consultas
+# repetidas (N+1) saem como WARNING. DJANGO_REQUEST_LOG_LEVEL=WARNING deixa só estas.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'ArvyoApp.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('DJANGO_REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+
+# Authentication
+# Login por email ou username, com limite de tentativas (ArvyoApp/backends.py)
+
+AUTHENTICATION_BACKENDS = ['ArvyoApp.backends.EmailOrUsernameBackend']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -108,14 +199,24 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Destino do `collectstatic`. Os arquivos ganham o hash do conteúdo no nome e variantes
+# .gz/.br (ArvyoApp/storage.py); em produção são servidos por ArvyoApp/staticserve.py,
+# ligado em Arvyo/wsgi.py e Arvyo/asgi.py, com cache longo e imutável.
+STATIC_ROOT = os.getenv('DJANGO_STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'ArvyoApp.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-STATICFILES_DIRS = [
-    BASE_DIR,"ArvyoApp"
-]
-
 # O URL para o seu login. O Django irá redirecionar para cá quando um login for necessário.
 LOGIN_URL = 'signin'
\ No newline at end of file
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Arvyo.settings')
 
 application = get_wsgi_application()
+
+# Arquivos estáticos (pré-comprimidos, com cache imutável) respondidos antes do Django
+from ArvyoApp.staticserve import StaticFilesWSGI  # noqa: E402
+
+application = StaticFilesWSGI(application)
@@ -1,9 +1,164 @@
+from django import forms
 from django.contrib import admin
-from .models import Account, Transaction, Category, Budget, Goal
-
-# Registra os modelos para que apareçam no painel de administração
-admin.site.register(Account)
-admin.site.register(Transaction)
-admin.site.register(Category)
-admin.site.register(Budget)
-admin.site.register(Goal)
\ No newline at end of file
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db import connections
+from django.template.response import TemplateResponse
+
+from .categorization import recategorize
+from .ledger import mark_paid
+from .models import (
+    Account, Budget, Card, CardStatement, Category, CategoryRule, Goal, RecurringRule, Transaction,
+)
+from .pagination import EstimatedCountPaginator
+from .search import description_match, search_terms
+
+# Os modelos do painel de administração. As tabelas crescem com o número de usuários,
+# então as listas não contam a tabela inteira, trazem as chaves estrangeiras exibidas na
+# mesma consulta e usam campos de id (ou autocomplete) em vez de listas com todas as opções.
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Sem o segundo COUNT(*) da tabela inteira ("N de M resultados") nas buscas e filtros
+    show_full_result_count = False
+
+
+@admin.register(Account)
+class AccountAdmin(LargeTableAdmin):
+    list_display = ('name', 'bank_name', 'user', 'balance', 'is_active')
+    list_select_related = ('user',)
+    list_filter = ('is_active',)
+    search_fields = ('name', 'bank_name')
+    raw_id_fields = ('user',)
+
+
+@admin.register(Card)
+class CardAdmin(LargeTableAdmin):
+    list_display = ('card_name', 'brand', 'card_number_masked', 'user', 'limit', 'closing_day', 'due_day')
+    list_select_related = ('user',)
+    search_fields = ('card_name', 'name_on_card')
+    raw_id_fields = ('user',)
+
+
+@admin.register(CardStatement)
+class CardStatementAdmin(LargeTableAdmin):
+    list_display = ('card', 'closing_date', 'due_date', 'purchases', 'credits', 'is_paid')
+    list_select_related = ('card__user',)
+    list_filter = ('is_paid',)
+    raw_id_fields = ('card',)
+    # Totais mantidos pelos sinais de `Transaction` (ver `statements.py`)
+    readonly_fields = ('purchases', 'credits', 'count')
+
+
+@admin.register(Category)
+class CategoryAdmin(LargeTableAdmin):
+    list_display = ('name', 'user', 'icon_class', 'color_class')
+    list_select_related = ('user',)
+    ordering = ('name', 'pk')
+    # Também é a busca do autocomplete de categoria nos outros modelos
+    search_fields = ('name',)
+    raw_id_fields = ('user',)
+
+    def get_queryset(self, request):
+        # O nome de uma categoria pessoal inclui o usuário, inclusive no autocomplete
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(CategoryRule)
+class CategoryRuleAdmin(LargeTableAdmin):
+    list_display = ('pattern', 'category', 'user', 'priority', 'is_active')
+    list_select_related = ('category__user', 'user')
+    list_filter = ('is_active',)
+    search_fields = ('pattern',)
+    raw_id_fields = ('user',)
+    autocomplete_fields = ('category',)
+
+
+@admin.register(Budget)
+class BudgetAdmin(LargeTableAdmin):
+    list_display = ('category', 'user', 'amount', 'start_date', 'end_date', 'is_active')
+    list_select_related = ('category__user', 'user')
+    list_filter = ('is_active',)
+    raw_id_fields = ('user',)
+    autocomplete_fields = ('category',)
+
+
+@admin.register(Goal)
+class GoalAdmin(LargeTableAdmin):
+    list_display = ('name', 'user', 'current_amount', 'target_amount', 'due_date', 'is_completed')
+    list_select_related = ('user',)
+    list_filter = ('is_completed',)
+    search_fields = ('name',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(RecurringRule)
+class RecurringRuleAdmin(LargeTableAdmin):
+    list_display = ('description', 'user', 'amount', 'transaction_type', 'frequency', 'interval', 'start_date', 'is_active')
+    list_select_related = ('user',)
+    list_filter = ('is_active', 'frequency', 'transaction_type')
+    search_fields = ('description',)
+    raw_id_fields = ('user', 'account', 'card')
+    autocomplete_fields = ('category',)
+
+
+class RecategorizeForm(forms.Form):
+    def __init__(self, *args, admin_site, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Autocomplete em vez de um <select> com todas as categorias
+        self.fields['category'] = forms.ModelChoiceField(
+            queryset=Category.objects.all(),
+            widget=AutocompleteSelect(Transaction._meta.get_field('category'), admin_site),
+            label="Nova categoria",
+        )
+
+
+@admin.register(Transaction)
+class TransactionAdmin(LargeTableAdmin):
+    list_display = ('date', 'description', 'amount', 'transaction_type', 'category', 'user', 'account', 'card', 'is_paid')
+    # Os __str__ de conta, cartão e categoria exibem o usuário: tudo vem num único SELECT
+    list_select_related = ('user', 'account__user', 'card__user', 'category__user')
+    # Percorre o índice de `date` de trás para frente, sem ordenar a tabela
+    ordering = ('-date', '-id')
+    date_hierarchy = 'date'
+    list_filter = ('transaction_type', 'is_future_payment', 'is_paid')
+    search_fields = ('description',)
+    raw_id_fields = ('user', 'account', 'card')
+    autocomplete_fields = ('category',)
+    actions = ('recategorize_selected', 'mark_selected_paid')
+
+    def get_search_results(self, request, queryset, search_term):
+        # No SQLite a busca usa o índice FTS5 das descrições (ver `search.py`) em vez de
+        # um LIKE sobre a tabela inteira
+        terms = search_terms(search_term)
+        if not terms or connections[queryset.db].vendor != 'sqlite':
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(search__document__match=description_match(terms)), False
+
+    @admin.action(description="Recategorizar as transações selecionadas", permissions=['change'])
+    def recategorize_selected(self, request, queryset):
+        form = RecategorizeForm(request.POST if 'apply' in request.POST else None, admin_site=self.admin_site)
+        if form.is_valid():
+            category = form.cleaned_data['category']
+            changed = recategorize(queryset, category)
+            self.message_user(request, f"{changed} transação(ões) movida(s) para {category}.")
+            return None
+
+        # Página intermediária para escolher a categoria; reenvia a mesma seleção
+        context = {
+            **self.admin_site.each_context(request),
+            'title': "Recategorizar transações",
+            'opts': self.model._meta,
+            'form': form,
+            'media': self.media + form.media,
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/ArvyoApp/transaction/recategorize.html', context)
+
+    @admin.action(description="Marcar as transações selecionadas como pagas", permissions=['change'])
+    def mark_selected_paid(self, request, queryset):
+        paid = mark_paid(queryset)
+        self.message_user(request, f"{paid} pagamento(s) futuro(s) marcado(s) como pago(s).")
@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .ledger import SETTLED, SIGNED_AMOUNT, ZERO, balances_at, month_end
+from .models import Account, MonthlySummary, Transaction
+from .summaries import month_of
+
+# Quantidade padrão de períodos devolvidos pelas séries
+DEFAULT_MONTHS = 12
+DEFAULT_WEEKS = 18
+
+TRANSACTION_TYPES = ('income', 'expense')
+
+
+def _money(value):
+    # Números simples no JSON; os gráficos não precisam da precisão do Decimal
+    return float(value or ZERO)
+
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def month_range(end, months=DEFAULT_MONTHS):
+    """Primeiros dias dos `months` meses terminados no mês de `end`."""
+    last = month_of(end)
+    return [add_months(last, offset) for offset in range(1 - months, 1)]
+
+
+def week_range(end, weeks=DEFAULT_WEEKS):
+    """Segundas-feiras das `weeks` semanas terminadas na semana de `end`."""
+    last = end - timedelta(days=end.weekday())
+    return [last - timedelta(weeks=offset) for offset in range(weeks - 1, -1, -1)]
+
+
+def monthly_cashflow(user, end, months=DEFAULT_MONTHS):
+    """
+    Receitas e despesas por mês, lidas dos resumos mensais: uma linha por
+    carteira e mês, independente de quantas transações o histórico tem.
+    """
+    periods = month_range(end, months)
+    rows = (
+        MonthlySummary.objects.filter(user=user, month__range=(periods[0], periods[-1]))
+        .values('month')
+        .annotate(income=Sum('income'), expense=Sum('expense'))
+        .order_by()
+    )
+    by_month = {row['month']: row for row in rows}
+    return {
+        'period': 'month',
+        'labels': [period.isoformat() for period in periods],
+        'income': [_money(by_month.get(period, {}).get('income')) for period in periods],
+        'expense': [_money(by_month.get(period, {}).get('expense')) for period in periods],
+    }
+
+
+def weekly_cashflow(user, end, weeks=DEFAULT_WEEKS):
+    """Receitas e despesas por semana, agrupadas pelo banco com TruncWeek."""
+    periods = week_range(end, weeks)
+    rows = (
+        Transaction.objects.for_user(user)
+        .between(start=periods[0], end=periods[-1] + timedelta(days=6))
+        .order_by()
+        .annotate(week=TruncWeek('date'))
+        .values('week')
+        .annotate(
+            income=Sum('amount', filter=Q(transaction_type='income')),
+            expense=Sum('amount', filter=Q(transaction_type='expense')),
+        )
+    )
+    by_week = {row['week']: row for row in rows}
+    return {
+        'period': 'week',
+        'labels': [period.isoformat() for period in periods],
+        'income': [_money(by_week.get(period, {}).get('income')) for period in periods],
+        'expense': [_money(by_week.get(period, {}).get('expense')) for period in periods],
+    }
+
+
+def category_breakdown(user, transaction_type, start=None, end=None):
+    """Total por categoria no período, do maior para o menor, somado pelo banco."""
+    rows = (
+        Transaction.objects.of_type(user, transaction_type)
+        .without_archived(user)
+        .between(start=start, end=end)
+        .order_by()
+        .values('category_id', 'category__name', 'category__color_class')
+        .annotate(total=Sum('amount'))
+        .order_by('-total')
+    )
+    labels, colors, totals = [], [], []
+    for row in rows:
+        labels.append(row['category__name'] or 'Sem categoria')
+        colors.append(row['category__color_class'] or '')
+        totals.append(_money(row['total']))
+    grand_total = sum(totals)
+    return {
+        'type': transaction_type,
+        'labels': labels,
+        'colors': colors,
+        'totals': totals,
+        'share': [round(total * 100 / grand_total, 1) if grand_total else 0 for total in totals],
+    }
+
+
+def balance_history(user, end, months=DEFAULT_MONTHS):
+    """
+    Saldo total ao final de cada mês e saldo atual por conta.
+
+    O saldo no início da série vem de `balances_at` (a partir dos checkpoints);
+    os meses seguintes somam o movimento mensal de cada conta, agrupado pelo banco.
+    São três consultas, independente do número de contas.
+    """
+    periods = month_range(end, months)
+    start = periods[0] - timedelta(days=1)
+    opening = balances_at(Account.objects.filter(user=user, is_active=True).order_by('name'), start)
+    accounts = list(opening)
+
+    monthly = (
+        Transaction.objects.filter(account__in=accounts, date__gt=start, date__lte=month_end(periods[-1]))
+        .filter(SETTLED)
+        .order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(total=Sum(SIGNED_AMOUNT))
+    )
+    movement = {row['month']: row['total'] for row in monthly}
+
+    running = sum(opening.values(), ZERO)
+    totals = []
+    for period in periods:
+        running += movement.get(period, ZERO)
+        totals.append(_money(running))
+
+    return {
+        'labels': [period.isoformat() for period in periods],
+        'total': totals,
+        'accounts': {
+            'labels': [account.name for account in accounts],
+            'balances': [_money(account.balance) for account in accounts],
+        },
+    }
@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+
+
+class ArvyoAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'ArvyoApp'
+
+    def ready(self):
+        # Registra os sinais que mantêm os dados derivados (resumos mensais) em dia
+        from . import signals  # noqa: F401
+
+        # Toda conexão nova mede as consultas da requisição em andamento (ver instrumentation.py)
+        from django.db.backends.signals import connection_created
+        from .instrumentation import install_query_wrapper
+        connection_created.connect(install_query_wrapper, dispatch_uid='arvyo-query-metrics')
+
+        # Pragmas do SQLite (WAL, cache, mmap) em cada conexão nova (ver database.py)
+        from .database import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='arvyo-sqlite-pragmas')
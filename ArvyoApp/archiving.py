@@ -0,0 +1,65 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .categorization import learn
+from .models import Account, Card, MonthlySummary, RecurringRule, Transaction
+
+# Transações apagadas por DELETE no purge; entre os lotes outras escritas podem entrar
+PURGE_BATCH_SIZE = 1000
+
+
+def _wallet_field(wallet):
+    return 'account' if isinstance(wallet, Account) else 'card'
+
+
+def archive_wallet(wallet):
+    """
+    Apaga uma conta ou cartão do ponto de vista do usuário sem tocar nas transações:
+    a carteira sai do gerenciador padrão, as transações saem de `for_user` e os totais
+    mensais dela saem dos resumos. O custo depende do número de meses, não do
+    histórico; as transações são removidas depois por `purge_archived_wallets`.
+    """
+    field = _wallet_field(wallet)
+    with transaction.atomic():
+        type(wallet).all_objects.filter(pk=wallet.pk).update(archived_at=timezone.now())
+        MonthlySummary.objects.filter(**{field: wallet.pk}).delete()
+        # Regras recorrentes da carteira param de gerar pagamentos futuros
+        RecurringRule.objects.filter(**{field: wallet.pk}).update(is_active=False)
+        bump_data_version(wallet.user_id)
+
+
+def purge_wallet(wallet, batch_size=PURGE_BATCH_SIZE, pause=0):
+    """
+    Remove as transações de uma carteira arquivada em lotes de `batch_size`, cada lote
+    com um DELETE direto (sem carregar as linhas nem disparar os sinais: os resumos já
+    foram acertados no arquivamento e o saldo e as faturas somem com a carteira), e
+    depois a própria carteira. O histórico de categorização esquece as transações
+    apagadas. Retorna quantas transações foram apagadas.
+    """
+    transactions = Transaction.objects.filter(**{_wallet_field(wallet): wallet.pk}).order_by()
+    deleted = 0
+    while rows := list(transactions.values_list('pk', 'description', 'category_id')[:batch_size]):
+        with transaction.atomic():
+            Transaction.objects.filter(pk__in=[pk for pk, _, _ in rows])._raw_delete(transactions.db)
+            learn(wallet.user_id, removed=[(description, category_id) for _, description, category_id in rows])
+        deleted += len(rows)
+        if pause:
+            time.sleep(pause)
+
+    # Sem transações, o coletor do Django só encontra as linhas derivadas da carteira
+    # (checkpoints, faturas); o sinal de exclusão incrementa a versão dos dados do usuário
+    type(wallet).all_objects.filter(pk=wallet.pk).delete()
+    return deleted
+
+
+def purge_archived_wallets(batch_size=PURGE_BATCH_SIZE, pause=0):
+    """Purga todas as carteiras arquivadas, das mais antigas para as mais novas. Retorna (carteiras, transações)."""
+    wallets = deleted = 0
+    for model in (Account, Card):
+        for wallet in model.all_objects.filter(archived_at__isnull=False).order_by('archived_at'):
+            deleted += purge_wallet(wallet, batch_size=batch_size, pause=pause)
+            wallets += 1
+    return wallets, deleted
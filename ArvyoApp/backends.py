@@ -0,0 +1,99 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+# Falhas de login aceitas dentro da janela, por email/usuário digitado e por IP. Os
+# contadores ficam no cache `default`: com o locmem (por processo) cada worker conta as
+# suas, e N workers aceitam até N vezes o limite. Com mais de um worker, configure um
+# cache compartilhado (DJANGO_CACHE_BACKEND, ver CACHES em settings.py).
+FAILURE_LIMIT = 5
+IP_FAILURE_LIMIT = 20
+THROTTLE_WINDOW = 15 * 60
+FAILURES_KEY = 'arvyo:login-failures:{}:{}'
+
+
+def _failure_keys(request, identifier):
+    digest = hashlib.md5(identifier.strip().lower().encode()).hexdigest()
+    keys = {FAILURES_KEY.format('id', digest): FAILURE_LIMIT}
+    address = request.META.get('REMOTE_ADDR') if request is not None else None
+    if address:
+        keys[FAILURES_KEY.format('ip', address)] = IP_FAILURE_LIMIT
+    return keys
+
+
+def login_throttled(request, identifier):
+    """Se o email/usuário ou o IP da requisição passaram do limite de falhas da janela."""
+    keys = _failure_keys(request, identifier)
+    failures = cache.get_many(keys)
+    return any(failures.get(key, 0) >= limit for key, limit in keys.items())
+
+
+def register_login_failure(request, identifier):
+    for key in _failure_keys(request, identifier):
+        # A janela conta a partir da primeira falha; `incr` não renova a expiração
+        cache.add(key, 0, THROTTLE_WINDOW)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, THROTTLE_WINDOW)
+
+
+def clear_login_failures(request, identifier):
+    # Só o contador do identificador: entrar numa conta não libera o IP para testar outras
+    digest = hashlib.md5(identifier.strip().lower().encode()).hexdigest()
+    cache.delete(FAILURES_KEY.format('id', digest))
+
+
+def find_user(identifier):
+    """
+    Usuário pelo username exato ou pelo email (sem diferenciar maiúsculas) numa única
+    consulta, pelos índices únicos de `username` e de LOWER(email) (migração 0012).
+    """
+    identifier = identifier.strip()
+    if not identifier:
+        return None
+    matches = list(
+        get_user_model().objects
+        .annotate(email_lower=Lower('email'))
+        .filter(Q(username=identifier) | Q(email__gt='', email_lower=identifier.lower()))[:2]
+    )
+    # Um username igual ao email de outra pessoa fica com o dono do username
+    for user in matches:
+        if user.username == identifier:
+            return user
+    return matches[0] if matches else None
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """
+    Login por email ou username. Tentativas acima do limite são recusadas antes de
+    buscar o usuário e de calcular o hash da senha.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(get_user_model().USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        if login_throttled(request, username):
+            # Interrompe os outros backends também; o `signin` avisa do bloqueio
+            raise PermissionDenied
+
+        user = find_user(username)
+        if user is None:
+            # Mesmo custo de um usuário existente: o tempo de resposta não revela quais contas existem
+            get_user_model()().set_password(password)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            clear_login_failures(request, username)
+            return user
+        register_login_failure(request, username)
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        return await sync_to_async(self.authenticate)(request, username, password, **kwargs)
@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+from django.db.models import F, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .caching import data_version, get_or_build
+from .models import Budget, in_archived_wallet
+from .summaries import MONEY, ZERO
+
+# A partir de quanto do orçamento (em %) a projeção é considerada um risco
+AT_RISK_PERCENT = Decimal(80)
+
+
+def budgets_with_spent(user):
+    """
+    Orçamentos ativos do usuário anotados com `spent`, em uma única consulta agrupada.
+
+    As despesas entram pelo JOIN categoria -> transação com o dono e o período do
+    orçamento na própria condição do JOIN (FilteredRelation), então o banco busca só
+    as transações de cada orçamento pelo índice (category, user, date), mesmo em
+    categorias globais compartilhadas por todos os usuários. Transações de carteiras
+    arquivadas ficam de fora, como em `Transaction.objects.for_user`.
+    """
+    return (
+        Budget.objects.filter(user=user, is_active=True)
+        .select_related('category')
+        .annotate(
+            budget_transactions=FilteredRelation(
+                'category__transaction',
+                condition=Q(
+                    category__transaction__user=F('user'),
+                    category__transaction__transaction_type='expense',
+                    category__transaction__date__gte=F('start_date'),
+                    category__transaction__date__lte=F('end_date'),
+                ),
+            ),
+            # O FilteredRelation não aceita subconsultas: as carteiras arquivadas saem no filtro da soma
+            spent=Coalesce(
+                Sum('budget_transactions__amount', filter=~in_archived_wallet(user, prefix='budget_transactions__')),
+                Value(ZERO),
+                output_field=MONEY,
+            ),
+        )
+        .order_by('end_date', 'category__name')
+    )
+
+
+def _status(budget, today):
+    spent = budget.spent.quantize(ZERO)
+    total_days = (budget.end_date - budget.start_date).days + 1
+    elapsed_days = min(max((today - budget.start_date).days + 1, 0), total_days)
+
+    # Projeção linear: o ritmo de gasto até hoje mantido até o fim do período
+    if budget.start_date <= today <= budget.end_date:
+        projected = (spent * total_days / elapsed_days).quantize(ZERO)
+    else:
+        projected = spent
+    percent_used = (spent * 100 / budget.amount).quantize(Decimal('0.1')) if budget.amount else Decimal(0)
+
+    if spent > budget.amount:
+        status = 'exceeded'
+    elif today > budget.end_date:
+        status = 'ended'
+    elif today < budget.start_date:
+        status = 'upcoming'
+    elif budget.amount and projected * 100 / budget.amount >= AT_RISK_PERCENT:
+        status = 'at_risk'
+    else:
+        status = 'ok'
+
+    return {
+        'id': budget.pk,
+        'category': budget.category.name,
+        'icon_class': budget.category.icon_class,
+        'color_class': budget.category.color_class,
+        'start_date': budget.start_date,
+        'end_date': budget.end_date,
+        'amount': budget.amount,
+        'spent': spent,
+        'remaining': budget.amount - spent,
+        'percent_used': percent_used,
+        'projected': projected,
+        'projected_overrun': max(projected - budget.amount, ZERO),
+        'days_left': max((budget.end_date - today).days, 0) if today >= budget.start_date else total_days,
+        'status': status,
+    }
+
+
+def evaluate_budgets(user, today=None):
+    """Situação de cada orçamento ativo: gasto, restante, % usado e estouro projetado."""
+    today = today or timezone.localdate()
+    return [_status(budget, today) for budget in budgets_with_spent(user)]
+
+
+def cached_budgets(user):
+    """
+    `evaluate_budgets` memorizado até a próxima escrita nos dados do usuário
+    (transações, categorias ou orçamentos) ou até a virada do dia, que muda a projeção.
+    """
+    today = timezone.localdate()
+    version = f"{data_version(user.pk)}:{today.isoformat()}"
+    return get_or_build('budgets', user.pk, lambda: evaluate_budgets(user, today), version=version)
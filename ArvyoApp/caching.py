@@ -0,0 +1,105 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Tempo máximo de vida das entradas; a invalidação de verdade é feita pela versão
+CACHE_TIMEOUT = 60 * 60
+
+VERSION_KEY = 'arvyo:version:{}'
+GLOBAL_VERSION_KEY = 'arvyo:version:global'
+STATS_KEY = 'arvyo:stats:{}:{}'
+
+# Entradas usadas pelas views e templates, listadas pelo comando `cache_stats`
+TRACKED_ENTRIES = (
+    'context:index',
+    'context:wallets',
+    'context:settingsBank',
+    'fragment:wallets',
+    'fragment:settingsBank',
+    'budgets',
+    'forecast',
+)
+
+
+def _new_version():
+    # Se a chave de versão for descartada pelo cache, o novo valor nunca repete um
+    # valor antigo, então entradas antigas jamais voltam a ser servidas
+    return time.time_ns()
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def data_version(user_id):
+    """Versão dos dados do usuário (combinada com a versão dos dados globais)."""
+    return f"{_get_version(GLOBAL_VERSION_KEY)}.{_get_version(VERSION_KEY.format(user_id))}"
+
+
+
+def bump_data_version(user_id=None):
+    """
+    Invalida tudo o que foi guardado para o usuário (ou para todos, se `user_id` for None).
+    O incremento só acontece depois do commit: antes disso outra requisição ainda poderia
+    ler o estado antigo do banco e guardá-lo sob a versão nova.
+    """
+    key = GLOBAL_VERSION_KEY if user_id is None else VERSION_KEY.format(user_id)
+    transaction.on_commit(lambda: _bump(key))
+
+
+def _count(name, outcome):
+    key = STATS_KEY.format(outcome, name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+
+def cache_stats(names=TRACKED_ENTRIES):
+    """Contadores de acertos e falhas por nome de entrada: {nome: (hits, misses)}."""
+    keys = [STATS_KEY.format(outcome, name) for name in names for outcome in ('hit', 'miss')]
+    values = cache.get_many(keys)
+    return {
+        name: (values.get(STATS_KEY.format('hit', name), 0), values.get(STATS_KEY.format('miss', name), 0))
+        for name in names
+    }
+
+
+def user_cache_key(name, user_id, version=None):
+    # Sem versão explícita a entrada vale até a próxima escrita ou até a virada do dia:
+    # totais do mês e a fatura atual mudam com a data mesmo sem nenhuma escrita
+    version = version or f"{data_version(user_id)}:{timezone.localdate().isoformat()}"
+    return f"arvyo:{name}:{user_id}:{version}"
+
+
+def get_or_build(name, user_id, builder, timeout=CACHE_TIMEOUT, version=None):
+    """Devolve o valor guardado para (nome, usuário, versão) ou o constrói com `builder()`."""
+    key = user_cache_key(name, user_id, version)
+    value = cache.get(key)
+    if value is not None:
+        _count(name, 'hit')
+        return value
+    _count(name, 'miss')
+    value = builder()
+    cache.set(key, value, timeout)
+    return value
+
+
+def cached_context(request, name, builder, timeout=CACHE_TIMEOUT):
+    """Contexto de uma view, guardado por usuário, versão dos dados e dia."""
+    return get_or_build(f'context:{name}', request.user.pk, builder, timeout)
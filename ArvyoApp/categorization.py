@@ -0,0 +1,266 @@
+import re
+import unicodedata
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .caching import CACHE_TIMEOUT, bump_data_version, get_or_build, user_cache_key
+from .models import Category, CategoryRule, Transaction
+
+# Transações lidas e gravadas por lote na categorização em massa
+CLASSIFY_BATCH_SIZE = 1000
+
+# Uma palavra do histórico só decide a categoria sozinha se apareceu em pelo menos
+# tantas transações e quase sempre na mesma categoria
+MIN_TOKEN_SUPPORT = 3
+MIN_TOKEN_AGREEMENT = 0.9
+
+# O histórico não muda de versão a cada escrita: é atualizado no lugar (ver `learn`)
+HISTORY_VERSION = 'history'
+
+_WORD = re.compile(r'\w+')
+
+
+def description_tokens(description):
+    """Palavras da descrição sem acentos e em minúsculas; números soltos (ex: "PIX 8841") são ignorados."""
+    text = unicodedata.normalize('NFKD', (description or '').lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [word for word in _WORD.findall(text) if not word.isdigit()]
+
+
+def _vote(counts, key, category_id, amount):
+    votes = counts.setdefault(key, {})
+    votes[category_id] = votes.get(category_id, 0) + amount
+    if votes[category_id] <= 0:
+        del votes[category_id]
+        if not votes:
+            del counts[key]
+
+
+class RuleIndex:
+    """
+    Regras do usuário indexadas pelas suas palavras: para cada palavra da descrição
+    só os seus prefixos são procurados no dicionário, então o custo de classificar
+    uma descrição não depende da quantidade de regras.
+    """
+
+    def __init__(self, rules):
+        self.rules = {}
+        self.by_word = {}
+        for pk, pattern, category_id, priority in rules:
+            words = set(description_tokens(pattern))
+            if not words:
+                continue
+            self.rules[pk] = (priority, len(words), category_id)
+            for word in words:
+                self.by_word.setdefault(word, []).append(pk)
+        self.shortest = min(map(len, self.by_word), default=0)
+
+    def match(self, tokens):
+        if not self.rules:
+            return None
+        found = {}
+        for token in set(tokens):
+            for size in range(self.shortest, len(token) + 1):
+                for pk in self.by_word.get(token[:size], ()):
+                    found.setdefault(pk, set()).add(token[:size])
+
+        # A regra casa quando todas as suas palavras foram encontradas
+        matched = [pk for pk, words in found.items() if len(words) == self.rules[pk][1]]
+        if not matched:
+            return None
+        best = max(matched, key=lambda pk: (self.rules[pk][0], self.rules[pk][1], -pk))
+        return self.rules[best][2]
+
+
+class HistoryIndex:
+    """
+    Categorias já atribuídas pelo usuário, contadas por descrição normalizada
+    ("assinatura") e por palavra.
+    """
+
+    def __init__(self):
+        self.signatures = {}
+        self.words = {}
+
+    def add(self, description, category_id, amount=1):
+        tokens = description_tokens(description)
+        if not tokens:
+            return
+        _vote(self.signatures, ' '.join(tokens), category_id, amount)
+        for token in set(tokens):
+            _vote(self.words, token, category_id, amount)
+
+    def match(self, tokens):
+        # Mesma descrição (sem os números) já categorizada antes: a categoria mais usada
+        votes = self.signatures.get(' '.join(tokens))
+        if votes:
+            return max(votes, key=votes.get)
+
+        # Senão, a palavra mais frequente entre as que quase sempre levam à mesma categoria
+        best, best_support = None, 0
+        for token in set(tokens):
+            votes = self.words.get(token)
+            if not votes:
+                continue
+            support = sum(votes.values())
+            category_id = max(votes, key=votes.get)
+            if support >= MIN_TOKEN_SUPPORT and votes[category_id] >= support * MIN_TOKEN_AGREEMENT and support > best_support:
+                best, best_support = category_id, support
+        return best
+
+
+def _build_rules(user_id):
+    rules = (
+        CategoryRule.objects.filter(user_id=user_id, is_active=True)
+        .values_list('pk', 'pattern', 'category_id', 'priority')
+    )
+    return RuleIndex(rules)
+
+
+def _build_history(user_id):
+    # As mudanças registradas até aqui já estão no banco
+    cache.delete(_learned_key(user_id))
+    # Agrupado por descrição no banco: descrições repetidas (assinaturas, mercado) viram uma linha
+    history = HistoryIndex()
+    rows = (
+        Transaction.objects.filter(user_id=user_id, category__isnull=False).order_by()
+        .values_list('description', 'category_id')
+        .annotate(total=Count('id'))
+    )
+    for description, category_id, total in rows.iterator():
+        history.add(description, category_id, total)
+    return history
+
+
+def _history_key(user_id):
+    return user_cache_key('categorization:history', user_id, HISTORY_VERSION)
+
+
+def _learned_key(user_id):
+    return user_cache_key('categorization:learned', user_id, HISTORY_VERSION)
+
+
+def _load_history(user_id):
+    history = get_or_build('categorization:history', user_id, lambda: _build_history(user_id), version=HISTORY_VERSION)
+    # Categorias atribuídas desde a última leitura são somadas ao histórico guardado
+    learned = cache.get(_learned_key(user_id))
+    if learned:
+        for description, category_id, amount in learned:
+            history.add(description, category_id, amount)
+        cache.set(_history_key(user_id), history, CACHE_TIMEOUT)
+        cache.delete(_learned_key(user_id))
+    return history
+
+
+class Categorizer:
+    """Índice de categorização de um usuário: regras primeiro, depois o histórico."""
+
+    def __init__(self, user_id):
+        # As regras são poucas linhas e são relidas a cada mudança nos dados do usuário;
+        # o histórico, caro de montar, fica em cache e só recebe as categorias novas
+        self.rules = get_or_build('categorization:rules', user_id, lambda: _build_rules(user_id))
+        self.history = _load_history(user_id)
+        # O histórico pode citar categorias já excluídas; só as que existem são atribuídas
+        self.categories = set(
+            Category.objects.filter(Q(user_id=user_id) | Q(user__isnull=True)).values_list('pk', flat=True)
+        )
+        self._memo = {}
+
+    def classify(self, description):
+        tokens = description_tokens(description)
+        if not tokens:
+            return None
+        key = ' '.join(tokens)
+        # Extratos repetem muito as mesmas descrições
+        if key not in self._memo:
+            category_id = self.rules.match(tokens)
+            if category_id is None:
+                category_id = self.history.match(tokens)
+            self._memo[key] = category_id if category_id in self.categories else None
+        return self._memo[key]
+
+
+def learn(user_id, added=(), removed=()):
+    """
+    Registra categorias escolhidas (`added`) ou desfeitas (`removed`) pelo usuário, como
+    pares (descrição, categoria). Só a lista de mudanças é gravada; elas entram no
+    histórico na próxima vez que ele for carregado.
+    """
+    changes = [(description, category_id, 1) for description, category_id in added if category_id is not None]
+    changes += [(description, category_id, -1) for description, category_id in removed if category_id is not None]
+    if not changes:
+        return
+
+    def update():
+        # Sem histórico em cache não há o que atualizar: ele será montado do banco.
+        # Duas gravações simultâneas podem perder uma mudança; o histórico é só uma
+        # estimativa e é remontado do banco quando a entrada expira
+        if cache.get(_history_key(user_id)) is None:
+            return
+        learned = cache.get(_learned_key(user_id)) or []
+        cache.set(_learned_key(user_id), learned + changes, CACHE_TIMEOUT)
+    transaction.on_commit(update)
+
+
+def categorize_uncategorized(user, batch_size=CLASSIFY_BATCH_SIZE):
+    """
+    Atribui categoria às transações do usuário que não têm uma (fora das carteiras
+    arquivadas), pelas regras e pelo histórico. As transações são percorridas em lotes pela chave primária, lendo só
+    (id, descrição); cada lote é gravado com um UPDATE por categoria sugerida.
+    Retorna (examinadas, categorizadas).
+    """
+    categorizer = Categorizer(user.pk)
+    pending = Transaction.objects.for_user(user).filter(category__isnull=True).order_by('pk')
+
+    examined = categorized = 0
+    last_pk = 0
+    while rows := list(pending.filter(pk__gt=last_pk).values_list('pk', 'description')[:batch_size]):
+        last_pk = rows[-1][0]
+        examined += len(rows)
+        by_category = {}
+        for pk, description in rows:
+            category_id = categorizer.classify(description)
+            if category_id is not None:
+                by_category.setdefault(category_id, []).append(pk)
+        if not by_category:
+            continue
+        with transaction.atomic():
+            # Um lote tem poucas categorias distintas: um UPDATE ... WHERE id IN (...) por
+            # categoria sai bem mais barato que o CASE por linha do bulk_update
+            for category_id, pks in by_category.items():
+                categorized += Transaction.objects.filter(pk__in=pks, category__isnull=True).update(category_id=category_id)
+            # As categorias saíram do próprio índice: o histórico em cache não precisa aprender com elas
+            bump_data_version(user.pk)
+    return examined, categorized
+
+
+def recategorize(transactions, category, batch_size=CLASSIFY_BATCH_SIZE):
+    """
+    Troca a categoria de `transactions` (ex: uma seleção do admin) em lotes pela chave
+    primária, com um UPDATE por lote. O histórico de cada usuário aprende as trocas e a
+    versão dos dados dele é incrementada. Uma categoria pessoal só é aplicada às
+    transações do próprio dono. Retorna quantas transações mudaram.
+    """
+    if category.user_id is not None:
+        transactions = transactions.filter(user_id=category.user_id)
+    pending = transactions.exclude(category=category).order_by('pk')
+
+    changed = 0
+    last_pk = 0
+    while rows := list(pending.filter(pk__gt=last_pk).values_list('pk', 'user_id', 'description', 'category_id')[:batch_size]):
+        last_pk = rows[-1][0]
+        by_user = {}
+        for pk, user_id, description, category_id in rows:
+            by_user.setdefault(user_id, []).append((description, category_id))
+        with transaction.atomic():
+            changed += Transaction.objects.filter(pk__in=[row[0] for row in rows]).update(category=category)
+            for user_id, previous in by_user.items():
+                learn(
+                    user_id,
+                    added=[(description, category.pk) for description, _ in previous],
+                    removed=previous,
+                )
+                bump_data_version(user_id)
+    return changed
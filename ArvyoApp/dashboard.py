@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Account, Transaction
+from .summaries import monthly_totals
+
+# Transações exibidas no painel
+RECENT_TRANSACTIONS = 5
+
+
+def total_balance(user):
+    # Soma dos saldos feita pelo banco
+    return Account.objects.filter(user=user, is_active=True).aggregate(
+        total=Sum('balance', default=Decimal(0))
+    )['total']
+
+
+def recent_transactions(user, limit=RECENT_TRANSACTIONS):
+    # Filtra pelo dono da transação (índice (user, date)) em vez de fazer JOIN com a conta
+    return list(
+        Transaction.objects.for_user(user)
+        .filter(account__isnull=False)
+        .select_related('category')
+        .newest_first()[:limit]
+    )
+
+
+def month_totals(user):
+    # Totais do mês lidos dos resumos mensais (uma linha por conta), sem varrer as transações
+    return monthly_totals(user, timezone.localdate(), account__isnull=False)
+
+
+def get_dashboard_context(user):
+    totals = month_totals(user)
+    return {
+        'title': 'Painel',
+        'subTitle': 'Bem-vindo à Gestão Financeira Arvyo',
+        'total_balance': total_balance(user),
+        'total_change': totals['income'] - totals['expense'],
+        'monthly_expenses': totals['expense'],
+        'monthly_income': totals['income'],
+        'recent_transactions': recent_transactions(user),
+    }
@@ -0,0 +1,97 @@
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Alias da conexão somente leitura (ver DATABASES em settings.py)
+REPLICA = 'replica'
+
+# Pragmas que valem só para conexões que podem escrever: o modo do journal é gravado no
+# arquivo e uma conexão somente leitura não pode trocá-lo
+WRITE_PRAGMAS = ('journal_mode', 'synchronous')
+
+# Leituras do bloco / view em andamento vão para a réplica
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Receptor de `connection_created` (ligado em `apps.py`): aplica SQLITE_PRAGMAS a
+    cada conexão SQLite nova. Com CONN_MAX_AGE isso acontece uma vez por conexão
+    reaproveitada, não por requisição.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    read_only = connection.alias == REPLICA
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            if read_only and name in WRITE_PRAGMAS:
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            # Além do arquivo aberto com mode=ro: qualquer escrita falha na hora
+            cursor.execute('PRAGMA query_only = ON')
+
+
+class ReadReplicaRouter:
+    """
+    Manda as leituras feitas dentro de `use_replica()` / `@read_replica` para a conexão
+    somente leitura; todo o resto (escritas, migrações, leituras fora desses blocos) fica
+    na conexão padrão. No SQLite a "réplica" é o mesmo arquivo: em WAL os leitores
+    enxergam o último commit e não esperam nem bloqueiam quem está escrevendo.
+
+    Dentro de um `atomic()` na conexão padrão (inclusive o de cada `TestCase`) as
+    leituras ficam nela: a réplica não enxerga o que a transação ainda não confirmou e,
+    no SQLite, esperaria pelo lock de escrita dela.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and REPLICA in settings.DATABASES
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # As duas conexões apontam para os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+@contextmanager
+def use_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _stream_from_replica(content):
+    # O corpo de uma resposta em streaming é consultado depois que a view retornou
+    with use_replica():
+        yield from content
+
+
+def read_replica(view):
+    """
+    As leituras da view (inclusive as do corpo em streaming) vão para a réplica. Só para views que não escrevem: uma
+    leitura na réplica não enxerga o que a própria requisição ainda não confirmou.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with use_replica():
+            response = view(request, *args, **kwargs)
+        if response.streaming and not response.is_async:
+            response.streaming_content = _stream_from_replica(response.streaming_content)
+        return response
+    return wrapper
@@ -0,0 +1,101 @@
+import csv
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+# Quantidade de linhas buscadas do banco por vez durante a exportação
+EXPORT_CHUNK_SIZE = 2000
+
+# Colunas lidas do banco: tuplas simples em vez de instâncias do modelo
+EXPORT_FIELDS = (
+    'id', 'date', 'transaction_type', 'amount', 'description',
+    'category__name', 'account__name', 'card__card_name',
+)
+
+CSV_HEADER = ('id', 'data', 'tipo', 'valor', 'descricao', 'categoria', 'conta', 'cartao')
+
+TRANSACTION_TYPE_LABELS = {'income': 'Receita', 'expense': 'Despesa'}
+
+
+def export_rows(queryset):
+    # Ordem cronológica pela chave (date, id) e leitura em lotes pelo iterator(),
+    # então a memória não cresce com o tamanho do histórico
+    return (
+        queryset.order_by('date', 'id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+class _Echo:
+    # Buffer "falso" para o csv.writer: devolve a linha em vez de guardá-la
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    writer = csv.writer(_Echo())
+    # O cabeçalho sai antes da consulta ser executada
+    yield writer.writerow(CSV_HEADER)
+    for pk, day, transaction_type, amount, description, category, account, card in export_rows(queryset):
+        yield writer.writerow((
+            pk, day.isoformat(), TRANSACTION_TYPE_LABELS.get(transaction_type, transaction_type),
+            amount, description, category or '', account or '', card or '',
+        ))
+
+
+def _ofx_date(value):
+    return value.strftime('%Y%m%d')
+
+
+def stream_ofx(queryset, start=None, end=None, wallet=None, wallet_type=None):
+    """Gera um extrato OFX 2 (XML) linha a linha."""
+    now = timezone.now().strftime('%Y%m%d%H%M%S')
+    is_card = wallet_type == 'card'
+    message_set, response, statement = (
+        ('CREDITCARDMSGSRSV1', 'CCSTMTTRNRS', 'CCSTMTRS') if is_card
+        else ('BANKMSGSRSV1', 'STMTTRNRS', 'STMTRS')
+    )
+
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+        '<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>\n'
+        '<OFX>\n'
+        '<SIGNONMSGSRSV1><SONRS><STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>'
+        f'<DTSERVER>{now}</DTSERVER><LANGUAGE>POR</LANGUAGE></SONRS></SIGNONMSGSRSV1>\n'
+        f'<{message_set}><{response}><TRNUID>0</TRNUID>'
+        '<STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>\n'
+        f'<{statement}><CURDEF>BRL</CURDEF>\n'
+    )
+    if wallet is not None:
+        if is_card:
+            yield f'<CCACCTFROM><ACCTID>{escape(wallet.card_number_masked)}</ACCTID></CCACCTFROM>\n'
+        else:
+            bank = escape(wallet.bank_name or '')
+            yield f'<BANKACCTFROM><BANKID>{bank}</BANKID><ACCTID>{wallet.pk}</ACCTID><ACCTTYPE>CHECKING</ACCTTYPE></BANKACCTFROM>\n'
+
+    # DTSTART é obrigatório; sem filtro de início o extrato cobre todo o histórico
+    dtstart = _ofx_date(start) if start else '19700101'
+    dtend = _ofx_date(end) if end else now[:8]
+    yield f'<BANKTRANLIST><DTSTART>{dtstart}</DTSTART><DTEND>{dtend}</DTEND>\n'
+
+    for pk, day, transaction_type, amount, description, category, account, card in export_rows(queryset):
+        is_income = transaction_type == 'income'
+        signed_amount = amount if is_income else -amount
+        memo = f'<MEMO>{escape(category)}</MEMO>' if category else ''
+        yield (
+            f'<STMTTRN><TRNTYPE>{"CREDIT" if is_income else "DEBIT"}</TRNTYPE>'
+            f'<DTPOSTED>{_ofx_date(day)}</DTPOSTED><TRNAMT>{signed_amount}</TRNAMT>'
+            f'<FITID>{pk}</FITID><NAME>{escape(description[:32])}</NAME>{memo}</STMTTRN>\n'
+        )
+
+    yield '</BANKTRANLIST>\n'
+    if wallet is not None and not is_card:
+        yield f'<LEDGERBAL><BALAMT>{wallet.balance}</BALAMT><DTASOF>{now}</DTASOF></LEDGERBAL>\n'
+    yield f'</{statement}></{response}></{message_set}>\n</OFX>\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ofx': ('application/x-ofx; charset=utf-8', 'ofx'),
+}
@@ -0,0 +1,146 @@
+import calendar
+from datetime import timedelta
+from itertools import accumulate
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .analytics import add_months
+from .caching import data_version, get_or_build
+from .ledger import SIGNED_AMOUNT
+from .models import Account, Goal, Transaction
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy é opcional: sem ele a mesma projeção é calculada em Python puro
+    np = None
+
+# Horizonte da projeção e janela do histórico usada para a média diária
+FORECAST_MONTHS = 12
+HISTORY_DAYS = 90
+
+
+def _cents(value):
+    # Tudo em centavos inteiros: as somas acumuladas ficam exatas
+    return int(round(value * 100))
+
+
+def _load(user, today, days):
+    """Dados da projeção em listas paralelas, com quatro consultas."""
+    accounts = list(Account.objects.filter(user=user, is_active=True).order_by('name').values_list('pk', 'name', 'balance'))
+    index = {pk: position for position, (pk, name, balance) in enumerate(accounts)}
+
+    # Média diária do movimento recente de cada conta, sem os pagamentos agendados
+    # (eles entram pela data em que vão acontecer)
+    history_start = today - timedelta(days=HISTORY_DAYS)
+    averages = [0] * len(accounts)
+    history = (
+        Transaction.objects.filter(account__in=list(index), is_future_payment=False)
+        .filter(date__gt=history_start, date__lte=today)
+        .order_by()
+        .values('account_id')
+        .annotate(total=Sum(SIGNED_AMOUNT))
+    )
+    for row in history:
+        averages[index[row['account_id']]] = _cents(row['total'] / HISTORY_DAYS)
+
+    # Pagamentos futuros ainda não pagos (índice parcial); atrasados contam como hoje
+    scheduled = (
+        Transaction.objects.pending_payments(user)
+        .filter(account__in=list(index), date__lt=today + timedelta(days=days))
+        .order_by()
+        .values_list('account_id', 'date', 'transaction_type', 'amount')
+    )
+    rows, columns, amounts = [], [], []
+    for account_id, day, transaction_type, amount in scheduled:
+        rows.append(index[account_id])
+        columns.append(max((day - today).days, 0))
+        amounts.append(_cents(amount) if transaction_type == 'income' else -_cents(amount))
+
+    goals = list(
+        Goal.objects.filter(user=user, is_completed=False).order_by('due_date', 'pk')
+        .values_list('pk', 'name', 'target_amount', 'current_amount', 'due_date')
+    )
+    return accounts, averages, (rows, columns, amounts), goals
+
+
+def _project_numpy(balances, averages, scheduled, goal_needs, days):
+    rows, columns, amounts = scheduled
+    flows = np.repeat(np.asarray(averages, dtype=np.int64)[:, None], days, axis=1)
+    # add.at soma corretamente vários pagamentos na mesma conta e dia
+    np.add.at(flows, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)), np.asarray(amounts, dtype=np.int64))
+    projected = np.asarray(balances, dtype=np.int64)[:, None] + np.cumsum(flows, axis=1)
+
+    total = projected.sum(axis=0)
+    # Primeiro dia em que o crescimento do saldo total cobre o que falta de cada meta
+    growth = total - sum(balances)
+    reached = growth[None, :] >= np.asarray(goal_needs, dtype=np.int64)[:, None]
+    first_day = np.where(reached.any(axis=1), reached.argmax(axis=1), -1)
+    return projected.tolist(), total.tolist(), first_day.tolist()
+
+
+def _project_python(balances, averages, scheduled, goal_needs, days):
+    flows = [[average] * days for average in averages]
+    for row, column, amount in zip(*scheduled):
+        flows[row][column] += amount
+    projected = [list(accumulate(row, initial=balance))[1:] for balance, row in zip(balances, flows)]
+
+    total = [sum(column) for column in zip(*projected)] if projected else [0] * days
+    start = sum(balances)
+    first_day = [next((day for day, value in enumerate(total) if value - start >= need), -1) for need in goal_needs]
+    return projected, total, first_day
+
+
+def forecast(user, today=None, months=FORECAST_MONTHS):
+    """
+    Saldo projetado dia a dia de cada conta nos próximos `months` meses e a data em
+    que cada meta em aberto é atingida.
+
+    A projeção parte do saldo atual, soma a média diária do histórico recente e os
+    pagamentos agendados nas suas datas. Os valores ficam numa matriz conta x dia em
+    centavos; com NumPy a matriz inteira é calculada de uma vez (soma acumulada por
+    linha), sem laço por dia ou por pagamento.
+    """
+    today = today or timezone.localdate()
+    end = add_months(today, months)
+    end = end.replace(day=min(today.day, calendar.monthrange(end.year, end.month)[1]))
+    days = (end - today).days
+    accounts, averages, scheduled, goals = _load(user, today, days)
+
+    balances = [_cents(balance) for pk, name, balance in accounts]
+    goal_needs = [_cents(target - current) for pk, name, target, current, due in goals]
+    project = _project_numpy if np is not None else _project_python
+    projected, total, first_day = project(balances, averages, scheduled, goal_needs, days)
+
+    goal_results = []
+    for (pk, name, target, current, due), day, need in zip(goals, first_day, goal_needs):
+        # Meta já coberta (falta zero ou menos) é atingida hoje
+        reached_on = today if need <= 0 else (today + timedelta(days=day) if day >= 0 else None)
+        goal_results.append({
+            'id': pk,
+            'name': name,
+            'target': float(target),
+            'reached_on': reached_on,
+            'due_date': due,
+            'on_track': reached_on is not None and (due is None or reached_on <= due),
+        })
+
+    return {
+        'start': today,
+        'days': days,
+        'accounts': {
+            'ids': [pk for pk, name, balance in accounts],
+            'names': [name for pk, name, balance in accounts],
+            'balances': [[value / 100 for value in row] for row in projected],
+        },
+        'total': [value / 100 for value in total],
+        'goals': goal_results,
+    }
+
+
+def cached_forecast(user):
+    # Mesma política de `budgets.cached_budgets`: nova versão a cada escrita ou virada do dia
+    today = timezone.localdate()
+    version = f"{data_version(user.pk)}:{today.isoformat()}"
+    return get_or_build('forecast', user.pk, lambda: forecast(user, today), version=version)
@@ -1,11 +1,36 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.core.exceptions import BadRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
+from django.contrib.auth.views import redirect_to_login
+from django.contrib import messages
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import condition, require_POST
 from datetime import timedelta, date
 from decimal import Decimal
+import hashlib
+import io
 import json
+import os
 from .models import Account, Transaction, Category, Card
+from . import analytics as analytics_data
+from .archiving import archive_wallet
+from .budgets import cached_budgets
+from .caching import bump_data_version, cached_context, data_version
+from .categorization import categorize_uncategorized
+from .dashboard import get_dashboard_context
+from .database import read_replica
+from .forecast import cached_forecast
+from .exports import EXPORT_FORMATS, stream_csv, stream_ofx
+from .importers import import_statement
+from . import instrumentation
+from .pages import STATIC_PAGES, rendered_page
+from .pagination import keyset_page
+from . import search as transaction_search
+from .wallets import get_wallets_context
 
 # Importa o filtro personalizado 'get_item'
 from django.template import Library
@@ -18,100 +43,226 @@ def get_item(dictionary, key):
 # Views do Dashboard (Página Inicial)
 @login_required
 def index(request):
-    user = request.user
-    
-    total_balance = sum(account.balance for account in Account.objects.filter(user=user, is_active=True))
-    recent_transactions = Transaction.objects.filter(account__user=user).order_by('-date')[:5]
-
-    today = timezone.localdate()
-    start_of_month = today.replace(day=1)
-    
-    all_transactions_this_month = Transaction.objects.filter(
-        account__user=user,
-        date__gte=start_of_month
-    )
-
-    monthly_expenses = Decimal(0)
-    monthly_income = Decimal(0)
-
-    for transaction in all_transactions_this_month:
-        if transaction.transaction_type == 'expense':
-            monthly_expenses += transaction.amount
-        elif transaction.transaction_type == 'income':
-            monthly_income += transaction.amount
-            
-    total_change = monthly_income - monthly_expenses
-    
-    data = {
-        'title': 'Painel',
-        'subTitle': 'Bem-vindo à Gestão Financeira Arvyo',
-        'total_balance': total_balance,
-        'total_change': total_change,
-        'monthly_expenses': monthly_expenses,
-        'monthly_income': monthly_income,
-        'recent_transactions': recent_transactions,
-    }
-    
+    # O contexto do painel fica em cache até a próxima escrita nos dados do usuário
+    data = cached_context(request, 'index', lambda: get_dashboard_context(request.user))
     return render(request, "home/index.html", data)
 
 # Views de Carteiras
 @login_required
+@read_replica
 def wallets(request):
-    user = request.user
-
-    # Busca todas as contas e cartões do usuário separadamente
-    user_accounts = Account.objects.filter(user=user)
-    user_cards = Card.objects.filter(user=user)
-
-    # Calculos de despesas e transações, adaptados para contas e cartões
-    expenses_by_account = {}
-    transactions_by_account = {}
-    expenses_by_card = {}
-    transactions_by_card = {}
-
-    for account in user_accounts:
-        transactions = Transaction.objects.filter(account=account, user=user).order_by('-date')
-        total_expense = transactions.filter(transaction_type='expense').aggregate(Sum('amount'))['amount__sum'] or Decimal(0)
-        
-        expenses_by_account[account.id] = total_expense
-        transactions_by_account[account.id] = transactions
-        
-    for card in user_cards:
-        transactions = Transaction.objects.filter(card=card, user=user).order_by('-date')
-        total_expense = transactions.filter(transaction_type='expense').aggregate(Sum('amount'))['amount__sum'] or Decimal(0)
-        
-        # Adiciona o limite disponível ao objeto do cartão
-        card.available_limit = card.limit - total_expense
-        
-        expenses_by_card[card.id] = total_expense
-        transactions_by_card[card.id] = transactions
-    
-    context = {
-        'user_accounts': user_accounts,
-        'user_cards': user_cards,
-        'expenses_by_account': expenses_by_account,
-        'transactions_by_account': transactions_by_account,
-        'expenses_by_card': expenses_by_card,
-        'transactions_by_card': transactions_by_card,
-    }
+    # Totais de despesas, limites disponíveis e transações recentes de todas as
+    # carteiras são calculados em um número fixo de consultas
+    context = cached_context(request, 'wallets', lambda: get_wallets_context(request.user))
 
     return render(request, 'home/wallets.html', context)
 
-@login_required
-def wallet_detail(request, wallet_type, pk):
+def _wallet_transactions(request, wallet_type, pk):
+    # Carteira do usuário e a consulta das suas transações (índices (account|card, date))
     if wallet_type == 'account':
         wallet = get_object_or_404(Account, pk=pk, user=request.user)
-        transactions = Transaction.objects.filter(account=wallet, user=request.user).order_by('-date')
+        transactions = Transaction.objects.for_account(wallet)
     elif wallet_type == 'card':
         wallet = get_object_or_404(Card, pk=pk, user=request.user)
-        transactions = Transaction.objects.filter(card=wallet, user=request.user).order_by('-date')
+        transactions = Transaction.objects.for_card(wallet)
     else:
+        return None, None
+    return wallet, transactions.filter(user=request.user).select_related('category')
+
+@login_required
+@read_replica
+def wallet_detail(request, wallet_type, pk):
+    wallet, transactions = _wallet_transactions(request, wallet_type, pk)
+    if wallet is None:
         # Se o tipo de carteira for inválido, redireciona de volta para a página de carteiras.
         return redirect('wallets')
 
-    context = {'wallet': wallet, 'transactions': transactions, 'wallet_type': wallet_type}
+    # Só a página mais recente é carregada; as demais vêm de `wallet_transactions_page`
+    transactions, next_cursor = keyset_page(transactions)
+    context = {
+        'wallet': wallet,
+        'transactions': transactions,
+        'wallet_type': wallet_type,
+        'next_cursor': next_cursor,
+    }
     return render(request, 'home/wallet_detail.html', context)
 
+@login_required
+@read_replica
+def wallet_transactions_page(request, wallet_type, pk):
+    # Fragmento "carregar mais": devolve só as linhas da próxima página e o cursor seguinte
+    wallet, transactions = _wallet_transactions(request, wallet_type, pk)
+    if wallet is None:
+        raise Http404("Tipo de carteira inválido.")
+
+    transactions, next_cursor = keyset_page(transactions, cursor=request.GET.get('cursor'))
+    response = render(request, 'partials/transaction_rows.html', {'transactions': transactions})
+    response['X-Next-Cursor'] = next_cursor or ''
+    return response
+
+def _export_response(request, transactions, export_format, filename, wallet=None, wallet_type=None):
+    # Resposta em streaming: as linhas são geradas conforme saem do banco
+    if export_format not in EXPORT_FORMATS:
+        raise Http404("Formato de exportação inválido.")
+    try:
+        start = parse_date(request.GET.get('start') or '')
+        end = parse_date(request.GET.get('end') or '')
+    except ValueError:
+        raise BadRequest("Período de exportação inválido.")
+
+    transactions = transactions.between(start=start, end=end)
+    if export_format == 'csv':
+        rows = stream_csv(transactions)
+    else:
+        rows = stream_ofx(transactions, start=start, end=end, wallet=wallet, wallet_type=wallet_type)
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingHttpResponse(
+        rows,
+        content_type=content_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{extension}"'},
+    )
+
+@login_required
+@read_replica
+def export_transactions(request, export_format):
+    transactions = Transaction.objects.for_user(request.user)
+    return _export_response(request, transactions, export_format, 'transacoes')
+
+@login_required
+@read_replica
+def export_wallet_transactions(request, wallet_type, pk, export_format):
+    wallet, transactions = _wallet_transactions(request, wallet_type, pk)
+    if wallet is None:
+        raise Http404("Tipo de carteira inválido.")
+    filename = f'transacoes-{wallet_type}-{wallet.pk}'
+    return _export_response(request, transactions, export_format, filename, wallet=wallet, wallet_type=wallet_type)
+
+def _analytics_int(request, name, default, maximum):
+    try:
+        value = int(request.GET.get(name, default))
+    except ValueError:
+        raise BadRequest(f"Parâmetro '{name}' inválido.")
+    if not 1 <= value <= maximum:
+        raise BadRequest(f"Parâmetro '{name}' deve estar entre 1 e {maximum}.")
+    return value
+
+def _analytics_date(request, name, default=None):
+    value = request.GET.get(name)
+    if not value:
+        return default
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise BadRequest(f"Data '{name}' inválida.")
+    return day
+
+def _user_data_etag(request, *args, **kwargs):
+    # Os dados só mudam quando a versão dos dados do usuário muda (e as séries e
+    # projeções dependem de "hoje"), então a ETag dispensa refazer as consultas num GET condicional
+    if not request.user.is_authenticated:
+        return None
+    content = f"{data_version(request.user.pk)}|{timezone.localdate()}|{request.get_full_path()}"
+    return hashlib.md5(content.encode()).hexdigest()
+
+def _revalidated_json(payload):
+    # O navegador guarda a resposta mas revalida sempre com If-None-Match (304 se nada mudou)
+    response = JsonResponse(payload)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+@read_replica
+@condition(etag_func=_user_data_etag)
+def analytics_cashflow(request):
+    # Receitas x despesas por mês (padrão) ou por semana (?period=week)
+    end = _analytics_date(request, 'end', timezone.localdate())
+    if request.GET.get('period', 'month') == 'week':
+        weeks = _analytics_int(request, 'weeks', analytics_data.DEFAULT_WEEKS, 520)
+        return _revalidated_json(analytics_data.weekly_cashflow(request.user, end, weeks))
+    months = _analytics_int(request, 'months', analytics_data.DEFAULT_MONTHS, 240)
+    return _revalidated_json(analytics_data.monthly_cashflow(request.user, end, months))
+
+@login_required
+@read_replica
+@condition(etag_func=_user_data_etag)
+def analytics_categories(request, transaction_type):
+    if transaction_type not in analytics_data.TRANSACTION_TYPES:
+        raise Http404("Tipo de transação inválido.")
+    # Sem período informado, considera os últimos 12 meses
+    end = _analytics_date(request, 'end', timezone.localdate())
+    start = _analytics_date(request, 'start', analytics_data.month_range(end)[0])
+    return _revalidated_json(analytics_data.category_breakdown(request.user, transaction_type, start, end))
+
+@login_required
+@read_replica
+@condition(etag_func=_user_data_etag)
+def analytics_balance(request):
+    end = _analytics_date(request, 'end', timezone.localdate())
+    months = _analytics_int(request, 'months', analytics_data.DEFAULT_MONTHS, 240)
+    return _revalidated_json(analytics_data.balance_history(request.user, end, months))
+
+@login_required
+def budgets(request):
+    data = {'title': 'Orçamentos', 'subTitle': 'Orçamentos', 'budgets': cached_budgets(request.user)}
+    return render(request, "home/budgets.html", data)
+
+@login_required
+@condition(etag_func=_user_data_etag)
+def budgets_data(request):
+    return _revalidated_json({'budgets': cached_budgets(request.user)})
+
+@login_required
+@condition(etag_func=_user_data_etag)
+def forecast_data(request):
+    # Saldo projetado por conta (um valor por dia a partir de `start`) e datas das metas
+    return _revalidated_json(cached_forecast(request.user))
+
+def _search_id(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"Parâmetro '{name}' inválido.")
+
+@login_required
+@condition(etag_func=_user_data_etag)
+def search_transactions(request):
+    # Busca por descrição (?q=), com filtros opcionais de carteira, categoria, tipo e período
+    transaction_type = request.GET.get('type') or None
+    if transaction_type is not None and transaction_type not in analytics_data.TRANSACTION_TYPES:
+        raise BadRequest("Parâmetro 'type' inválido.")
+    transactions = transaction_search.search_transactions(
+        request.user,
+        request.GET.get('q', ''),
+        account=_search_id(request, 'account'),
+        card=_search_id(request, 'card'),
+        category=_search_id(request, 'category'),
+        transaction_type=transaction_type,
+        start=_analytics_date(request, 'start'),
+        end=_analytics_date(request, 'end'),
+        limit=_analytics_int(request, 'limit', transaction_search.SEARCH_LIMIT, transaction_search.MAX_SEARCH_LIMIT),
+    )
+    return _revalidated_json(transaction_search.search_results(transactions))
+
+# Métricas por view (ver `instrumentation.RequestMetricsMiddleware`)
+@staff_member_required
+def requestMetrics(request):
+    data = {
+        'title': 'Métricas',
+        'subTitle': 'Tempo de resposta e consultas por view',
+        'stats': instrumentation.view_stats(),
+        'window': instrumentation.ROLLING_WINDOW,
+        'pid': os.getpid(),
+    }
+    response = render(request, "home/requestMetrics.html", data)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
 def addBank(request):
     if request.method == 'POST':
         # Processa o formulário de adicionar conta bancária
@@ -141,15 +292,47 @@ def addBank(request):
     return render(request, "home/addBank.html", data)
 
 @login_required
-def settingsBank(request):
+def importStatement(request):
     user_accounts = Account.objects.filter(user=request.user)
-    
-    user_cards = Card.objects.filter(user=request.user) 
-    
-    data = {
-        'user_accounts': user_accounts,
-        'user_cards': user_cards,
-    }
+    user_cards = Card.objects.filter(user=request.user)
+
+    if request.method == 'POST':
+        statement = request.FILES.get('statement')
+        if statement is None:
+            messages.error(request, "Selecione um arquivo de extrato.")
+            return redirect('importStatement')
+
+        file_format = statement.name.rsplit('.', 1)[-1].lower()
+        if file_format not in ('csv', 'ofx'):
+            messages.error(request, "Formato não suportado. Envie um arquivo CSV ou OFX.")
+            return redirect('importStatement')
+
+        # Carteira de destino no formato "account:ID" ou "card:ID" (opcional)
+        account = card = None
+        wallet_type, _, wallet_id = request.POST.get('wallet', '').partition(':')
+        if wallet_type and (wallet_type not in ('account', 'card') or not wallet_id.isdigit()):
+            messages.error(request, "Carteira de destino inválida.")
+            return redirect('importStatement')
+        if wallet_type == 'account':
+            account = get_object_or_404(user_accounts, pk=wallet_id)
+        elif wallet_type == 'card':
+            card = get_object_or_404(user_cards, pk=wallet_id)
+
+        # O arquivo é lido linha a linha direto do upload, sem ser carregado inteiro
+        lines = io.TextIOWrapper(statement.file, encoding='utf-8-sig', errors='replace', newline='')
+        result = import_statement(request.user, lines, file_format, account=account, card=card)
+        messages.success(request, f"Extrato importado: {result}.")
+        return redirect('importStatement')
+
+    data = {'title': 'Importar Extrato', 'subTitle': 'Importar Extrato', 'user_accounts': user_accounts, 'user_cards': user_cards}
+    return render(request, "home/importStatement.html", data)
+
+@login_required
+def settingsBank(request):
+    data = cached_context(request, 'settingsBank', lambda: {
+        'user_accounts': list(Account.objects.filter(user=request.user)),
+        'user_cards': list(Card.objects.filter(user=request.user)),
+    })
     
     return render(request, "home/settingsBank.html", data)
 
@@ -161,6 +344,12 @@ def addCard(request):
         card_number_raw = request.POST.get('card_number_masked').replace(" ", "")
         brand = request.POST.get('brand')
         expiration_date = request.POST.get('expiration_date')
+        # Dias de fechamento e vencimento da fatura (opcionais, valem os padrões do modelo)
+        cycle = {
+            field: int(request.POST[field])
+            for field in ('closing_day', 'due_day')
+            if request.POST.get(field, '').isdigit() and 1 <= int(request.POST[field]) <= 31
+        }
         
         # --- LINHA ADICIONADA/MODIFICADA ---
         limit_str = request.POST.get('limit') # Captura o valor do limite como string
@@ -181,7 +370,8 @@ def addCard(request):
             card_number_masked=card_number_masked,
             expiration_date=expiration_date,
             brand=brand,
-            limit=card_limit # --- Adicionado o campo 'limit' aqui ---
+            limit=card_limit, # --- Adicionado o campo 'limit' aqui ---
+            **cycle,
         )
         return redirect('wallets')
     
@@ -191,88 +381,84 @@ def addCard(request):
 @login_required
 def delete_bank_account(request, account_id):
     account = get_object_or_404(Account, id=account_id, user=request.user)
-    account.delete()
+    # Some na hora; as transações são apagadas em lotes pelo `purge_archived_wallets`
+    archive_wallet(account)
     return redirect('settingsBank')
 
+@login_required
+@require_POST
+def pay_card_statements(request, card_id):
+    # Marca como pagas as faturas já fechadas; o limite delas volta a ficar disponível
+    card = get_object_or_404(Card, id=card_id, user=request.user)
+    paid = card.statements.filter(is_paid=False, closing_date__lte=timezone.localdate()).update(is_paid=True)
+    if paid:
+        bump_data_version(request.user.pk)
+        messages.success(request, f"{paid} fatura(s) marcada(s) como paga(s).")
+    return redirect('wallets')
+
+@login_required
+@require_POST
+def categorize_transactions(request):
+    # Aplica as regras de categoria e o histórico do usuário às transações sem categoria
+    examined, categorized = categorize_uncategorized(request.user)
+    messages.success(request, f"{categorized} de {examined} transação(ões) sem categoria foram categorizadas.")
+    return redirect('importStatement')
+
 @login_required
 def delete_credit_card(request, card_id):
     card = get_object_or_404(Card, id=card_id, user=request.user)
-    card.delete()
+    # Some na hora; as transações são apagadas em lotes pelo `purge_archived_wallets`
+    archive_wallet(card)
     return redirect('settingsBank')
 
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
 from django.contrib import messages
-from django.contrib.auth.models import User
+from .backends import login_throttled
 
 def signin(request):
     # Se o usuário já estiver logado, redireciona para a página inicial
     if request.user.is_authenticated:
         return redirect('index')
 
+    status = 200
     if request.method == 'POST':
-        email_or_username = request.POST.get('email')
+        email_or_username = request.POST.get('email', '')
         password = request.POST.get('password')
 
-        # Tenta encontrar o usuário pelo email ou username
-        try:
-            user = User.objects.get(email=email_or_username)
-            username = user.username
-        except User.DoesNotExist:
-            username = email_or_username
-
-        # Usa a função de autenticação do Django
-        user = authenticate(request, username=username, password=password)
+        # O backend (ver `backends.py`) encontra o usuário pelo email ou username numa só consulta
+        user = authenticate(request, username=email_or_username, password=password)
         
         if user is not None:
             # Se o usuário for válido, ele é logado
             login(request, user)
             return redirect('index')
+        elif login_throttled(request, email_or_username):
+            # Tentativas demais: recusadas sem nem conferir a senha
+            messages.error(request, "Muitas tentativas de login. Aguarde alguns minutos e tente novamente.")
+            status = 429
         else:
             # Se a autenticação falhar, exibe uma mensagem de erro
             messages.error(request, "Email/Usuário ou senha inválidos.")
 
     # Renderiza a página de login (para requisições GET ou falhas no POST)
-    return render(request, "home/signin.html")
-
-def index2(request): data = {'title': 'About Us', 'subTitle': 'About Us'}; return render(request,"home/index2.html", data)
-def addNewAccount(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/addNewAccount.html", data)
-def affiliates(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/affiliates.html", data)
-def analytics(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/analytics.html", data)
-def analyticsBalance(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/analyticsBalance.html", data)
-def analyticsExpenses(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/analyticsExpenses.html", data)
-def analyticsIncome(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/analyticsIncome.html", data)
-def analyticsIncomeVsExpenses(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/analyticsIncomeVsExpenses.html", data)
-def analyticsTransactionHistory(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/analyticsTransactionHistory.html", data)
-def bankAddSuccessful(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/bankAddSuccessful.html", data)
-def blank(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/blank.html", data)
-def budgets(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/budgets.html", data)
-def chart(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/chart.html", data)
-def demo(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/demo.html", data)
-def goals(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/goals.html", data)
-def idFrontAndBackUpload(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/idFrontAndBackUpload.html", data)
-def locked(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/locked.html", data)
-def notifications(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/notifications.html", data)
-def otpCode(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/otpCode.html", data)
-def otpPhone(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/otpPhone.html", data)
-def pageError(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/pageError.html", data)
-def privacy(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/privacy.html", data)
-def profile(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/profile.html", data)
-def reset(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/reset.html", data)
-def settings(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settings.html", data)
-def settingsApi(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settingsApi.html", data)
-def settingsCategories(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settingsCategories.html", data)
-def settingsCurrencies(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settingsCurrencies.html", data)
-def settingsGeneral(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settingsGeneral.html", data)
-def settingsProfile(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settingsProfile.html", data)
-def settingsSecurity(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settingsSecurity.html", data)
-def settingsSession(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/settingsSession.html", data)
-def signup(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/signup.html", data)
-def support(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/support.html", data)
-def supportCreateTicket(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/supportCreateTicket.html", data)
-def supportTicketDetails(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/supportTicketDetails.html", data)
-def supportTickets(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/supportTickets.html", data)
-def verifiedId(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/verifiedId.html", data)
-def verifyEmail(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/verifyEmail.html", data)
-def verifyId(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/verifyId.html", data)
-def verifyingId(request): data = {'title': 'Add Bank', 'subTitle': 'Add Bank'}; return render(request, "home/verifyingId.html", data)
\ No newline at end of file
+    return render(request, "home/signin.html", status=status)
+
+# Páginas de conteúdo fixo (ver `pages.STATIC_PAGES`)
+def static_page(request, page):
+    if STATIC_PAGES[page] and not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    rendered = rendered_page(page)
+    # If-None-Match / If-Modified-Since conferem com a página guardada: 304 sem corpo
+    response = get_conditional_response(request, etag=rendered.etag, last_modified=rendered.last_modified)
+    if response is None:
+        response = HttpResponse(rendered.content)
+    response['ETag'] = rendered.etag
+    response['Last-Modified'] = rendered.last_modified_header
+    # O navegador guarda a página mas confere o ETag a cada visita; páginas que exigem
+    # login não ficam em caches compartilhados
+    if STATIC_PAGES[page]:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,108 @@
+import re
+import shutil
+from pathlib import Path
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    # fontTools é opcional: sem ele o CSS é reduzido, mas as fontes são usadas inteiras
+    font_subset = None
+
+APP_DIR = Path(__file__).resolve().parent
+# Pacote completo da Flaticon (CSS e fontes, ~8,5 MB): fonte do corte, fora de static/
+# para não ir para o collectstatic
+SOURCE_CSS = APP_DIR / 'assets' / 'flaticon' / 'all' / 'all.css'
+# O que é publicado: o CSS com os ícones usados e as fontes geradas para ele
+ICONS_DIR = APP_DIR / 'static' / 'icons' / 'flaticon'
+TRIMMED_CSS = ICONS_DIR / 'all' / 'used.css'
+
+# Onde os ícones são referenciados: templates, scripts próprios e código Python
+SCAN_PATTERNS = ('templates/**/*.html', 'static/js/**/*.js', '*.py')
+
+ICON_CLASS = re.compile(r'\bfi-(?:brands|br|bs|rr|rs|sr|ss)-[A-Za-z0-9_-]+')
+RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+GLYPH = re.compile(r'^\.(fi-[A-Za-z0-9_-]+):before$')
+FAMILY_PREFIX = re.compile(r'\^=(fi-[a-z]+-)\]')
+FONT_URL = re.compile(r'url\((\.\./[^)#]+?\.(woff2?|eot))(#[^)]*)?\)')
+CODEPOINT = re.compile(r'content:"\\([0-9a-f]+)"')
+
+HEADER = "/* Gerado por `manage.py trim_icon_fonts` a partir de all.css: só os ícones usados. Não editar. */\n"
+
+
+def used_icon_classes(extra=()):
+    """Classes `fi-*` citadas nos templates, scripts e código do app, mais `extra`."""
+    used = set(extra)
+    for pattern in SCAN_PATTERNS:
+        for path in APP_DIR.glob(pattern):
+            used.update(ICON_CLASS.findall(path.read_text(encoding='utf-8', errors='ignore')))
+    return used
+
+
+def _parse(css):
+    """Separa o CSS da Flaticon em famílias ({prefixo: (font-face, regra base)}) e ícones ({classe: regra})."""
+    families, glyphs = {}, {}
+    font_face = None
+    for selector, body in RULE.findall(css):
+        selector = selector.strip()
+        if selector == '@font-face':
+            font_face = body
+        elif (match := GLYPH.match(selector)):
+            glyphs[match.group(1)] = body
+        elif (match := FAMILY_PREFIX.search(selector)):
+            families[match.group(1)] = (font_face, selector, body)
+    return families, glyphs
+
+
+def _family_of(icon, families):
+    # O prefixo mais longo ganha: "fi-brands-" antes de "fi-br-"
+    return max((prefix for prefix in families if icon.startswith(prefix)), key=len, default=None)
+
+
+def _subset_font(source, codepoints):
+    target = ICONS_DIR / (source.stem.rsplit('-', 1)[0] + '-used.woff2')
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = []
+    font = font_subset.load_font(str(source), options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    font_subset.save_font(font, str(target), options)
+    return target
+
+
+def _font_src(font_face, codepoints):
+    urls = {extension: url for url, extension, fragment in FONT_URL.findall(font_face)}
+    source = (SOURCE_CSS.parent / urls['woff2']).resolve()
+    if font_subset is not None:
+        # Fonte cortada com só os glifos usados
+        target = _subset_font(source, codepoints)
+    else:
+        # Sem o fontTools vai a fonte inteira, só em woff2 (suportado por todos os navegadores atuais)
+        target = shutil.copyfile(source, ICONS_DIR / source.name)
+    return f'url(../{target.name}) format("woff2")'
+
+
+def trim_icon_css(used, source=SOURCE_CSS, target=TRIMMED_CSS):
+    """
+    Gera `target` com as famílias e os ícones da Flaticon em `used`. Retorna
+    (ícones mantidos, classes desconhecidas) para o relatório do comando.
+    """
+    families, glyphs = _parse(source.read_text(encoding='utf-8'))
+    kept = sorted(icon for icon in used if icon in glyphs)
+
+    by_family = {}
+    for icon in kept:
+        by_family.setdefault(_family_of(icon, families), []).append(icon)
+
+    parts = [HEADER]
+    for prefix, icons in sorted(by_family.items()):
+        font_face, selector, body = families[prefix]
+        codepoints = [int(CODEPOINT.search(glyphs[icon]).group(1), 16) for icon in icons]
+        name = re.search(r'font-family:([^;]+)', font_face).group(1)
+        parts.append(f'@font-face{{font-family:{name};src:{_font_src(font_face, codepoints)}}}\n')
+        parts.append(f'{selector}{{{body}}}\n')
+        parts.extend(f'.{icon}:before{{{glyphs[icon]}}}\n' for icon in icons)
+
+    target.write_text(''.join(parts), encoding='utf-8')
+    return kept, sorted(set(used) - set(glyphs))
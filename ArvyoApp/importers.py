@@ -0,0 +1,285 @@
+import csv
+import hashlib
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from .models import Account, Card, Category, Transaction
+from .caching import bump_data_version
+from .categorization import Categorizer, learn
+from .ledger import apply_to_ledger
+from .statements import apply_to_statements
+from .summaries import apply_many_to_summaries, transaction_snapshot
+
+# Quantidade de transações gravadas por bulk_create
+IMPORT_BATCH_SIZE = 1000
+
+# Nomes de coluna aceitos no CSV (inclui o cabeçalho gerado pela exportação)
+CSV_COLUMNS = {
+    'date': ('data', 'date'),
+    'amount': ('valor', 'amount'),
+    'description': ('descricao', 'descrição', 'description', 'historico', 'histórico'),
+    'transaction_type': ('tipo', 'type'),
+    'category': ('categoria', 'category'),
+    'account': ('conta', 'account'),
+    'card': ('cartao', 'cartão', 'card'),
+    'external_id': ('id', 'fitid'),
+}
+
+TRANSACTION_TYPE_ALIASES = {
+    'income': 'income', 'receita': 'income', 'credit': 'income', 'credito': 'income', 'crédito': 'income',
+    'expense': 'expense', 'despesa': 'expense', 'debit': 'expense', 'debito': 'expense', 'débito': 'expense',
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d.%m.%Y', '%Y%m%d')
+
+OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<\r\n]*)')
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    def __str__(self):
+        return f"{self.created} importadas, {self.duplicates} duplicadas, {self.invalid} inválidas"
+
+
+def parse_amount(value):
+    value = (value or '').strip().replace('R$', '').replace(' ', '')
+    if ',' in value:
+        # Formato brasileiro: 1.234,56
+        value = value.replace('.', '').replace(',', '.')
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: {value!r}")
+
+
+def parse_day(value, date_formats=DATE_FORMATS):
+    """Retorna a data e o formato que a reconheceu."""
+    value = (value or '').strip()[:10]
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(value, date_format).date(), date_format
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: {value!r}")
+
+
+def read_csv(lines):
+    """Lê um CSV linha a linha e gera dicionários com as chaves de `CSV_COLUMNS`."""
+    sample = next(lines, '')
+    delimiter = ';' if sample.count(';') > sample.count(',') else ','
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = [name.strip().lower() for name in next(csv.reader([sample], delimiter=delimiter), [])]
+    positions = {
+        field: next((header.index(alias) for alias in aliases if alias in header), None)
+        for field, aliases in CSV_COLUMNS.items()
+    }
+    for values in reader:
+        if not any(values):
+            continue
+        yield {
+            field: values[position] if position is not None and position < len(values) else ''
+            for field, position in positions.items()
+        }
+
+
+def read_ofx(lines):
+    """
+    Lê um extrato OFX (SGML 1.x ou XML 2.x) linha a linha, sem carregar o arquivo,
+    e gera um dicionário por <STMTTRN>.
+    """
+    current = None
+    for line in lines:
+        for closing, tag, value in OFX_TAG.findall(line):
+            if tag == 'STMTTRN':
+                if closing:
+                    if current is not None:
+                        yield current
+                    current = None
+                else:
+                    current = {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+    # No SGML o último bloco pode não ser fechado
+    if current:
+        yield current
+
+
+def _ofx_rows(lines):
+    for entry in read_ofx(lines):
+        amount = entry.get('TRNAMT', '')
+        yield {
+            'date': entry.get('DTPOSTED', '')[:8],
+            'amount': amount,
+            'description': entry.get('NAME') or entry.get('MEMO', ''),
+            'transaction_type': '',
+            'category': '',
+            'account': '',
+            'card': '',
+            'external_id': entry.get('FITID', ''),
+        }
+
+
+class StatementImporter:
+    """
+    Importa as linhas de um extrato como transações do usuário.
+
+    As linhas são lidas em streaming e gravadas com bulk_create em lotes dentro de
+    uma transação. Cada linha recebe um hash do seu conteúdo (`Transaction.import_hash`);
+    linhas cujo hash já existe são ignoradas, então reimportar o mesmo arquivo só custa
+    uma consulta indexada por lote.
+    """
+
+    def __init__(self, user, account=None, card=None, batch_size=IMPORT_BATCH_SIZE):
+        self.user = user
+        self.account = account
+        self.card = card
+        self.batch_size = batch_size
+        self.result = ImportResult()
+
+        # Carteiras e categorias do usuário carregadas uma única vez
+        self.categories = {category.name.lower(): category for category in Category.objects.filter(user=user)}
+        self.accounts = {account.name.lower(): account for account in Account.objects.filter(user=user)}
+        self.cards = {card.card_name.lower(): card for card in Card.objects.filter(user=user)}
+        self._occurrences = {}
+        self._date_formats = DATE_FORMATS
+        self._categorizer = None
+
+    def import_file(self, lines, file_format):
+        rows = _ofx_rows(lines) if file_format == 'ofx' else read_csv(lines)
+        transactions = filter(None, (self._build(row) for row in rows))
+        with transaction.atomic():
+            while batch := list(islice(transactions, self.batch_size)):
+                self._write(batch)
+        return self.result
+
+    def _category(self, name):
+        if not name:
+            return None
+        category = self.categories.get(name.lower())
+        if category is None:
+            category, _ = Category.objects.get_or_create(user=self.user, name=name)
+            self.categories[name.lower()] = category
+        return category
+
+    def _wallet(self, row):
+        if self.account or self.card:
+            return self.account, self.card
+        if row['card']:
+            # Cartões não podem ser criados a partir do extrato (falta o número)
+            card = self.cards.get(row['card'].lower())
+            if card is None:
+                raise ValueError(f"Cartão desconhecido: {row['card']!r}")
+            return None, card
+        if row['account']:
+            account = self.accounts.get(row['account'].lower())
+            if account is None:
+                account = Account.objects.create(user=self.user, name=row['account'])
+                self.accounts[row['account'].lower()] = account
+            return account, None
+        return None, None
+
+    def _hash(self, account, card, day, amount, description, external_id):
+        content = '|'.join((
+            str(self.user.pk), str(account.pk if account else ''), str(card.pk if card else ''),
+            day.isoformat(), str(amount), description, external_id,
+        ))
+        # Linhas idênticas no mesmo arquivo (duas compras iguais no mesmo dia) são
+        # diferenciadas pela ordem em que aparecem, o que se mantém numa reimportação
+        occurrence = self._occurrences.get(content, 0)
+        self._occurrences[content] = occurrence + 1
+        return hashlib.sha256(f'{content}|{occurrence}'.encode()).hexdigest()
+
+    def _build(self, row):
+        try:
+            day, date_format = parse_day(row['date'], self._date_formats)
+            amount = parse_amount(row['amount'])
+            account, card = self._wallet(row)
+        except ValueError:
+            self.result.invalid += 1
+            return None
+
+        if date_format != self._date_formats[0]:
+            # Um extrato usa sempre o mesmo formato: o que funcionou passa a ser tentado primeiro
+            self._date_formats = (date_format,) + tuple(f for f in DATE_FORMATS if f != date_format)
+
+        transaction_type = TRANSACTION_TYPE_ALIASES.get(row['transaction_type'].strip().lower())
+        if transaction_type is None:
+            # Sem coluna de tipo, o sinal do valor define receita ou despesa
+            transaction_type = 'expense' if amount < 0 else 'income'
+        description = row['description'].strip()[:255]
+
+        # Só os valores dos campos: as instâncias do modelo são criadas depois da
+        # checagem de duplicatas, o que deixa a reimportação barata
+        category = self._category(row['category'].strip())
+        return {
+            'account_id': account.pk if account else None,
+            'card_id': card.pk if card else None,
+            'amount': abs(amount),
+            'transaction_type': transaction_type,
+            'description': description,
+            'category_id': category.pk if category else None,
+            'date': day,
+            'import_hash': self._hash(account, card, day, amount, description, row['external_id'].strip()),
+        }
+
+    def _new_transactions(self, batch):
+        existing = set(
+            # Só pelo hash (que já inclui o usuário), para o SQLite usar o índice único
+            Transaction.objects.filter(import_hash__in=[fields['import_hash'] for fields in batch]).order_by()
+            .values_list('import_hash', flat=True)
+        )
+        new = [Transaction(user_id=self.user.pk, **fields) for fields in batch if fields['import_hash'] not in existing]
+
+        # As linhas sem categoria recebem a sugerida pelas regras e pelo histórico do
+        # usuário (índice carregado uma vez por importação)
+        uncategorized = [item for item in new if item.category_id is None]
+        if uncategorized:
+            if self._categorizer is None:
+                self._categorizer = Categorizer(self.user.pk)
+            for item in uncategorized:
+                item.category_id = self._categorizer.classify(item.description)
+        return new
+
+    def _write(self, batch):
+        new = self._new_transactions(batch)
+        if new:
+            try:
+                # Savepoint próprio: se uma importação concorrente gravou parte do lote, a
+                # restrição única falha e só as linhas que ainda faltam são inseridas. Os totais
+                # abaixo contam apenas as linhas gravadas por esta importação.
+                with transaction.atomic():
+                    Transaction.objects.bulk_create(new)
+            except IntegrityError:
+                new = self._new_transactions(batch)
+                Transaction.objects.bulk_create(new)
+        self.result.duplicates += len(batch) - len(new)
+        if not new:
+            return
+
+        # Só as categorias vindas do extrato ensinam o índice, não as sugeridas por ele
+        inserted = {item.import_hash for item in new}
+        learn(self.user.pk, added=[
+            (fields['description'], fields['category_id']) for fields in batch if fields['import_hash'] in inserted
+        ])
+        # bulk_create não dispara sinais: resumos mensais, saldos e faturas são atualizados em lote
+        snapshots = [transaction_snapshot(item) for item in new]
+        apply_many_to_summaries(snapshots)
+        apply_to_ledger(snapshots)
+        apply_to_statements(snapshots)
+        bump_data_version(self.user.pk)
+        self.result.created += len(new)
+
+
+def import_statement(user, lines, file_format, account=None, card=None, batch_size=IMPORT_BATCH_SIZE):
+    """Importa um extrato CSV ou OFX (iterável de linhas de texto) e retorna um `ImportResult`."""
+    lines = iter(lines)
+    return StatementImporter(user, account=account, card=card, batch_size=batch_size).import_file(lines, file_format)
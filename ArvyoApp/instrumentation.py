@@ -0,0 +1,229 @@
+import json
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger('ArvyoApp.requests')
+
+# Amostras guardadas por view para os percentis (janela móvel, por processo)
+ROLLING_WINDOW = 500
+# A mesma consulta repetida tantas vezes numa requisição indica um N+1
+DUPLICATE_THRESHOLD = 5
+# Trecho do SQL gravado no log para identificar a consulta repetida
+SQL_PREVIEW = 200
+
+# Métricas da requisição em andamento. Uma ContextVar acompanha a requisição nas threads
+# do `sync_to_async` (views síncronas sob ASGI), onde cada thread tem a sua própria conexão
+_current = ContextVar('request_metrics', default=None)
+
+# {nome da view: deque de (total, sql, render, consultas, repetidas)}
+_samples = {}
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'sql_time', 'render_time', 'fingerprints')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        # O SQL chega com os parâmetros separados (%s): o texto já é a "impressão digital"
+        self.fingerprints = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.fingerprints[sql] = self.fingerprints.get(sql, 0) + 1
+
+    def duplicates(self):
+        """Consultas repetidas acima do limite, da mais repetida para a menos."""
+        repeated = [(count, sql) for sql, count in self.fingerprints.items() if count >= DUPLICATE_THRESHOLD]
+        return sorted(repeated, reverse=True)
+
+
+def _execute(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """
+    Receptor de `connection_created` (ligado em `apps.py`): toda conexão, de qualquer
+    thread, passa a medir as consultas da requisição em andamento. Fica no início da
+    lista para não atrapalhar os `execute_wrapper` temporários, que removem o último item.
+    """
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute)
+
+
+@contextmanager
+def measure():
+    """Mede as consultas e a renderização feitas dentro do bloco, ex: num benchmark."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.render_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    Backend de templates do Django que soma o tempo de renderização na requisição em
+    andamento. Só a renderização de nível mais alto é medida (includes e extends ficam
+    dentro dela); consultas feitas pelo template contam também no tempo de SQL.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '-'
+    return match.view_name or match._func_path
+
+
+def _record(view, total, metrics, repeated):
+    samples = _samples.get(view)
+    if samples is None:
+        samples = _samples.setdefault(view, deque(maxlen=ROLLING_WINDOW))
+    samples.append((total, metrics.sql_time, metrics.render_time, metrics.queries, len(repeated)))
+
+
+def _percentile(ordered, percent):
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+def view_stats():
+    """
+    Percentis da janela móvel de cada view deste processo (em ms), da view mais lenta
+    no p95 para a mais rápida.
+    """
+    stats = []
+    for view, samples in list(_samples.items()):
+        samples = list(samples)
+        if not samples:
+            continue
+        totals = sorted(sample[0] * 1000 for sample in samples)
+        count = len(samples)
+        stats.append({
+            'view': view,
+            'requests': count,
+            'p50': _percentile(totals, 50),
+            'p95': _percentile(totals, 95),
+            'p99': _percentile(totals, 99),
+            'max': totals[-1],
+            'queries': sum(sample[3] for sample in samples) / count,
+            'sql': sum(sample[1] for sample in samples) * 1000 / count,
+            'render': sum(sample[2] for sample in samples) * 1000 / count,
+            'n_plus_one': sum(1 for sample in samples if sample[4]),
+        })
+    return sorted(stats, key=lambda row: row['p95'], reverse=True)
+
+
+def reset_stats():
+    _samples.clear()
+
+
+class RequestMetricsMiddleware:
+    """
+    Mede cada requisição: número de consultas e tempo de SQL (via `execute_wrapper`),
+    tempo de renderização dos templates e consultas repetidas (N+1). O resultado vai no
+    cabeçalho Server-Timing, numa linha de log em JSON no logger "ArvyoApp.requests" e
+    nos percentis por view da página de métricas. Funciona sob WSGI e ASGI; deve ser o
+    primeiro middleware da lista para medir também os demais.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Dentro de um `measure()` (benchmark) a requisição soma na medição de fora
+        metrics = _current.get() or RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = _current.get() or RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    def _finish(self, request, response, metrics, total):
+        repeated = metrics.duplicates()
+        view = _view_name(request)
+        _record(view, total, metrics, repeated)
+
+        response['Server-Timing'] = (
+            f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.queries} queries", '
+            f'render;dur={metrics.render_time * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+        if logger.isEnabledFor(logging.INFO) or repeated:
+            entry = {
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'sql_ms': round(metrics.sql_time * 1000, 2),
+                'render_ms': round(metrics.render_time * 1000, 2),
+                'queries': metrics.queries,
+            }
+            if repeated:
+                entry['duplicates'] = [{'count': count, 'sql': sql[:SQL_PREVIEW]} for count, sql in repeated]
+                logger.warning(json.dumps(entry))
+            else:
+                logger.info(json.dumps(entry))
+        return response
@@ -0,0 +1,217 @@
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+from .caching import bump_data_version
+from .models import Account, BalanceCheckpoint, Transaction
+from .summaries import SNAPSHOT_FIELDS, as_date
+
+ZERO = Decimal('0.00')
+
+# Pagamentos marcados como pagos por lote em `mark_paid`
+MARK_PAID_BATCH_SIZE = 1000
+
+# Transações que já movimentaram a conta: pagamentos futuros só contam depois de pagos
+SETTLED = Q(is_future_payment=False) | Q(is_paid=True)
+
+# Valor com sinal da transação: receitas somam, despesas subtraem
+SIGNED_AMOUNT = Case(
+    When(transaction_type='income', then=F('amount')),
+    When(transaction_type='expense', then=-F('amount')),
+    default=Value(ZERO),
+    output_field=DecimalField(max_digits=14, decimal_places=2),
+)
+
+
+def signed_amount(snapshot):
+    """Quanto a transação movimenta o saldo da sua conta (zero se não movimenta)."""
+    if snapshot['account_id'] is None:
+        return ZERO
+    if snapshot['is_future_payment'] and not snapshot['is_paid']:
+        return ZERO
+    amount = Decimal(snapshot['amount'])
+    if snapshot['transaction_type'] == 'income':
+        return amount
+    if snapshot['transaction_type'] == 'expense':
+        return -amount
+    return ZERO
+
+
+def apply_to_ledger(snapshots, sign=1):
+    """
+    Aplica (sign=1) ou desfaz (sign=-1) transações no saldo das contas e nos
+    checkpoints posteriores às suas datas. Todas as escritas são incrementos com F()
+    dentro de uma transação, então gravações concorrentes não perdem atualizações.
+    """
+    deltas = {}
+    for snapshot in snapshots:
+        amount = signed_amount(snapshot) * sign
+        if amount:
+            by_date = deltas.setdefault(snapshot['account_id'], {})
+            day = as_date(snapshot['date'])
+            by_date[day] = by_date.get(day, ZERO) + amount
+
+    with transaction.atomic():
+        for account_id, by_date in deltas.items():
+            total = sum(by_date.values(), ZERO)
+            Account.objects.filter(pk=account_id).update(balance=F('balance') + total)
+
+            if len(by_date) == 1:
+                # Caso comum (uma transação): um único UPDATE por intervalo no índice (account, date)
+                (day, amount), = by_date.items()
+                BalanceCheckpoint.objects.filter(account_id=account_id, date__gte=day).update(
+                    balance=F('balance') + amount
+                )
+                continue
+
+            # Em lote: cada checkpoint recebe a soma das transações até a sua data
+            first_day = min(by_date)
+            checkpoints = BalanceCheckpoint.objects.filter(account_id=account_id, date__gte=first_day)
+            for pk, checkpoint_day in checkpoints.values_list('pk', 'date'):
+                amount = sum((value for day, value in by_date.items() if day <= checkpoint_day), ZERO)
+                if amount:
+                    BalanceCheckpoint.objects.filter(pk=pk).update(balance=F('balance') + amount)
+
+
+def mark_paid(transactions, batch_size=MARK_PAID_BATCH_SIZE):
+    """
+    Marca como pagos os pagamentos futuros pendentes de `transactions` (ex: uma seleção
+    do admin), em lotes pela chave primária: um UPDATE por lote e o saldo das contas e
+    os checkpoints acertados de uma vez com `apply_to_ledger`. Retorna quantos foram pagos.
+    """
+    pending = transactions.filter(is_future_payment=True, is_paid=False).order_by('pk')
+    paid = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            # Lidos dentro da transação: nenhum pagamento do lote é aplicado duas vezes
+            snapshots = list(pending.filter(pk__gt=last_pk).values('pk', *SNAPSHOT_FIELDS)[:batch_size])
+            if not snapshots:
+                return paid
+            last_pk = snapshots[-1]['pk']
+            paid += Transaction.objects.filter(pk__in=[snapshot['pk'] for snapshot in snapshots]).update(is_paid=True)
+            # Pendentes não movimentavam o saldo: basta aplicar a versão paga
+            for snapshot in snapshots:
+                snapshot['is_paid'] = True
+            apply_to_ledger(snapshots)
+            for user_id in {snapshot['user_id'] for snapshot in snapshots}:
+                bump_data_version(user_id)
+
+
+def _settled_sum(account, start=None, end=None):
+    # Soma com sinal das transações liquidadas no intervalo (start, end]
+    transactions = Transaction.objects.for_account(account).filter(SETTLED)
+    if start is not None:
+        transactions = transactions.filter(date__gt=start)
+    if end is not None:
+        transactions = transactions.filter(date__lte=end)
+    return transactions.order_by().aggregate(total=Sum(SIGNED_AMOUNT, default=ZERO))['total']
+
+
+def balance_at(account, day):
+    """
+    Saldo da conta ao final do dia `day`.
+
+    Parte do checkpoint mais próximo anterior (ou, na falta dele, do posterior ou do
+    saldo atual) e soma só as transações entre o checkpoint e a data, em vez de
+    reprocessar todo o histórico.
+    """
+    checkpoints = BalanceCheckpoint.objects.filter(account=account)
+    before = checkpoints.filter(date__lte=day).order_by('-date').first()
+    if before is not None:
+        return before.balance + _settled_sum(account, start=before.date, end=day)
+
+    after = checkpoints.filter(date__gt=day).order_by('date').first()
+    if after is not None:
+        return after.balance - _settled_sum(account, start=day, end=after.date)
+
+    return account.balance - _settled_sum(account, start=day)
+
+
+def balances_at(accounts, day):
+    """
+    Versão em lote de `balance_at` para um queryset de contas: {conta: saldo ao final de
+    `day`}, na ordem do queryset. São duas consultas para qualquer número de contas: as
+    contas com os checkpoints vizinhos de `day` (subconsultas pelo índice (account, date))
+    e a soma agrupada das transações entre cada checkpoint e a data.
+    """
+    checkpoints = BalanceCheckpoint.objects.filter(account=OuterRef('pk'))
+    before = checkpoints.filter(date__lte=day).order_by('-date')
+    after = checkpoints.filter(date__gt=day).order_by('date')
+    accounts = list(accounts.annotate(
+        before_date=Subquery(before.values('date')[:1]),
+        before_balance=Subquery(before.values('balance')[:1]),
+        after_date=Subquery(after.values('date')[:1]),
+        after_balance=Subquery(after.values('balance')[:1]),
+    ))
+
+    # Mesma escolha de `balance_at`: (base, sinal, intervalo (início, fim]) de cada conta
+    anchors = {}
+    for account in accounts:
+        if account.before_date is not None:
+            anchors[account.pk] = (account.before_balance, 1, account.before_date, day)
+        elif account.after_date is not None:
+            anchors[account.pk] = (account.after_balance, -1, day, account.after_date)
+        else:
+            anchors[account.pk] = (account.balance, -1, day, None)
+
+    intervals = Q()
+    for account_id, (_, _, start, end) in anchors.items():
+        if end is None:
+            intervals |= Q(account_id=account_id, date__gt=start)
+        elif start < end:
+            intervals |= Q(account_id=account_id, date__gt=start, date__lte=end)
+    totals = {}
+    if intervals:
+        totals = dict(
+            Transaction.objects.filter(intervals).filter(SETTLED).order_by()
+            .values('account_id')
+            .annotate(total=Sum(SIGNED_AMOUNT))
+            .values_list('account_id', 'total')
+        )
+
+    balances = {}
+    for account in accounts:
+        base, sign, _, _ = anchors[account.pk]
+        balances[account] = base + sign * totals.get(account.pk, ZERO)
+    return balances
+
+
+def month_end(day):
+    return date(day.year, day.month, calendar.monthrange(day.year, day.month)[1])
+
+
+def create_monthly_checkpoints(account):
+    """
+    (Re)cria um checkpoint ao final de cada mês com movimento da conta, com uma
+    consulta agrupada por mês. Retorna a quantidade de checkpoints gravados.
+    """
+    monthly = (
+        Transaction.objects.for_account(account).filter(SETTLED).order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(total=Sum(SIGNED_AMOUNT))
+        .order_by('month')
+    )
+
+    with transaction.atomic():
+        # Trava a conta para o saldo não mudar enquanto os checkpoints são calculados
+        account = Account.objects.select_for_update().get(pk=account.pk)
+        rows = list(monthly)
+        running = account.balance - sum((row['total'] for row in rows), ZERO)
+        checkpoints = []
+        for row in rows:
+            running += row['total']
+            checkpoints.append(BalanceCheckpoint(account=account, date=month_end(row['month']), balance=running))
+
+        BalanceCheckpoint.objects.bulk_create(
+            checkpoints,
+            update_conflicts=True,
+            unique_fields=['account', 'date'],
+            update_fields=['balance'],
+        )
+    return len(checkpoints)
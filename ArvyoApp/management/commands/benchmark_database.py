@@ -0,0 +1,132 @@
+import statistics
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from ArvyoApp import analytics
+from ArvyoApp.caching import bump_data_version
+from ArvyoApp.database import use_replica
+from ArvyoApp.models import Account, Transaction
+from ArvyoApp.wallets import get_wallets_context
+
+# Perfis comparados: o de produção (settings.SQLITE_PRAGMAS) e o padrão do SQLite
+JOURNAL_MODES = {
+    'wal': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+    'delete': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+}
+BENCHMARK_DESCRIPTION = 'benchmark_database'
+
+
+def _percentile(ordered, percent):
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga mista de leituras (carteiras e fluxo de caixa, pela réplica) e escritas "
+        "(transações novas, com resumos, razão e faturas) em threads simultâneas, no modo WAL "
+        "e no journal padrão do SQLite. As transações criadas são apagadas no final, mas o "
+        "modo do journal fica gravado no arquivo: rode numa cópia do banco, com o servidor parado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default='synthetic-0', help="Usuário sintético cujos dados são lidos e escritos.")
+        parser.add_argument('--readers', type=int, default=4, help="Threads só de leitura.")
+        parser.add_argument('--writers', type=int, default=2, help="Threads só de escrita.")
+        parser.add_argument('--duration', type=float, default=10.0, help="Segundos de carga por modo.")
+        parser.add_argument('modes', nargs='*', help="Modos a medir: delete e/ou wal (padrão: os dois).")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{options['user']}' não encontrado. Gere a massa com `generate_synthetic_data`.")
+        account = Account.objects.filter(user=user).order_by('pk').first()
+        if account is None:
+            raise CommandError(f"Usuário '{user.username}' não tem contas para receber as escritas.")
+        unknown = set(options['modes']) - set(JOURNAL_MODES)
+        if unknown:
+            raise CommandError(f"Modos desconhecidos: {', '.join(sorted(unknown))}.")
+
+        results = {}
+        for mode in options['modes'] or ['delete', 'wal']:
+            self.stdout.write(f"{mode}: {options['readers']} leitores e {options['writers']} escritores por {options['duration']:.0f}s...")
+            # O journal só muda sem outras conexões abertas no arquivo
+            connections.close_all()
+            with override_settings(SQLITE_PRAGMAS={**settings.SQLITE_PRAGMAS, **JOURNAL_MODES[mode]}):
+                try:
+                    results[mode] = self._run(user, account, options)
+                finally:
+                    self._cleanup(user)
+            connections.close_all()
+        self._report(results, options['duration'])
+
+    def _run(self, user, account, options):
+        deadline = time.perf_counter() + options['duration']
+        timings = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        lock = threading.Lock()
+        today = timezone.localdate()
+
+        def read():
+            with use_replica():
+                get_wallets_context(user)
+                analytics.monthly_cashflow(user, today)
+
+        def write():
+            with transaction.atomic():
+                Transaction.objects.create(
+                    user=user, account=account, amount=Decimal('1.00'), transaction_type='expense',
+                    description=BENCHMARK_DESCRIPTION, date=today,
+                )
+
+        def worker(kind, operation):
+            try:
+                while (start := time.perf_counter()) < deadline:
+                    try:
+                        operation()
+                    except OperationalError:
+                        # "database is locked" depois do timeout da conexão
+                        with lock:
+                            errors[kind] += 1
+                        continue
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        timings[kind].append(elapsed)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=('read', read)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=('write', write)) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, errors
+
+    def _cleanup(self, user):
+        # Um a um, para os sinais desfazerem a contribuição nos resumos, no razão e nas faturas
+        with transaction.atomic():
+            for created in Transaction.objects.filter(user=user, description=BENCHMARK_DESCRIPTION):
+                created.delete()
+        bump_data_version(user.pk)
+
+    def _report(self, results, duration):
+        self.stdout.write(f"\n{'modo':<8} {'operação':<9} {'ops/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'travado':>8}")
+        for mode, (timings, errors) in results.items():
+            for kind, label in (('read', 'leitura'), ('write', 'escrita')):
+                if not timings[kind]:
+                    self.stdout.write(self.style.ERROR(f"{mode:<8} {label:<9} nenhuma operação concluída ({errors[kind]} travadas)"))
+                    continue
+                ordered = sorted(timings[kind])
+                self.stdout.write(
+                    f"{mode:<8} {label:<9} {len(ordered) / duration:>8.1f} {statistics.median(ordered):>6.1f} ms "
+                    f"{_percentile(ordered, 95):>6.1f} ms {_percentile(ordered, 99):>6.1f} ms {errors[kind]:>8}"
+                )
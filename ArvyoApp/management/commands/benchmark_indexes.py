@@ -0,0 +1,131 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ArvyoApp.models import Account, Card, Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula uma massa sintética de transações e compara os planos (EXPLAIN) e os "
+        "tempos das consultas quentes sem e com os índices compostos de Transaction. "
+        "Tudo roda dentro de uma transação que é desfeita no final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Total de transações sintéticas.")
+        parser.add_argument('--users', type=int, default=50, help="Quantidade de usuários sintéticos.")
+        parser.add_argument('--repeat', type=int, default=5, help="Execuções por consulta (usa a mediana).")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with transaction.atomic():
+            user, account, card = self._populate(options)
+            queries = self._hot_queries(user, account, card)
+
+            # "Antes": remove os índices compostos para medir o cenário original
+            self._execute_index_sql(drop=True)
+            before = self._run(queries, options['repeat'])
+
+            # "Depois": recria os índices declarados no modelo
+            self._execute_index_sql(drop=False)
+            after = self._run(queries, options['repeat'])
+
+            self._report(queries, before, after)
+            transaction.set_rollback(True)
+
+    def _populate(self, options):
+        rows, users, batch_size = options['rows'], max(options['users'], 1), options['batch_size']
+        self.stdout.write(f"Gerando {rows} transações para {users} usuários...")
+
+        owners = []
+        for n in range(users):
+            owner = User.objects.create(username=f'bench-index-{n}')
+            owners.append((
+                owner,
+                Account.objects.create(user=owner, name='Conta Benchmark'),
+                Card.objects.create(user=owner, brand='visa', name_on_card='Benchmark',
+                                    card_number_masked='0000', expiration_date='12/30'),
+            ))
+
+        start = time.perf_counter()
+        first_day = date.today() - timedelta(days=365 * 5)
+        batch = []
+        for i in range(rows):
+            owner, account, card = owners[i % users]
+            on_card = random.random() < 0.3
+            batch.append(Transaction(
+                user=owner,
+                account=None if on_card else account,
+                card=card if on_card else None,
+                amount=Decimal(random.randint(100, 50_000)) / 100,
+                transaction_type='expense' if random.random() < 0.7 else 'income',
+                description='Transação sintética',
+                date=first_day + timedelta(days=random.randint(0, 365 * 5)),
+                is_future_payment=random.random() < 0.02,
+            ))
+            if len(batch) >= batch_size:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Transaction.objects.bulk_create(batch)
+        self.stdout.write(f"Massa criada em {time.perf_counter() - start:.1f}s\n")
+        return owners[0]
+
+    def _hot_queries(self, user, account, card):
+        start_of_month = date.today().replace(day=1)
+        year_ago = date.today() - timedelta(days=365)
+        return [
+            ('index: recentes', Transaction.objects.for_user(user).newest_first()[:5]),
+            ('index: mês atual', Transaction.objects.for_user(user).between(start=start_of_month)),
+            ('wallet_detail: conta', Transaction.objects.for_account(account).newest_first()[:50]),
+            ('wallet_detail: cartão', Transaction.objects.for_card(card).newest_first()[:50]),
+            ('analytics: despesas 12m', Transaction.objects.of_type(user, 'expense').between(start=year_ago)),
+            ('pagamentos pendentes', Transaction.objects.pending_payments(user).order_by('date')),
+        ]
+
+    def _execute_index_sql(self, drop):
+        # O DDL é executado direto no cursor (sem entrar no schema editor) para
+        # continuar dentro da transação que será desfeita; no SQLite e no
+        # PostgreSQL CREATE/DROP INDEX são transacionais.
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in Transaction._meta.indexes:
+                if drop:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+                else:
+                    cursor.execute(str(index.create_sql(Transaction, editor)))
+            # Atualiza as estatísticas para que o planejador enxergue a mudança
+            cursor.execute('ANALYZE')
+
+    def _run(self, queries, repeat):
+        results = []
+        for label, queryset in queries:
+            plan = queryset.explain()
+            timings = []
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            results.append((plan, statistics.median(timings)))
+        return results
+
+    def _report(self, queries, before, after):
+        for (label, _), (plan_before, ms_before), (plan_after, ms_after) in zip(queries, before, after):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  sem índices: {ms_before:9.2f} ms")
+            for line in plan_before.splitlines():
+                self.stdout.write(f"      {line}")
+            self.stdout.write(f"  com índices: {ms_after:9.2f} ms")
+            for line in plan_after.splitlines():
+                self.stdout.write(f"      {line}")
+            speedup = ms_before / ms_after if ms_after else float('inf')
+            self.stdout.write(self.style.SUCCESS(f"  ganho: {speedup:.1f}x\n"))
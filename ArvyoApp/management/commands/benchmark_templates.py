@@ -0,0 +1,82 @@
+import functools
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.contrib.messages.storage import default_storage
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from ArvyoApp import pages, urls
+from ArvyoApp.models import Account, Card
+from ArvyoApp.templatetags import home_tags
+
+
+def _percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o tempo de renderização de cada página HTML sem parâmetros na URL, com os "
+        "partials do layout (e as páginas fixas) renderizados a cada requisição e guardados em memória. "
+        "Roda com DEBUG=False dentro de uma transação que é desfeita no final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help="Renderizações por página e cenário.")
+        parser.add_argument('pages', nargs='*', help="Nomes de URL a medir (padrão: todas as páginas).")
+
+    def handle(self, *args, **options):
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), transaction.atomic():
+            user = User.objects.create(username='bench-templates')
+            Account.objects.create(user=user, name='Conta Benchmark', balance=1000)
+            Card.objects.create(user=user, brand='visa', name_on_card='Benchmark',
+                                card_number_masked='0000', expiration_date='12/30', limit=5000)
+
+            self.stdout.write(f"{'página':<32} {'sem fragmentos (mediana/p95)':>30} {'com fragmentos (mediana/p95)':>30}")
+            for name, path, view in self._pages(options['pages']):
+                if self._render(view, path, user) is None:
+                    continue
+                cold = self._measure(view, path, user, options['repeat'], clear=True)
+                warm = self._measure(view, path, user, options['repeat'], clear=False)
+                self.stdout.write(
+                    f"{name:<32} {cold[0]:>16.2f} / {cold[1]:>6.2f} ms {warm[0]:>16.2f} / {warm[1]:>6.2f} ms"
+                )
+            transaction.set_rollback(True)
+
+    def _pages(self, names):
+        # As URLs do app são montadas na raiz do site (Arvyo/urls.py)
+        for pattern in urls.urlpatterns:
+            if pattern.pattern.converters or (names and pattern.name not in names):
+                continue
+            route = str(pattern.pattern)
+            if route.startswith('api/'):
+                continue
+            yield pattern.name, '/' + route, functools.partial(pattern.callback, **pattern.default_args)
+
+    def _render(self, view, path, user):
+        request = RequestFactory().get(path)
+        request.user = user
+        request.session = SessionStore()
+        request._messages = default_storage(request)
+        response = view(request)
+        # Só páginas HTML respondidas direto (sem redirecionamento nem POST obrigatório)
+        if response.status_code != 200 or not response.get('Content-Type', '').startswith('text/html'):
+            return None
+        return response
+
+    def _measure(self, view, path, user, repeat, clear):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            if clear:
+                home_tags._static_fragments.clear()
+                pages._rendered_pages.clear()
+            start = time.perf_counter()
+            self._render(view, path, user)
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), _percentile(timings, 95)
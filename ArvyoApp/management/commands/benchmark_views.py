@@ -0,0 +1,154 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from ArvyoApp.instrumentation import measure
+from ArvyoApp.models import Account, Card
+from ArvyoApp.synthetic import SYNTHETIC_PASSWORD
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'views.json'
+# Diferenças menores que isso no p95 são ruído, mesmo acima da tolerância
+MIN_REGRESSION_MS = 1.0
+
+
+def _percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede as views principais (index, wallets, wallet_detail, settingsBank e signin) pelo "
+        "cliente de teste com a massa do `generate_synthetic_data`: percentis de latência e "
+        "consultas por requisição. Compara com o baseline gravado e falha se alguma view "
+        "regrediu ou se ainda não há baseline (grave com --update-baseline). Roda com DEBUG=False dentro de uma transação que é desfeita no final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default='synthetic-0', help="Usuário sintético usado nas páginas logadas.")
+        parser.add_argument('--password', default=SYNTHETIC_PASSWORD, help="Senha do usuário (para o signin).")
+        parser.add_argument('--repeat', type=int, default=30, help="Requisições medidas por cenário.")
+        parser.add_argument('--warmup', type=int, default=3, help="Requisições descartadas antes de medir.")
+        parser.add_argument('--cold', action='store_true', help="Limpa o cache antes de cada requisição.")
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument(
+            '--save-baseline', '--update-baseline', action='store_true', dest='save_baseline',
+            help="Grava os resultados como novo baseline (obrigatório enquanto não houver um).",
+        )
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Aumento aceito no p95 (0.25 = 25%%).")
+        parser.add_argument('scenarios', nargs='*', help="Cenários a medir (padrão: todos).")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{options['user']}' não encontrado. Gere a massa com `generate_synthetic_data`.")
+
+        mode = 'cold' if options['cold'] else 'warm'
+        # Sem baseline não há com o que comparar: falha antes de medir em vez de passar calada
+        baseline = self._load_baseline(options['baseline'])
+        if mode not in baseline and not options['save_baseline']:
+            raise CommandError(
+                f"Sem baseline ({mode}) em {options['baseline']}. Grave um com --update-baseline "
+                f"na máquina em que a comparação vai rodar."
+            )
+
+        results = {}
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']), transaction.atomic():
+            for name, login, method, path, data, expected in self._scenarios(user, options):
+                if options['scenarios'] and name not in options['scenarios']:
+                    continue
+                results[name] = self._measure(user if login else None, method, path, data, expected, options)
+            transaction.set_rollback(True)
+
+        regressions = self._report(results, baseline.get(mode, {}), options['tolerance'])
+
+        if options['save_baseline']:
+            baseline[mode] = {**baseline.get(mode, {}), **results}
+            options['baseline'].parent.mkdir(parents=True, exist_ok=True)
+            options['baseline'].write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline ({mode}) gravado em {options['baseline']}."))
+        elif regressions:
+            raise CommandError(f"Regressão ou cenário sem baseline: {', '.join(regressions)}.")
+
+    def _scenarios(self, user, options):
+        account = Account.objects.filter(user=user).order_by('pk').first()
+        card = Card.objects.filter(user=user).order_by('pk').first()
+        credentials = {'email': user.email or user.username, 'password': options['password']}
+        # (nome, logado, método, caminho, dados, status esperado)
+        yield 'index', True, 'get', reverse('index'), None, 200
+        yield 'wallets', True, 'get', reverse('wallets'), None, 200
+        if account is not None:
+            yield 'wallet_detail:account', True, 'get', reverse('wallet_detail', args=['account', account.pk]), None, 200
+        if card is not None:
+            yield 'wallet_detail:card', True, 'get', reverse('wallet_detail', args=['card', card.pk]), None, 200
+        yield 'settingsBank', True, 'get', reverse('settingsBank'), None, 200
+        yield 'signin:get', False, 'get', reverse('signin'), None, 200
+        yield 'signin:post', False, 'post', reverse('signin'), credentials, 302
+
+    def _request(self, user, method, path, data, expected, cold):
+        # Cliente novo a cada requisição: o signin só autentica quem ainda não está logado
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        if cold:
+            cache.clear()
+        with measure() as metrics:
+            start = time.perf_counter()
+            response = getattr(client, method)(path, data)
+            elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != expected:
+            raise CommandError(f"{method.upper()} {path} respondeu {response.status_code} (esperado {expected}).")
+        return elapsed, metrics.queries
+
+    def _measure(self, user, method, path, data, expected, options):
+        for _ in range(options['warmup']):
+            self._request(user, method, path, data, expected, options['cold'])
+        samples = [
+            self._request(user, method, path, data, expected, options['cold'])
+            for _ in range(max(options['repeat'], 1))
+        ]
+        timings = [elapsed for elapsed, _ in samples]
+        return {
+            'p50': round(statistics.median(timings), 3),
+            'p95': round(_percentile(timings, 95), 3),
+            'p99': round(_percentile(timings, 99), 3),
+            'queries': max(queries for _, queries in samples),
+        }
+
+    def _load_baseline(self, path):
+        if not path.is_file():
+            return {}
+        return json.loads(path.read_text())
+
+    def _report(self, results, baseline, tolerance):
+        regressions = []
+        self.stdout.write(f"{'cenário':<24} {'p50':>9} {'p95':>9} {'p99':>9} {'consultas':>10}   baseline p95 / consultas")
+        for name, result in results.items():
+            line = (
+                f"{name:<24} {result['p50']:>6.2f} ms {result['p95']:>6.2f} ms "
+                f"{result['p99']:>6.2f} ms {result['queries']:>10}"
+            )
+            base = baseline.get(name)
+            if base is None:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f"{line}   SEM BASELINE"))
+                continue
+            line += f"   {base['p95']:>6.2f} ms / {base['queries']}"
+            slower = result['p95'] > base['p95'] * (1 + tolerance) and result['p95'] - base['p95'] > MIN_REGRESSION_MS
+            if slower or result['queries'] > base['queries']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f"{line}   REGRESSÃO"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{line}   ok"))
+        return regressions
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ArvyoApp.caching import cache_stats
+
+
+class Command(BaseCommand):
+    help = "Mostra os acertos e falhas do cache por usuário (contextos e fragmentos)."
+
+    def handle(self, *args, **options):
+        for name, (hits, misses) in cache_stats().items():
+            total = hits + misses
+            ratio = hits / total * 100 if total else 0
+            self.stdout.write(f"{name:<24} hits: {hits:>8}  misses: {misses:>8}  taxa: {ratio:5.1f}%")
@@ -0,0 +1,32 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ArvyoApp.categorization import CLASSIFY_BATCH_SIZE, categorize_uncategorized
+
+
+class Command(BaseCommand):
+    help = "Atribui categoria às transações sem categoria, pelas regras de categoria e pelo histórico de cada usuário."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username de um único usuário (padrão: todos).")
+        parser.add_argument('--batch-size', type=int, default=CLASSIFY_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"Usuário '{options['user']}' não encontrado.")
+
+        start = time.perf_counter()
+        examined = categorized = 0
+        for user in users.iterator():
+            user_examined, user_categorized = categorize_uncategorized(user, batch_size=options['batch_size'])
+            examined += user_examined
+            categorized += user_categorized
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{categorized} de {examined} transações sem categoria foram categorizadas em {elapsed:.2f}s."
+        ))
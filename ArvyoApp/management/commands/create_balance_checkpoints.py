@@ -0,0 +1,31 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ArvyoApp.ledger import create_monthly_checkpoints
+from ArvyoApp.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava um checkpoint de saldo ao final de cada mês com movimento, para cada conta. "
+        "Feito para rodar periodicamente (ex: cron diário)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username de um único usuário (padrão: todos).")
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.all()
+        if options['user']:
+            if not User.objects.filter(username=options['user']).exists():
+                raise CommandError(f"Usuário '{options['user']}' não encontrado.")
+            accounts = accounts.filter(user__username=options['user'])
+
+        start = time.perf_counter()
+        created = 0
+        for account in accounts.iterator():
+            created += create_monthly_checkpoints(account)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{created} checkpoints de saldo gravados em {elapsed:.2f}s."))
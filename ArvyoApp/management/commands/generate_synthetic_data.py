@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ArvyoApp.synthetic import SYNTHETIC_PASSWORD, generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma massa sintética realista (usuários com contas, cartões, categorias e "
+        "transações) para benchmarks. Os usuários se chamam <prefixo>-0, <prefixo>-1, ... "
+        "e ficam no banco; cada um é gravado na sua própria transação."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--accounts', type=int, default=3, help="Contas por usuário.")
+        parser.add_argument('--cards', type=int, default=2, help="Cartões por usuário.")
+        parser.add_argument('--transactions', type=int, default=20_000, help="Transações por usuário.")
+        parser.add_argument('--years', type=int, default=3, help="Anos de histórico até hoje.")
+        parser.add_argument('--prefix', default='synthetic')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f"Já existem usuários '{prefix}-*'. Use outro --prefix ou remova-os antes.")
+
+        start = time.perf_counter()
+        users = generate(
+            users=options['users'],
+            prefix=prefix,
+            seed=options['seed'],
+            accounts=options['accounts'],
+            cards=options['cards'],
+            transactions=options['transactions'],
+            years=options['years'],
+            batch_size=options['batch_size'],
+        )
+        for user in users:
+            self.stdout.write(f"{user.username}: {options['transactions']} transações ({time.perf_counter() - start:.1f}s)")
+        elapsed = time.perf_counter() - start
+        total = options['users'] * options['transactions']
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} transações de {options['users']} usuários geradas em {elapsed:.2f}s "
+            f"(senha dos usuários: {SYNTHETIC_PASSWORD})."
+        ))
@@ -0,0 +1,49 @@
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ArvyoApp.importers import IMPORT_BATCH_SIZE, import_statement
+from ArvyoApp.models import Account, Card
+
+
+class Command(BaseCommand):
+    help = "Importa um extrato bancário (CSV ou OFX) como transações de um usuário."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Caminho do arquivo do extrato.")
+        parser.add_argument('--user', required=True, help="Username do dono das transações.")
+        parser.add_argument('--account', type=int, help="ID da conta de destino.")
+        parser.add_argument('--card', type=int, help="ID do cartão de destino.")
+        parser.add_argument('--format', choices=['csv', 'ofx'], help="Padrão: deduzido pela extensão.")
+        parser.add_argument('--encoding', default='utf-8-sig')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{options['user']}' não encontrado.")
+
+        account = card = None
+        try:
+            if options['account']:
+                account = Account.objects.get(pk=options['account'], user=user)
+            if options['card']:
+                card = Card.objects.get(pk=options['card'], user=user)
+        except (Account.DoesNotExist, Card.DoesNotExist):
+            raise CommandError("Carteira de destino não encontrada para este usuário.")
+
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in ('csv', 'ofx'):
+            raise CommandError("Formato não reconhecido; use --format csv ou --format ofx.")
+
+        start = time.perf_counter()
+        with open(options['path'], encoding=options['encoding'], errors='replace', newline='') as statement:
+            result = import_statement(
+                user, statement, file_format,
+                account=account, card=card, batch_size=options['batch_size'],
+            )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{result} em {elapsed:.2f}s."))
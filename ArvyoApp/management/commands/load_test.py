@@ -0,0 +1,192 @@
+import asyncio
+import re
+import statistics
+import time
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from ArvyoApp.models import Account, Card
+from ArvyoApp.synthetic import SYNTHETIC_PASSWORD
+
+CSRF_FIELD = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def _percentile(ordered, percent):
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+class HTTPConnection:
+    """Cliente HTTP/1.1 mínimo com keep-alive sobre asyncio (sem dependências externas)."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        if parts.scheme != 'http':
+            raise CommandError(f"Só URLs http:// são suportadas: {base_url}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.netloc = parts.netloc
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method, path, headers=(), body=b''):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.netloc}', *headers]
+        if body:
+            lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            # O servidor fechou a conexão ociosa: tenta de novo numa conexão nova
+            await self.close()
+            return await self.request(method, path, headers, body)
+        status = int(status_line.split()[1])
+        response_headers = []
+        while (line := await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.append((name.strip().lower(), value.strip()))
+        fields = dict(response_headers)
+
+        if 'content-length' in fields:
+            content = await self.reader.readexactly(int(fields['content-length']))
+        elif fields.get('transfer-encoding', '').lower() == 'chunked':
+            content = b''
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                content += await self.reader.readexactly(size)
+                await self.reader.readline()
+            await self.reader.readline()
+        else:
+            content = await self.reader.read()
+            await self.close()
+        if fields.get('connection', '').lower() == 'close' and self.writer is not None:
+            await self.close()
+        return status, response_headers, content
+
+
+def _cookies(headers):
+    return {
+        value.split('=', 1)[0]: value.split(';', 1)[0].split('=', 1)[1]
+        for name, value in headers if name == 'set-cookie'
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga contra servidores já no ar, ex: gunicorn (Arvyo.wsgi) e uvicorn "
+        "(Arvyo.asgi) com o mesmo número de workers e o mesmo banco. Entra com o usuário "
+        "sintético e mede requisições por segundo e percentis de latência do painel e das "
+        "carteiras em cada --url, lado a lado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', required=True, help="Ex: http://127.0.0.1:8000 (repita para comparar).")
+        parser.add_argument('--user', default='synthetic-0')
+        parser.add_argument('--password', default=SYNTHETIC_PASSWORD)
+        parser.add_argument('--concurrency', type=int, default=32, help="Conexões simultâneas por servidor.")
+        parser.add_argument('--duration', type=float, default=20.0, help="Segundos de carga por servidor.")
+        parser.add_argument('--warmup', type=float, default=3.0, help="Segundos de carga descartados antes de medir.")
+        parser.add_argument('paths', nargs='*', help="Caminhos a exercitar (padrão: painel, carteiras e detalhes).")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{options['user']}' não encontrado. Gere a massa com `generate_synthetic_data`.")
+        paths = options['paths'] or self._default_paths(user)
+
+        results = []
+        for base_url in options['url']:
+            self.stdout.write(f"{base_url}: {options['concurrency']} conexões por {options['duration']:.0f}s...")
+            results.append((base_url, asyncio.run(self._run(base_url, user, paths, options))))
+        self._report(results)
+
+    def _default_paths(self, user):
+        paths = [reverse('index'), reverse('wallets')]
+        account = Account.objects.filter(user=user).order_by('pk').first()
+        card = Card.objects.filter(user=user).order_by('pk').first()
+        if account is not None:
+            paths.append(reverse('wallet_detail', args=['account', account.pk]))
+        if card is not None:
+            paths.append(reverse('wallet_detail', args=['card', card.pk]))
+        return paths
+
+    async def _login(self, base_url, user, password):
+        connection = HTTPConnection(base_url)
+        signin = reverse('signin')
+        try:
+            status, headers, content = await connection.request('GET', signin)
+            csrf_cookie = _cookies(headers).get('csrftoken')
+            token = CSRF_FIELD.search(content)
+            if status != 200 or not csrf_cookie or not token:
+                raise CommandError(f"{base_url}{signin} não devolveu o formulário com CSRF (status {status}).")
+            body = urlencode({
+                'email': user.email or user.username,
+                'password': password,
+                'csrfmiddlewaretoken': token.group(1).decode(),
+            }).encode()
+            status, headers, _ = await connection.request('POST', signin, [
+                f'Cookie: csrftoken={csrf_cookie}',
+                f'Referer: {base_url}{signin}',
+                'Content-Type: application/x-www-form-urlencoded',
+            ], body)
+        finally:
+            await connection.close()
+        session = _cookies(headers).get('sessionid')
+        if status != 302 or not session:
+            raise CommandError(f"Login em {base_url} falhou (status {status}).")
+        return f'Cookie: sessionid={session}; csrftoken={csrf_cookie}'
+
+    async def _run(self, base_url, user, paths, options):
+        cookie = await self._login(base_url, user, options['password'])
+        loop = asyncio.get_running_loop()
+        measure_from = loop.time() + options['warmup']
+        deadline = measure_from + options['duration']
+        latencies, errors = [], 0
+
+        async def worker(offset):
+            nonlocal errors
+            connection = HTTPConnection(base_url)
+            n = offset
+            try:
+                while (now := loop.time()) < deadline:
+                    path = paths[n % len(paths)]
+                    n += 1
+                    start = time.perf_counter()
+                    try:
+                        status, _, _ = await connection.request('GET', path, [cookie])
+                    except (OSError, asyncio.IncompleteReadError):
+                        status = None
+                        await connection.close()
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if now < measure_from:
+                        continue
+                    if status == 200:
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+            finally:
+                await connection.close()
+
+        await asyncio.gather(*(worker(n) for n in range(options['concurrency'])))
+        return latencies, errors, options['duration']
+
+    def _report(self, results):
+        self.stdout.write(f"\n{'servidor':<32} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'erros':>7}")
+        for base_url, (latencies, errors, duration) in results:
+            if not latencies:
+                self.stdout.write(self.style.ERROR(f"{base_url:<32} nenhuma resposta 200 ({errors} erros)"))
+                continue
+            ordered = sorted(latencies)
+            self.stdout.write(
+                f"{base_url:<32} {len(latencies) / duration:>9.1f} {statistics.median(ordered):>6.1f} ms "
+                f"{_percentile(ordered, 95):>6.1f} ms {_percentile(ordered, 99):>6.1f} ms {errors:>7}"
+            )
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ArvyoApp.recurring import HORIZON_DAYS, RULES_BATCH_SIZE, materialize_recurring
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria as transações futuras das regras recorrentes até o horizonte informado. "
+        "Pode ser agendado (cron) com qualquer frequência: execuções repetidas ou simultâneas não duplicam transações."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int, default=HORIZON_DAYS)
+        parser.add_argument('--batch-size', type=int, default=RULES_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rules, created = materialize_recurring(horizon_days=options['horizon_days'], batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{rules} regras processadas, {created} transações criadas em {elapsed:.2f}s."
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ArvyoApp.archiving import PURGE_BATCH_SIZE, purge_archived_wallets
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga as contas e cartões arquivados pelos usuários e as suas transações, em lotes. "
+        "Pode ser agendado (cron) com qualquer frequência: uma execução interrompida continua na próxima."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0.0, help="Segundos de espera entre os lotes (libera o banco para outras escritas).")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        wallets, deleted = purge_archived_wallets(batch_size=options['batch_size'], pause=options['pause'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{wallets} carteiras arquivadas removidas, {deleted} transações apagadas em {elapsed:.2f}s."
+        ))
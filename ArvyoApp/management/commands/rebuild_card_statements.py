@@ -0,0 +1,32 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ArvyoApp.caching import bump_data_version
+from ArvyoApp.models import Card
+from ArvyoApp.statements import rebuild_card_statements
+
+
+class Command(BaseCommand):
+    help = "Reconstrói as faturas dos cartões a partir das transações."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username de um único usuário (padrão: todos).")
+
+    def handle(self, *args, **options):
+        cards = Card.objects.all()
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"Usuário '{options['user']}' não encontrado.")
+            cards = cards.filter(user=user)
+
+        start = time.perf_counter()
+        created = sum(rebuild_card_statements([card]) for card in cards.iterator())
+        # Carteiras e limites disponíveis guardados em cache foram montados com as faturas antigas
+        bump_data_version(user.pk if user else None)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{created} faturas reconstruídas em {elapsed:.2f}s."))
@@ -0,0 +1,30 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ArvyoApp.caching import bump_data_version
+from ArvyoApp.summaries import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = "Reconstrói a tabela de resumos mensais a partir das transações."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username de um único usuário (padrão: todos).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"Usuário '{options['user']}' não encontrado.")
+
+        start = time.perf_counter()
+        created = rebuild_monthly_summaries(user=user, batch_size=options['batch_size'])
+        # Painel, carteiras e análises guardados em cache foram montados com os resumos antigos
+        bump_data_version(user.pk if user else None)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{created} resumos mensais reconstruídos em {elapsed:.2f}s."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from ArvyoApp.icons import TRIMMED_CSS, font_subset, trim_icon_css, used_icon_classes
+from ArvyoApp.models import Category
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera static/icons/flaticon/all/used.css, a partir do pacote completo em assets/flaticon, "
+        "só com os ícones citados nos templates, scripts, "
+        "código (inclusive as opções de ícone das categorias, `CATEGORY_ICONS`) e categorias já "
+        "gravadas, e as fontes cortadas com só esses glifos (requer o fontTools). Rode antes do collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', nargs='*', default=[], help="Classes extras a manter, ex: fi-rr-car.")
+
+    def handle(self, *args, **options):
+        used = used_icon_classes(options['keep'])
+        try:
+            # Categorias gravadas antes das opções de `CATEGORY_ICONS` podem ter outros ícones
+            for icon_class in Category.objects.values_list('icon_class', flat=True).distinct():
+                used.update(icon_class.split())
+        except DatabaseError:
+            self.stderr.write("Banco indisponível: os ícones das categorias não foram considerados.")
+
+        kept, unknown = trim_icon_css(used)
+        for icon in unknown:
+            if icon.startswith('fi-'):
+                self.stderr.write(f"Ícone desconhecido: {icon}")
+        fonts = "fontes cortadas" if font_subset is not None else "fontes completas (fontTools não instalado)"
+        self.stdout.write(self.style.SUCCESS(f"{len(kept)} ícones em {TRIMMED_CSS.name}, {fonts}."))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_monthly_summaries(apps, schema_editor):
+    # Preenche os resumos com o histórico já existente
+    Transaction = apps.get_model('ArvyoApp', 'Transaction')
+    MonthlySummary = apps.get_model('ArvyoApp', 'MonthlySummary')
+    rows = (
+        Transaction.objects.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'account_id', 'card_id', 'month')
+        .annotate(
+            income=Sum('amount', filter=Q(transaction_type='income'), default=0),
+            expense=Sum('amount', filter=Q(transaction_type='expense'), default=0),
+            count=Count('id'),
+        )
+    )
+    MonthlySummary.objects.bulk_create((MonthlySummary(**row) for row in rows), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ArvyoApp', '0003_transaction_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expense', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='ArvyoApp.account')),
+                ('card', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='ArvyoApp.card')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resumo Mensal',
+                'verbose_name_plural': 'Resumos Mensais',
+                'indexes': [models.Index(fields=['user', 'month'], name='summary_user_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'account', 'card', 'month'), name='summary_unique_account_card_month'), models.UniqueConstraint(condition=models.Q(('account__isnull', False), ('card__isnull', True)), fields=('user', 'account', 'month'), name='summary_unique_account_month'), models.UniqueConstraint(condition=models.Q(('account__isnull', True), ('card__isnull', False)), fields=('user', 'card', 'month'), name='summary_unique_card_month'), models.UniqueConstraint(condition=models.Q(('account__isnull', True), ('card__isnull', True)), fields=('user', 'month'), name='summary_unique_user_month')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_summaries, migrations.RunPython.noop),
+    ]
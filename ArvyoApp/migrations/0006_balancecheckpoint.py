@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When
+
+
+def _apply_settled_totals(apps, sign):
+    Account = apps.get_model('ArvyoApp', 'Account')
+    Transaction = apps.get_model('ArvyoApp', 'Transaction')
+    signed_amount = Case(
+        When(transaction_type='income', then=F('amount')),
+        When(transaction_type='expense', then=-F('amount')),
+        default=Value(0),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    totals = (
+        Transaction.objects.filter(account__isnull=False)
+        .filter(Q(is_future_payment=False) | Q(is_paid=True))
+        .order_by()
+        .values('account_id')
+        .annotate(total=Sum(signed_amount))
+    )
+    for row in totals:
+        Account.objects.filter(pk=row['account_id']).update(balance=F('balance') + sign * row['total'])
+
+
+def reconcile_account_balances(apps, schema_editor):
+    # Até aqui `Account.balance` guardava só o saldo inicial informado em addBank;
+    # a partir de agora ele inclui as transações liquidadas da conta.
+    _apply_settled_totals(apps, sign=1)
+
+
+def restore_opening_balances(apps, schema_editor):
+    # Volta ao saldo inicial, sem as transações (inclusive as criadas depois da migração):
+    # migrar para trás e para frente de novo não soma as transações duas vezes
+    _apply_settled_totals(apps, sign=-1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ArvyoApp', '0005_transaction_import_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='ArvyoApp.account')),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Saldo',
+                'verbose_name_plural': 'Checkpoints de Saldo',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('account', 'date'), name='checkpoint_unique_account_date')],
+            },
+        ),
+        migrations.RunPython(reconcile_account_balances, restore_opening_balances),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:50
+
+import calendar
+from datetime import date
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def _day_in_month(year, month, day):
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def _next_month(day):
+    return (day.year + 1, 1) if day.month == 12 else (day.year, day.month + 1)
+
+
+def populate_card_statements(apps, schema_editor):
+    # Distribui o histórico dos cartões pelos ciclos (com os dias padrão de fechamento
+    # e vencimento). Faturas já vencidas são consideradas pagas: até aqui não havia
+    # como registrar o pagamento, e o limite seria consumido por todo o histórico.
+    Card = apps.get_model('ArvyoApp', 'Card')
+    CardStatement = apps.get_model('ArvyoApp', 'CardStatement')
+    Transaction = apps.get_model('ArvyoApp', 'Transaction')
+    cycles = dict(Card.objects.values_list('pk', 'closing_day'))
+    due_days = dict(Card.objects.values_list('pk', 'due_day'))
+    today = date.today()
+
+    rows = (
+        Transaction.objects.filter(card__isnull=False).order_by()
+        .values('card_id', 'date')
+        .annotate(
+            purchases=Sum('amount', filter=Q(transaction_type='expense'), default=0),
+            credits=Sum('amount', filter=Q(transaction_type='income'), default=0),
+            count=Count('id'),
+        )
+    )
+    statements = {}
+    for row in rows.iterator():
+        closing_day, due_day = cycles[row['card_id']], due_days[row['card_id']]
+        closing = _day_in_month(row['date'].year, row['date'].month, closing_day)
+        if row['date'] >= closing:
+            closing = _day_in_month(*_next_month(row['date']), closing_day)
+        statement = statements.get((row['card_id'], closing))
+        if statement is None:
+            if due_day > closing_day:
+                due = _day_in_month(closing.year, closing.month, due_day)
+            else:
+                due = _day_in_month(*_next_month(closing), due_day)
+            statement = statements[(row['card_id'], closing)] = CardStatement(
+                card_id=row['card_id'], closing_date=closing, due_date=due,
+                purchases=0, credits=0, count=0, is_paid=due < today,
+            )
+        statement.purchases += row['purchases']
+        statement.credits += row['credits']
+        statement.count += row['count']
+    CardStatement.objects.bulk_create(statements.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ArvyoApp', '0006_balancecheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='closing_day',
+            field=models.PositiveSmallIntegerField(default=25, help_text='Dia do mês em que a fatura fecha', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(31)]),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='due_day',
+            field=models.PositiveSmallIntegerField(default=5, help_text='Dia do mês em que a fatura vence', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(31)]),
+        ),
+        migrations.CreateModel(
+            name='CardStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('closing_date', models.DateField()),
+                ('due_date', models.DateField()),
+                ('purchases', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('credits', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('is_paid', models.BooleanField(default=False)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statements', to='ArvyoApp.card')),
+            ],
+            options={
+                'verbose_name': 'Fatura',
+                'verbose_name_plural': 'Faturas',
+                'ordering': ['-closing_date'],
+                'indexes': [models.Index(condition=models.Q(('is_paid', False)), fields=['card'], name='statement_open_idx')],
+                'constraints': [models.UniqueConstraint(fields=('card', 'closing_date'), name='statement_unique_card_closing')],
+            },
+        ),
+        migrations.RunPython(populate_card_statements, migrations.RunPython.noop),
+    ]
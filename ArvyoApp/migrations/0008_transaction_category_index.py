@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ArvyoApp', '0007_card_statements'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['category', 'user', 'date'], name='txn_category_user_date_idx'),
+        ),
+    ]
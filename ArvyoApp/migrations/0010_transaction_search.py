@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:03
+
+import ArvyoApp.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Tabela FTS5 com conteúdo externo: guarda só o índice e lê o texto de ArvyoApp_transaction.
+# `user_id` também é indexado para que a busca filtre o dono dentro do próprio índice.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE "ArvyoApp_transaction_fts" USING fts5(
+        description, user_id,
+        content='ArvyoApp_transaction', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    # Ordenação por relevância (bm25) considerando só a descrição
+    """INSERT INTO "ArvyoApp_transaction_fts"("ArvyoApp_transaction_fts", rank) VALUES ('rank', 'bm25(1.0, 0.0)')""",
+    """
+    CREATE TRIGGER "ArvyoApp_transaction_fts_insert" AFTER INSERT ON "ArvyoApp_transaction" BEGIN
+        INSERT INTO "ArvyoApp_transaction_fts"(rowid, description, user_id) VALUES (new.id, new.description, new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER "ArvyoApp_transaction_fts_delete" AFTER DELETE ON "ArvyoApp_transaction" BEGIN
+        INSERT INTO "ArvyoApp_transaction_fts"("ArvyoApp_transaction_fts", rowid, description, user_id)
+        VALUES ('delete', old.id, old.description, old.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER "ArvyoApp_transaction_fts_update" AFTER UPDATE OF description, user_id ON "ArvyoApp_transaction" BEGIN
+        INSERT INTO "ArvyoApp_transaction_fts"("ArvyoApp_transaction_fts", rowid, description, user_id)
+        VALUES ('delete', old.id, old.description, old.user_id);
+        INSERT INTO "ArvyoApp_transaction_fts"(rowid, description, user_id) VALUES (new.id, new.description, new.user_id);
+    END
+    """,
+    # Indexa o histórico existente
+    """INSERT INTO "ArvyoApp_transaction_fts"("ArvyoApp_transaction_fts") VALUES ('rebuild')""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS "ArvyoApp_transaction_fts_update"',
+    'DROP TRIGGER IF EXISTS "ArvyoApp_transaction_fts_delete"',
+    'DROP TRIGGER IF EXISTS "ArvyoApp_transaction_fts_insert"',
+    'DROP TABLE IF EXISTS "ArvyoApp_transaction_fts"',
+]
+
+
+def _run_on_sqlite(statements):
+    # FTS5 é do SQLite; em outros bancos a busca cai no filtro por icontains (ver `search.py`)
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ArvyoApp', '0009_recurringrule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionSearch',
+            fields=[
+                ('transaction', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='ArvyoApp.transaction')),
+                ('document', ArvyoApp.models.SearchDocumentField(db_column='ArvyoApp_transaction_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'ArvyoApp_transaction_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(_run_on_sqlite(FTS_SQL), _run_on_sqlite(DROP_SQL)),
+    ]
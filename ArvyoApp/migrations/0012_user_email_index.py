@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# Índice único em LOWER(email) usado pelo login por email (ver `backends.py`); usuários sem
+# email ficam fora dele. O campo é do `django.contrib.auth`, por isso o índice é criado em SQL.
+CREATE_SQL = "CREATE UNIQUE INDEX arvyo_auth_user_email_ci ON auth_user (LOWER(email)) WHERE email > ''"
+DROP_SQL = "DROP INDEX arvyo_auth_user_email_ci"
+
+
+def check_duplicate_emails(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.filter(email__gt='')
+        .values(email_lower=Lower('email'))
+        .annotate(users=Count('id'))
+        .filter(users__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            f"Emails usados por mais de um usuário: {', '.join(duplicates)}. "
+            "Corrija esses cadastros antes de aplicar a migração."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ArvyoApp', '0011_category_rules'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
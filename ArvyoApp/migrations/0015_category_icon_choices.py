@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ArvyoApp', '0014_wallet_archiving'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='icon_class',
+            field=models.CharField(choices=[('fi fi-rr-tags', 'Etiquetas'), ('fi fi-rr-shopping-cart', 'Carrinho de compras'), ('fi fi-rs-shopping-bag', 'Sacola de compras'), ('fi fi-rr-hamburger-soda', 'Lanche'), ('fi fi-rr-utensils', 'Talheres'), ('fi fi-rr-coffee', 'Café'), ('fi fi-rr-car-side', 'Carro'), ('fi fi-rr-gas-pump', 'Combustível'), ('fi fi-rr-bus-alt', 'Ônibus'), ('fi fi-rr-plane', 'Avião'), ('fi fi-rr-home', 'Casa'), ('fi fi-rr-bolt', 'Energia'), ('fi fi-rr-wifi', 'Internet'), ('fi fi-rr-smartphone', 'Celular'), ('fi fi-rr-tv-retro', 'TV'), ('fi fi-rr-clapperboard-play', 'Streaming'), ('fi fi-rr-music', 'Música'), ('fi fi-rr-gamepad', 'Jogos'), ('fi fi-rr-bowling', 'Lazer'), ('fi fi-rr-user-md', 'Médico'), ('fi fi-rr-pills', 'Farmácia'), ('fi fi-rr-heart-rate', 'Saúde'), ('fi fi-rr-graduation-cap', 'Educação'), ('fi fi-rr-book', 'Livros'), ('fi fi-rr-baby', 'Filhos'), ('fi fi-rr-paw', 'Pets'), ('fi fi-rr-gift', 'Presentes'), ('fi fi-rr-umbrella', 'Seguros'), ('fi fi-rr-tools', 'Manutenção'), ('fi fi-rr-receipt', 'Contas'), ('fi fi-rr-credit-card', 'Cartão'), ('fi fi-rr-bank', 'Banco'), ('fi fi-rr-piggy-bank', 'Poupança'), ('fi fi-rr-sack-dollar', 'Salário'), ('fi fi-rr-briefcase', 'Trabalho'), ('fi fi-rr-hand-holding-usd', 'Recebimentos'), ('fi fi-rr-money', 'Dinheiro'), ('fi fi-rr-arrow-trend-up', 'Rendimentos'), ('fi fi-rr-replace', 'Transferências')], default='fi fi-rr-tags', help_text='Ícone da categoria', max_length=100),
+        ),
+    ]
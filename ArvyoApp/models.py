@@ -1,6 +1,13 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.auth.models import User
 
+# Contas e cartões apagados pelo usuário ficam arquivados até o comando `purge_archived_wallets`
+# remover as transações em lotes (ver `archiving.py`). O gerenciador padrão já os esconde.
+class WalletManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(archived_at__isnull=True)
+
 # O modelo `Account` representa uma conta bancária ou carteira
 class Account(models.Model):
     # Relaciona a conta a um usuário
@@ -18,6 +25,12 @@ class Account(models.Model):
     # Status da conta (ativo/inativo)
     is_active = models.BooleanField(default=True)
 
+    # Quando o usuário apagou a conta (ainda esperando o purge)
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = WalletManager()
+    all_objects = models.Manager()
+
     # Função que retorna o nome da conta como representação em string
     def __str__(self):
         return f"{self.name} - {self.user.username}"
@@ -25,6 +38,24 @@ class Account(models.Model):
     class Meta:
         verbose_name = "Conta"
         verbose_name_plural = "Contas"
+        indexes = [
+            # Índice parcial: só as contas arquivadas, por usuário
+            models.Index(fields=['user'], condition=models.Q(archived_at__isnull=False), name='account_archived_idx'),
+        ]
+
+# Campo da tabela FTS5 que aceita o lookup `match` (operador MATCH do SQLite)
+class SearchDocumentField(models.TextField):
+    pass
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
 
 # Tipos de transação (para definir se é uma receita ou despesa)
 TRANSACTION_TYPES = (
@@ -32,6 +63,55 @@ TRANSACTION_TYPES = (
     ('expense', 'Despesa'),
 )
 
+# Transações (pelo caminho `prefix` até elas) de contas e cartões arquivados. As subconsultas
+# percorrem só os índices parciais de carteiras arquivadas; também serve em condições de JOIN.
+def in_archived_wallet(user=None, prefix=''):
+    accounts = Account.all_objects.filter(archived_at__isnull=False)
+    cards = Card.all_objects.filter(archived_at__isnull=False)
+    if user is not None:
+        accounts = accounts.filter(user=user)
+        cards = cards.filter(user=user)
+    return models.Q(**{f'{prefix}account__in': accounts.values('pk')}) | models.Q(**{f'{prefix}card__in': cards.values('pk')})
+
+# Consultas de transações alinhadas aos índices compostos declarados em `Transaction.Meta`.
+# Todos os caminhos quentes filtram pelo dono (usuário, conta ou cartão) e ordenam por data.
+class TransactionQuerySet(models.QuerySet):
+    def for_user(self, user):
+        # Usa o índice (user, date)
+        return self.filter(user=user).without_archived(user)
+
+    def without_archived(self, user=None):
+        # Transações de carteiras arquivadas somem já no arquivamento, antes do purge
+        return self.exclude(in_archived_wallet(user))
+
+    def for_account(self, account):
+        # Usa o índice (account, date)
+        return self.filter(account=account)
+
+    def for_card(self, card):
+        # Usa o índice (card, date)
+        return self.filter(card=card)
+
+    def of_type(self, user, transaction_type):
+        # Usa o índice (user, transaction_type, date)
+        return self.filter(user=user, transaction_type=transaction_type)
+
+    def between(self, start=None, end=None):
+        queryset = self
+        if start is not None:
+            queryset = queryset.filter(date__gte=start)
+        if end is not None:
+            queryset = queryset.filter(date__lte=end)
+        return queryset
+
+    def pending_payments(self, user):
+        # Usa o índice parcial de pagamentos futuros ainda não pagos
+        return self.filter(user=user, is_future_payment=True, is_paid=False)
+
+    def newest_first(self):
+        # O `id` desempata transações do mesmo dia e também é coberto pelos índices
+        return self.order_by('-date', '-id')
+
 # O modelo `Transaction` representa uma movimentação de dinheiro
 class Transaction(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -52,6 +132,16 @@ class Transaction(models.Model):
     # Se a transação futura já foi paga
     is_paid = models.BooleanField(default=False)
 
+    # Hash do conteúdo da linha do extrato importado, usado para ignorar reimportações
+    import_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+    # Regra recorrente que gerou a transação e a data da ocorrência (ver `recurring.py`).
+    # A data da ocorrência não muda se a transação for editada depois.
+    recurring_rule = models.ForeignKey('RecurringRule', on_delete=models.SET_NULL, null=True, blank=True, editable=False)
+    occurrence = models.DateField(null=True, blank=True, editable=False)
+
+    objects = TransactionQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.transaction_type} - {self.description} ({self.amount})"
 
@@ -59,6 +149,72 @@ class Transaction(models.Model):
         verbose_name = "Transação"
         verbose_name_plural = "Transações"
         ordering = ['-date'] # Ordena as transações por data, da mais recente para a mais antiga
+        indexes = [
+            models.Index(fields=['user', 'date'], name='txn_user_date_idx'),
+            models.Index(fields=['account', 'date'], name='txn_account_date_idx'),
+            models.Index(fields=['card', 'date'], name='txn_card_date_idx'),
+            models.Index(fields=['user', 'transaction_type', 'date'], name='txn_user_type_date_idx'),
+            # Despesas de uma categoria no período de um orçamento (ver `budgets.py`)
+            models.Index(fields=['category', 'user', 'date'], name='txn_category_user_date_idx'),
+            # Listagem do admin (todas as transações, mais recentes primeiro) e date_hierarchy
+            models.Index(fields=['date'], name='txn_date_idx'),
+            # Índice parcial: só as transações futuras ainda não pagas
+            models.Index(
+                fields=['user', 'date'],
+                condition=models.Q(is_future_payment=True, is_paid=False),
+                name='txn_pending_payment_idx',
+            ),
+        ]
+        constraints = [
+            # O hash já inclui o usuário; o índice único serve a checagem de duplicatas na importação
+            models.UniqueConstraint(fields=['import_hash'], name='txn_unique_import_hash'),
+            # Cada ocorrência de uma regra recorrente vira no máximo uma transação
+            models.UniqueConstraint(fields=['recurring_rule', 'occurrence'], name='txn_unique_rule_occurrence'),
+        ]
+
+# Ícones que podem ser escolhidos para uma categoria. O CSS dos ícones (icons/flaticon/all/used.css,
+# gerado por `trim_icon_fonts`) só tem os glifos citados no código, e estes entram por estarem aqui.
+CATEGORY_ICONS = (
+    ('fi fi-rr-tags', 'Etiquetas'),
+    ('fi fi-rr-shopping-cart', 'Carrinho de compras'),
+    ('fi fi-rs-shopping-bag', 'Sacola de compras'),
+    ('fi fi-rr-hamburger-soda', 'Lanche'),
+    ('fi fi-rr-utensils', 'Talheres'),
+    ('fi fi-rr-coffee', 'Café'),
+    ('fi fi-rr-car-side', 'Carro'),
+    ('fi fi-rr-gas-pump', 'Combustível'),
+    ('fi fi-rr-bus-alt', 'Ônibus'),
+    ('fi fi-rr-plane', 'Avião'),
+    ('fi fi-rr-home', 'Casa'),
+    ('fi fi-rr-bolt', 'Energia'),
+    ('fi fi-rr-wifi', 'Internet'),
+    ('fi fi-rr-smartphone', 'Celular'),
+    ('fi fi-rr-tv-retro', 'TV'),
+    ('fi fi-rr-clapperboard-play', 'Streaming'),
+    ('fi fi-rr-music', 'Música'),
+    ('fi fi-rr-gamepad', 'Jogos'),
+    ('fi fi-rr-bowling', 'Lazer'),
+    ('fi fi-rr-user-md', 'Médico'),
+    ('fi fi-rr-pills', 'Farmácia'),
+    ('fi fi-rr-heart-rate', 'Saúde'),
+    ('fi fi-rr-graduation-cap', 'Educação'),
+    ('fi fi-rr-book', 'Livros'),
+    ('fi fi-rr-baby', 'Filhos'),
+    ('fi fi-rr-paw', 'Pets'),
+    ('fi fi-rr-gift', 'Presentes'),
+    ('fi fi-rr-umbrella', 'Seguros'),
+    ('fi fi-rr-tools', 'Manutenção'),
+    ('fi fi-rr-receipt', 'Contas'),
+    ('fi fi-rr-credit-card', 'Cartão'),
+    ('fi fi-rr-bank', 'Banco'),
+    ('fi fi-rr-piggy-bank', 'Poupança'),
+    ('fi fi-rr-sack-dollar', 'Salário'),
+    ('fi fi-rr-briefcase', 'Trabalho'),
+    ('fi fi-rr-hand-holding-usd', 'Recebimentos'),
+    ('fi fi-rr-money', 'Dinheiro'),
+    ('fi fi-rr-arrow-trend-up', 'Rendimentos'),
+    ('fi fi-rr-replace', 'Transferências'),
+)
 
 # O modelo `Category` representa uma categoria de transação
 class Category(models.Model):
@@ -67,7 +223,7 @@ class Category(models.Model):
     name = models.CharField(max_length=100)
     
     # Novos campos para o ícone e a cor no dashboard
-    icon_class = models.CharField(max_length=100, default='fi fi-rr-tags', help_text="Classe do ícone, ex: 'fi fi-rr-shopping-cart'")
+    icon_class = models.CharField(max_length=100, choices=CATEGORY_ICONS, default='fi fi-rr-tags', help_text="Ícone da categoria")
     color_class = models.CharField(max_length=50, default='bg-blue-500', help_text="Classe da cor do ícone, ex: 'bg-blue-500'")
 
     def __str__(self):
@@ -122,10 +278,215 @@ class Card(models.Model):
     card_number_masked = models.CharField(max_length=16) # O número será salvo mascarado
     expiration_date = models.CharField(max_length=5) # Formato MM/YY
     limit = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+
+    # Ciclo da fatura: compras a partir do dia de fechamento entram na fatura seguinte.
+    # Dias maiores que o tamanho do mês valem como o último dia do mês.
+    closing_day = models.PositiveSmallIntegerField(
+        default=25, validators=[MinValueValidator(1), MaxValueValidator(31)],
+        help_text="Dia do mês em que a fatura fecha",
+    )
+    due_day = models.PositiveSmallIntegerField(
+        default=5, validators=[MinValueValidator(1), MaxValueValidator(31)],
+        help_text="Dia do mês em que a fatura vence",
+    )
+
+    # Quando o usuário apagou o cartão (ainda esperando o purge)
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = WalletManager()
+    all_objects = models.Manager()
     
     def __str__(self):
         return f"Card de {self.name_on_card} - {self.user.username}"
 
     class Meta:
         verbose_name = "Cartão"
-        verbose_name_plural = "Cartões"
\ No newline at end of file
+        verbose_name_plural = "Cartões"
+        indexes = [
+            # Índice parcial: só os cartões arquivados, por usuário
+            models.Index(fields=['user'], condition=models.Q(archived_at__isnull=False), name='card_archived_idx'),
+        ]
+
+# O modelo `MonthlySummary` guarda os totais mensais de cada carteira (conta, cartão ou nenhuma).
+# É mantido incrementalmente pelos sinais de `Transaction` (ver `summaries.py`) e pode ser
+# reconstruído com o comando `rebuild_monthly_summaries`.
+class MonthlySummary(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, null=True, blank=True)
+    card = models.ForeignKey(Card, on_delete=models.CASCADE, null=True, blank=True)
+
+    # Primeiro dia do mês
+    month = models.DateField()
+
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Resumo de {self.month:%m/%Y} - {self.user.username}"
+
+    class Meta:
+        verbose_name = "Resumo Mensal"
+        verbose_name_plural = "Resumos Mensais"
+        # Como `account` e `card` podem ser nulos, cada combinação tem sua própria restrição
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'account', 'card', 'month'],
+                name='summary_unique_account_card_month',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'account', 'month'],
+                condition=models.Q(account__isnull=False, card__isnull=True),
+                name='summary_unique_account_month',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'card', 'month'],
+                condition=models.Q(account__isnull=True, card__isnull=False),
+                name='summary_unique_card_month',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'month'],
+                condition=models.Q(account__isnull=True, card__isnull=True),
+                name='summary_unique_user_month',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'month'], name='summary_user_month_idx'),
+        ]
+
+
+# O modelo `BalanceCheckpoint` registra o saldo de uma conta ao final de um dia.
+# Consultas de saldo em uma data partem do checkpoint mais próximo (ver `ledger.py`)
+# e os checkpoints são corrigidos junto com o saldo a cada transação retroativa.
+class BalanceCheckpoint(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='checkpoints')
+    date = models.DateField()
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+
+    def __str__(self):
+        return f"Saldo de {self.account.name} em {self.date:%d/%m/%Y}: {self.balance}"
+
+    class Meta:
+        verbose_name = "Checkpoint de Saldo"
+        verbose_name_plural = "Checkpoints de Saldo"
+        ordering = ['-date']
+        constraints = [
+            # Também é o índice usado para achar o checkpoint mais próximo de uma data
+            models.UniqueConstraint(fields=['account', 'date'], name='checkpoint_unique_account_date'),
+        ]
+
+
+# O modelo `CardStatement` guarda os totais de cada fatura (ciclo) de um cartão.
+# É mantido incrementalmente pelos sinais de `Transaction` (ver `statements.py`), então
+# fatura atual, próxima fatura e limite disponível são buscas pelo índice (card, closing_date).
+class CardStatement(models.Model):
+    card = models.ForeignKey(Card, on_delete=models.CASCADE, related_name='statements')
+
+    # Data de fechamento identifica o ciclo; o vencimento é derivado dela
+    closing_date = models.DateField()
+    due_date = models.DateField()
+
+    # Compras (despesas) e estornos/créditos (receitas) lançados no ciclo
+    purchases = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    credits = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    is_paid = models.BooleanField(default=False)
+
+    @property
+    def amount(self):
+        return self.purchases - self.credits
+
+    def __str__(self):
+        return f"Fatura de {self.card.card_name} ({self.closing_date:%d/%m/%Y}): {self.amount}"
+
+    class Meta:
+        verbose_name = "Fatura"
+        verbose_name_plural = "Faturas"
+        ordering = ['-closing_date']
+        constraints = [
+            models.UniqueConstraint(fields=['card', 'closing_date'], name='statement_unique_card_closing'),
+        ]
+        indexes = [
+            # Faturas em aberto, que consomem o limite do cartão
+            models.Index(fields=['card'], condition=models.Q(is_paid=False), name='statement_open_idx'),
+        ]
+
+
+# Frequências das regras recorrentes
+FREQUENCIES = (
+    ('daily', 'Diária'),
+    ('weekly', 'Semanal'),
+    ('monthly', 'Mensal'),
+    ('yearly', 'Anual'),
+)
+
+# O modelo `RecurringRule` descreve uma transação que se repete (aluguel, salário, assinaturas).
+# As ocorrências são criadas como pagamentos futuros pelo comando `materialize_recurring`.
+class RecurringRule(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, null=True, blank=True)
+    card = models.ForeignKey(Card, on_delete=models.CASCADE, null=True, blank=True)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
+    description = models.CharField(max_length=255, blank=True)
+
+    # A cada `interval` dias/semanas/meses/anos a partir de `start_date`
+    frequency = models.CharField(max_length=10, choices=FREQUENCIES, default='monthly')
+    interval = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    # Até que data as ocorrências já foram criadas
+    materialized_until = models.DateField(null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return f"{self.get_frequency_display()}: {self.description or self.transaction_type} ({self.amount})"
+
+    class Meta:
+        verbose_name = "Regra Recorrente"
+        verbose_name_plural = "Regras Recorrentes"
+        indexes = [
+            # Regras ativas ordenadas pelo ponto em que pararam de ser materializadas
+            models.Index(fields=['materialized_until'], condition=models.Q(is_active=True), name='rule_active_materialized_idx'),
+        ]
+
+
+# O modelo `CategoryRule` associa palavras da descrição a uma categoria, ex: "uber eats" -> Alimentação.
+# As regras e o histórico de categorias já atribuídas formam o índice de `categorization.py`,
+# usado para categorizar transações importadas ou lançadas sem categoria.
+class CategoryRule(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+
+    # Todas as palavras precisam aparecer na descrição, inteiras ou como começo de palavra
+    pattern = models.CharField(max_length=100, help_text="Palavras da descrição, ex: 'uber eats' ou 'farm'")
+    # Quando mais de uma regra casa, vence a de maior prioridade (e depois a mais específica)
+    priority = models.IntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.pattern} -> {self.category.name}"
+
+    class Meta:
+        verbose_name = "Regra de Categoria"
+        verbose_name_plural = "Regras de Categoria"
+
+
+# Índice de texto completo (FTS5) das descrições das transações. A tabela virtual é criada
+# e mantida por triggers do próprio SQLite (migração 0010), então também acompanha
+# bulk_create e exclusões em massa; o modelo só existe para as consultas (ver `search.py`).
+class TransactionSearch(models.Model):
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search'
+    )
+    # Coluna oculta com o nome da tabela, usada no operador MATCH
+    document = SearchDocumentField(db_column='ArvyoApp_transaction_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'ArvyoApp_transaction_fts'
@@ -0,0 +1,80 @@
+import hashlib
+import time
+from email.utils import formatdate
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+# Contexto fixo que as antigas views de uma linha passavam para o template
+PAGE_CONTEXT = {'title': 'Add Bank', 'subTitle': 'Add Bank'}
+
+# Páginas de conteúdo fixo: nome da URL -> exige login. O template é "home/<nome>.html"
+STATIC_PAGES = {
+    'addNewAccount': False,
+    'affiliates': False,
+    'analytics': True,
+    'analyticsBalance': True,
+    'analyticsExpenses': True,
+    'analyticsIncome': True,
+    'analyticsIncomeVsExpenses': True,
+    'analyticsTransactionHistory': False,
+    'bankAddSuccessful': False,
+    'blank': False,
+    'chart': False,
+    'demo': False,
+    'goals': False,
+    'idFrontAndBackUpload': False,
+    'locked': False,
+    'notifications': False,
+    'otpCode': False,
+    'otpPhone': False,
+    'pageError': False,
+    'privacy': False,
+    'profile': False,
+    'reset': False,
+    'settings': False,
+    'settingsApi': False,
+    'settingsCategories': False,
+    'settingsCurrencies': False,
+    'settingsGeneral': False,
+    'settingsProfile': False,
+    'settingsSecurity': False,
+    'settingsSession': False,
+    'signup': False,
+    'support': False,
+    'supportCreateTicket': False,
+    'supportTicketDetails': False,
+    'supportTickets': False,
+    'verifiedId': False,
+    'verifyEmail': False,
+    'verifyId': False,
+    'verifyingId': False,
+}
+
+
+class RenderedPage:
+    def __init__(self, content):
+        self.content = content
+        self.etag = '"%s"' % hashlib.md5(content, usedforsecurity=False).hexdigest()
+        self.last_modified = int(time.time())
+        self.last_modified_header = formatdate(self.last_modified, usegmt=True)
+
+
+# HTML de cada página, renderizado uma vez por processo (como os fragmentos do layout)
+_rendered_pages = {}
+
+
+def rendered_page(name):
+    """
+    HTML, ETag e Last-Modified da página `name`. O template é renderizado sem a
+    requisição: nada do usuário (sessão, CSRF, mensagens) entra no HTML, então a mesma
+    resposta serve a todos os usuários.
+    """
+    page = _rendered_pages.get(name)
+    if page is None:
+        page = RenderedPage(render_to_string(f'home/{name}.html', PAGE_CONTEXT).encode())
+        if settings.DEBUG:
+            # Em desenvolvimento os templates mudam sem reiniciar o processo
+            return page
+        _rendered_pages[name] = page
+    return page
@@ -0,0 +1,89 @@
+from datetime import date
+
+from django.core.exceptions import BadRequest
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Quantidade de transações por página no histórico das carteiras
+TRANSACTIONS_PAGE_SIZE = 50
+
+# Abaixo disso o COUNT(*) exato é barato; acima, o admin usa uma estimativa
+EXACT_COUNT_LIMIT = 10000
+
+
+def encode_cursor(transaction_obj):
+    # O cursor é a chave (date, id) da última transação entregue, ex: "2025-08-10_1532"
+    return f"{transaction_obj.date.isoformat()}_{transaction_obj.pk}"
+
+
+def decode_cursor(cursor):
+    try:
+        day, pk = cursor.split('_')
+        return date.fromisoformat(day), int(pk)
+    except ValueError:
+        raise BadRequest("Cursor de paginação inválido.")
+
+
+def keyset_page(queryset, cursor=None, page_size=TRANSACTIONS_PAGE_SIZE):
+    """
+    Pagina uma consulta de transações pela chave (date, id), da mais recente para a mais antiga.
+
+    Diferente de OFFSET, cada página é uma busca por intervalo no índice (dono, date),
+    então a página N custa o mesmo que a primeira. Retorna (transações, próximo_cursor);
+    o cursor é None quando não há mais páginas.
+    """
+    queryset = queryset.order_by('-date', '-id')
+    if cursor:
+        last_date, last_pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(date__lt=last_date) | Q(date=last_date, pk__lt=last_pk))
+
+    # Busca um item a mais só para saber se existe próxima página
+    items = list(queryset[:page_size + 1])
+    if len(items) > page_size:
+        items = items[:page_size]
+        return items, encode_cursor(items[-1])
+    return items, None
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Quantidade aproximada de linhas da tabela sem percorrê-la, pela contagem do último
+    ANALYZE (sqlite_stat1). Sem estatísticas da tabela, faz o COUNT(*) exato.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                # Uma linha por índice, começando pelo número de linhas indexadas: índices
+                # parciais (ex: txn_pending_payment_idx) cobrem só parte da tabela, então
+                # vale o maior valor entre os índices (o CAST lê só o primeiro número)
+                cursor.execute(
+                    'SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s',
+                    [model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                if row[0] is not None:
+                    return row[0]
+    return model._default_manager.using(using).count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador do admin para tabelas grandes: não faz COUNT(*) sobre a tabela inteira.
+    Sem filtros usa `estimated_row_count`; com filtros conta só até EXACT_COUNT_LIMIT
+    linhas, de modo que as páginas além desse ponto não aparecem na navegação.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate > EXACT_COUNT_LIMIT:
+                return estimate
+            return super().count
+        # COUNT(*) sobre um SELECT ... LIMIT: para depois de EXACT_COUNT_LIMIT linhas
+        return queryset.order_by()[:EXACT_COUNT_LIMIT].count()
@@ -0,0 +1,157 @@
+import calendar
+import time
+from datetime import date, timedelta
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .ledger import apply_to_ledger
+from .models import RecurringRule, Transaction
+from .statements import apply_to_statements
+from .summaries import apply_many_to_summaries, transaction_snapshot
+
+# Quantos dias à frente as ocorrências são criadas a cada execução
+HORIZON_DAYS = 60
+# Regras processadas por transação do banco (e tamanho dos lotes do bulk_create)
+RULES_BATCH_SIZE = 1000
+
+# Tentativas por lote quando outra execução está gravando ao mesmo tempo
+BATCH_ATTEMPTS = 5
+
+STEP_DAYS = {'daily': 1, 'weekly': 7}
+STEP_MONTHS = {'monthly': 1, 'yearly': 12}
+
+
+def _add_months(day, months, anchor_day):
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = month_index // 12, month_index % 12 + 1
+    # Regra do dia 31 cai no último dia dos meses mais curtos, sem "escorregar" nos seguintes
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def nth_occurrence(rule, n):
+    if rule.frequency in STEP_DAYS:
+        return rule.start_date + timedelta(days=n * rule.interval * STEP_DAYS[rule.frequency])
+    return _add_months(rule.start_date, n * rule.interval * STEP_MONTHS[rule.frequency], rule.start_date.day)
+
+
+def occurrences(rule, after, until):
+    """Datas das ocorrências da regra no intervalo (after, until]."""
+    if rule.end_date is not None:
+        until = min(until, rule.end_date)
+
+    # Pula direto para perto da primeira ocorrência, sem percorrer o histórico da regra
+    n = 0
+    if after is not None and after >= rule.start_date:
+        if rule.frequency in STEP_DAYS:
+            n = (after - rule.start_date).days // (rule.interval * STEP_DAYS[rule.frequency])
+        else:
+            months = (after.year - rule.start_date.year) * 12 + after.month - rule.start_date.month
+            n = max(months // (rule.interval * STEP_MONTHS[rule.frequency]) - 1, 0)
+
+    day = nth_occurrence(rule, n)
+    while after is not None and day <= after:
+        n += 1
+        day = nth_occurrence(rule, n)
+    while day <= until:
+        yield day
+        n += 1
+        day = nth_occurrence(rule, n)
+
+
+def _pending_rules(horizon):
+    # Regras ativas que ainda não foram materializadas até o horizonte
+    return RecurringRule.objects.filter(is_active=True).filter(
+        Q(materialized_until__isnull=True) | Q(materialized_until__lt=horizon)
+    ).exclude(end_date__lte=F('materialized_until'))
+
+
+def _not_materialized(rules, pending):
+    # Ocorrências que já existem (ex: `materialized_until` foi apagado) não são recriadas
+    if not pending:
+        return pending
+    existing = set(
+        Transaction.objects.filter(recurring_rule__in=rules, occurrence__gte=min(item.occurrence for item in pending))
+        .order_by()
+        .values_list('recurring_rule_id', 'occurrence')
+    )
+    return [item for item in pending if (item.recurring_rule_id, item.occurrence) not in existing]
+
+
+def _materialize_batch(pks, today, horizon, batch_size):
+    with transaction.atomic():
+        # As regras do lote ficam travadas até o commit (nos bancos com SELECT ... FOR UPDATE):
+        # uma execução concorrente pula essas regras em vez de esperar por elas
+        rules = list(_pending_rules(horizon).filter(pk__in=pks).select_for_update(skip_locked=True))
+        if not rules:
+            return 0
+
+        pending = []
+        for rule in rules:
+            # Na primeira execução, ocorrências passadas não viram pagamentos pendentes
+            after = rule.materialized_until or today - timedelta(days=1)
+            for day in occurrences(rule, after, horizon):
+                pending.append(Transaction(
+                    user_id=rule.user_id, account_id=rule.account_id, card_id=rule.card_id,
+                    category_id=rule.category_id, amount=rule.amount,
+                    transaction_type=rule.transaction_type, description=rule.description,
+                    date=day, is_future_payment=True, is_paid=False,
+                    recurring_rule_id=rule.pk, occurrence=day,
+                ))
+
+        pending = _not_materialized(rules, pending)
+        try:
+            # A restrição única (regra, ocorrência) é a garantia final contra duplicatas. Em
+            # savepoint próprio: se uma execução concorrente gravou parte das ocorrências, elas
+            # são relidas e só as que faltam são inseridas; os totais abaixo contam só estas.
+            with transaction.atomic():
+                Transaction.objects.bulk_create(pending, batch_size=batch_size)
+        except IntegrityError:
+            pending = _not_materialized(rules, pending)
+            for item in pending:
+                # Ids devolvidos pelos INSERTs desfeitos no savepoint
+                item.pk = None
+            Transaction.objects.bulk_create(pending, batch_size=batch_size)
+        RecurringRule.objects.filter(pk__in=[rule.pk for rule in rules]).update(materialized_until=horizon)
+
+        # bulk_create não dispara sinais: resumos, saldos, faturas e cache são atualizados em lote
+        snapshots = [transaction_snapshot(item) for item in pending]
+        apply_many_to_summaries(snapshots)
+        apply_to_ledger(snapshots)
+        apply_to_statements(snapshots)
+        for user_id in {rule.user_id for rule in rules}:
+            bump_data_version(user_id)
+    return len(pending)
+
+
+def materialize_recurring(today=None, horizon_days=HORIZON_DAYS, batch_size=RULES_BATCH_SIZE):
+    """
+    Cria as transações futuras de todas as regras ativas até `today + horizon_days`.
+
+    As regras são percorridas em lotes pela chave primária; cada lote é uma transação
+    do banco com um bulk_create. Rodar de novo (ou em paralelo) não duplica nada:
+    cada regra guarda até onde já foi materializada e a restrição única
+    (regra, ocorrência) barra qualquer sobreposição. Retorna (regras, transações criadas).
+    """
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=horizon_days)
+    candidates = _pending_rules(horizon).order_by('pk').values_list('pk', flat=True)
+
+    rules = created = 0
+    last_pk = 0
+    while pks := list(candidates.filter(pk__gt=last_pk)[:batch_size]):
+        last_pk = pks[-1]
+        for attempt in range(1, BATCH_ATTEMPTS + 1):
+            try:
+                created += _materialize_batch(pks, today, horizon, batch_size)
+                break
+            except OperationalError:
+                # No SQLite, duas execuções simultâneas disputam o lock de escrita e uma delas
+                # falha; ao repetir, o lote é relido e as regras já materializadas são puladas
+                if attempt == BATCH_ATTEMPTS:
+                    raise
+                time.sleep(0.1 * attempt)
+        rules += len(pks)
+    return rules, created
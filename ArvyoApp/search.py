@@ -0,0 +1,88 @@
+import re
+
+from django.db import connection
+
+from .analytics import _money
+from .models import Transaction
+
+# Quantidade padrão (e máxima) de resultados por busca
+SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 200
+# Termos além deste limite são ignorados
+MAX_TERMS = 8
+
+_TERM = re.compile(r'\w+')
+
+
+def search_terms(query):
+    return _TERM.findall(query.lower())[:MAX_TERMS]
+
+
+def match_expression(user_id, terms):
+    """
+    Expressão MATCH do FTS5: todos os termos como prefixo na descrição e o dono na
+    coluna `user_id`, de modo que o próprio índice já devolve só as linhas do usuário.
+    """
+    return f'user_id : "{user_id}" AND {description_match(terms)}'
+
+
+def description_match(terms):
+    """Expressão MATCH só da descrição, sem restringir o dono (usada pelo admin)."""
+    # Termos entre aspas: nada do que o usuário digita é lido como operador do FTS5
+    description = ' AND '.join(f'"{term}"*' for term in terms)
+    return f'description : ({description})'
+
+
+def search_transactions(user, query, account=None, card=None, category=None, transaction_type=None,
+                        start=None, end=None, limit=SEARCH_LIMIT):
+    """
+    Transações do usuário cuja descrição contém todos os termos de `query` (também
+    como início de palavra, sem diferenciar acentos), da mais relevante para a menos.
+
+    No SQLite a busca parte do índice FTS5 (`TransactionSearch`), mantido pelos
+    triggers da migração 0010; os demais filtros só são aplicados às linhas encontradas.
+    Em outros bancos cai num filtro `icontains` por termo, ordenado por data.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return Transaction.objects.none()
+
+    transactions = Transaction.objects.for_user(user)
+    if account is not None:
+        transactions = transactions.filter(account_id=account)
+    if card is not None:
+        transactions = transactions.filter(card_id=card)
+    if category is not None:
+        transactions = transactions.filter(category_id=category)
+    if transaction_type is not None:
+        transactions = transactions.filter(transaction_type=transaction_type)
+    transactions = transactions.between(start=start, end=end).select_related('category')
+
+    if connection.vendor == 'sqlite':
+        transactions = transactions.filter(
+            search__document__match=match_expression(user.pk, terms)
+        ).order_by('search__rank', '-date', '-id')
+    else:
+        for term in terms:
+            transactions = transactions.filter(description__icontains=term)
+        transactions = transactions.order_by('-date', '-id')
+    return transactions[:limit]
+
+
+def search_results(transactions):
+    """Resultados em colunas (uma lista por campo), no formato dos endpoints de análise."""
+    results = {
+        'ids': [], 'dates': [], 'descriptions': [], 'amounts': [], 'types': [],
+        'categories': [], 'accounts': [], 'cards': [],
+    }
+    for item in transactions:
+        results['ids'].append(item.pk)
+        results['dates'].append(item.date.isoformat())
+        results['descriptions'].append(item.description)
+        results['amounts'].append(_money(item.amount))
+        results['types'].append(item.transaction_type)
+        results['categories'].append(item.category.name if item.category else None)
+        results['accounts'].append(item.account_id)
+        results['cards'].append(item.card_id)
+    results['count'] = len(results['ids'])
+    return results
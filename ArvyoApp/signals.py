@@ -0,0 +1,95 @@
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_data_version
+from .categorization import learn
+from .ledger import apply_to_ledger
+from .models import Account, Budget, Card, Category, CategoryRule, Goal, Transaction
+from .statements import apply_to_statements, rebuild_card_statements
+from .summaries import SNAPSHOT_FIELDS, apply_to_summary, transaction_snapshot
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    # Guarda o estado anterior para desfazer a contribuição antiga no post_save
+    instance._previous_snapshot = None
+    instance._previous_categorization = None
+    if raw or instance.pk is None:
+        return
+    previous = (
+        Transaction.objects.filter(pk=instance.pk)
+        .values(*SNAPSHOT_FIELDS, 'description', 'category_id')
+        .first()
+    )
+    if previous:
+        instance._previous_categorization = (previous.pop('description'), previous.pop('category_id'))
+    instance._previous_snapshot = previous
+
+
+@receiver(post_save, sender=Transaction)
+def apply_transaction_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # Categoria escolhida (ou trocada) pelo usuário alimenta o índice de categorização
+    categorization = (instance.description, instance.category_id)
+    previous_categorization = getattr(instance, '_previous_categorization', None)
+    if categorization != previous_categorization:
+        learn(instance.user_id, added=[categorization], removed=[previous_categorization] if previous_categorization else [])
+
+    previous = getattr(instance, '_previous_snapshot', None)
+    current = transaction_snapshot(instance)
+    if previous == current:
+        return
+    with transaction.atomic():
+        if previous:
+            apply_to_summary(previous, sign=-1)
+            apply_to_ledger([previous], sign=-1)
+            apply_to_statements([previous], sign=-1)
+        apply_to_summary(current, sign=1)
+        apply_to_ledger([current], sign=1)
+        apply_to_statements([current], sign=1)
+
+
+@receiver(post_delete, sender=Transaction)
+def revert_transaction_on_delete(sender, instance, **kwargs):
+    snapshot = transaction_snapshot(instance)
+    learn(instance.user_id, removed=[(instance.description, instance.category_id)])
+    with transaction.atomic():
+        apply_to_summary(snapshot, sign=-1)
+        apply_to_ledger([snapshot], sign=-1)
+        apply_to_statements([snapshot], sign=-1)
+
+
+@receiver(pre_save, sender=Card)
+def remember_previous_cycle(sender, instance, raw=False, **kwargs):
+    instance._previous_cycle = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_cycle = (
+        Card.objects.filter(pk=instance.pk).values_list('closing_day', 'due_day').first()
+    )
+
+
+@receiver(post_save, sender=Card)
+def rebuild_statements_on_cycle_change(sender, instance, created, raw=False, **kwargs):
+    # Mudar o dia de fechamento redistribui as transações entre os ciclos
+    previous = getattr(instance, '_previous_cycle', None)
+    if raw or previous is None:
+        return
+    if previous != (instance.closing_day, instance.due_day):
+        rebuild_card_statements([instance])
+
+
+@receiver([post_save, post_delete], sender=Account)
+@receiver([post_save, post_delete], sender=Budget)
+@receiver([post_save, post_delete], sender=Card)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=CategoryRule)
+@receiver([post_save, post_delete], sender=Goal)
+@receiver([post_save, post_delete], sender=Transaction)
+def invalidate_user_cache(sender, instance, raw=False, **kwargs):
+    # Categorias sem usuário são globais e invalidam o cache de todos
+    if not raw:
+        bump_data_version(instance.user_id)
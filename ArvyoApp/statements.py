@@ -0,0 +1,199 @@
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Card, CardStatement, Transaction
+from .summaries import MONEY, ZERO, as_date, sum_of
+
+
+def _day_in_month(year, month, day):
+    # Dia 31 em um mês de 30 dias (ou 29 em fevereiro) vira o último dia do mês
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def _next_month(day):
+    return (day.year + 1, 1) if day.month == 12 else (day.year, day.month + 1)
+
+
+def cycle_closing(closing_day, day):
+    """Data de fechamento da fatura em que entra uma compra feita em `day`."""
+    closing = _day_in_month(day.year, day.month, closing_day)
+    if day < closing:
+        return closing
+    # A partir do dia de fechamento, a compra vai para a fatura seguinte
+    return _day_in_month(*_next_month(day), closing_day)
+
+
+def cycle_due(closing_day, due_day, closing):
+    """Vencimento da fatura que fecha em `closing`: no mesmo mês ou no seguinte."""
+    if due_day > closing_day:
+        return _day_in_month(closing.year, closing.month, due_day)
+    return _day_in_month(*_next_month(closing), due_day)
+
+
+def next_closing(closing_day, closing):
+    return _day_in_month(*_next_month(closing), closing_day)
+
+
+def _card_cycles(card_ids):
+    # Dias de fechamento e vencimento dos cartões envolvidos, numa única consulta
+    return {
+        row['pk']: (row['closing_day'], row['due_day'])
+        for row in Card.objects.filter(pk__in=card_ids).values('pk', 'closing_day', 'due_day')
+    }
+
+
+def _deltas(snapshots, sign):
+    # Agrupa as contribuições por (cartão, fechamento)
+    card_snapshots = [snapshot for snapshot in snapshots if snapshot['card_id'] is not None]
+    if not card_snapshots:
+        return {}
+    cycles = _card_cycles({snapshot['card_id'] for snapshot in card_snapshots})
+
+    deltas = {}
+    for snapshot in card_snapshots:
+        if snapshot['card_id'] not in cycles:
+            # Cartão excluído (exclusão em cascata): a fatura sai junto com ele
+            continue
+        closing_day, due_day = cycles[snapshot['card_id']]
+        closing = cycle_closing(closing_day, as_date(snapshot['date']))
+        key = (snapshot['card_id'], closing, cycle_due(closing_day, due_day, closing))
+
+        amount = Decimal(snapshot['amount']) * sign
+        purchases, credits, count = deltas.get(key, (ZERO, ZERO, 0))
+        if snapshot['transaction_type'] == 'expense':
+            purchases += amount
+        elif snapshot['transaction_type'] == 'income':
+            credits += amount
+        deltas[key] = (purchases, credits, count + sign)
+    return deltas
+
+
+def _apply_delta(key, purchases, credits, count):
+    card_id, closing, due = key
+    lookup = {'card_id': card_id, 'closing_date': closing}
+    changes = {
+        'purchases': F('purchases') + purchases,
+        'credits': F('credits') + credits,
+        'count': F('count') + count,
+    }
+
+    with transaction.atomic():
+        if CardStatement.objects.filter(**lookup).update(**changes):
+            if count < 0:
+                # Fatura sem nenhuma transação deixa de existir
+                CardStatement.objects.filter(**lookup, count__lte=0).delete()
+            return
+        if count < 0:
+            return
+        try:
+            # Mesmo tratamento de concorrência de `summaries._apply_delta`
+            with transaction.atomic():
+                CardStatement.objects.create(
+                    **lookup, due_date=due, purchases=purchases, credits=credits, count=count
+                )
+        except IntegrityError:
+            CardStatement.objects.filter(**lookup).update(**changes)
+
+
+def apply_to_statements(snapshots, sign=1):
+    """
+    Soma (sign=1) ou subtrai (sign=-1) transações de cartão das faturas dos seus ciclos.
+    Transações sem cartão são ignoradas.
+    """
+    with transaction.atomic():
+        for key, (purchases, credits, count) in _deltas(snapshots, sign).items():
+            _apply_delta(key, purchases, credits, count)
+
+
+def rebuild_card_statements(cards, today=None):
+    """
+    Recalcula as faturas dos cartões a partir das transações (necessário quando o
+    dia de fechamento muda). As transações são agrupadas por cartão e dia no banco;
+    só os dias distintos são distribuídos pelos ciclos. Faturas que já existiam
+    mantêm a marcação de pagas; faturas novas já vencidas são consideradas pagas.
+    """
+    today = today or timezone.localdate()
+    cycles = {card.pk: (card.closing_day, card.due_day) for card in cards}
+    rows = (
+        Transaction.objects.filter(card_id__in=list(cycles)).order_by()
+        .values('card_id', 'date')
+        .annotate(purchases=sum_of('expense'), credits=sum_of('income'), count=Count('id'))
+    )
+
+    statements = {}
+    for row in rows.iterator():
+        closing_day, due_day = cycles[row['card_id']]
+        closing = cycle_closing(closing_day, row['date'])
+        statement = statements.get((row['card_id'], closing))
+        if statement is None:
+            statement = statements[(row['card_id'], closing)] = CardStatement(
+                card_id=row['card_id'], closing_date=closing,
+                due_date=cycle_due(closing_day, due_day, closing), purchases=ZERO, credits=ZERO,
+            )
+        statement.purchases += row['purchases']
+        statement.credits += row['credits']
+        statement.count += row['count']
+
+    with transaction.atomic():
+        existing = CardStatement.objects.filter(card_id__in=list(cycles))
+        paid = {
+            (card_id, closing): is_paid
+            for card_id, closing, is_paid in existing.values_list('card_id', 'closing_date', 'is_paid')
+        }
+        for key, statement in statements.items():
+            statement.is_paid = paid.get(key, statement.due_date < today)
+        existing.delete()
+        CardStatement.objects.bulk_create(statements.values(), batch_size=1000)
+    return len(statements)
+
+
+def attach_statement_totals(cards, today=None):
+    """
+    Anota cada cartão com `current_statement`, `next_statement`, `current_bill`,
+    `next_bill`, `outstanding`, `closed_bill` e `available_limit`, com duas consultas para
+    todos os cartões: as faturas dos dois ciclos e a soma das faturas em aberto.
+    """
+    today = today or timezone.localdate()
+    cards = list(cards)
+    if not cards:
+        return cards
+
+    closings = {}
+    for card in cards:
+        current = cycle_closing(card.closing_day, today)
+        closings[card.pk] = (current, next_closing(card.closing_day, current))
+
+    wanted = {closing for pair in closings.values() for closing in pair}
+    statements = {
+        (statement.card_id, statement.closing_date): statement
+        for statement in CardStatement.objects.filter(card__in=cards, closing_date__in=wanted)
+    }
+    amount = F('purchases') - F('credits')
+    open_totals = {
+        row['card_id']: row
+        for row in CardStatement.objects.filter(card__in=cards, is_paid=False).order_by()
+        .values('card_id')
+        .annotate(
+            total=Sum(amount, output_field=MONEY),
+            closed=Sum(amount, filter=Q(closing_date__lte=today), default=ZERO, output_field=MONEY),
+        )
+    }
+
+    for card in cards:
+        current, following = closings[card.pk]
+        card.current_closing_date = current
+        card.current_statement = statements.get((card.pk, current))
+        card.next_statement = statements.get((card.pk, following))
+        card.current_bill = card.current_statement.amount if card.current_statement else ZERO
+        card.next_bill = card.next_statement.amount if card.next_statement else ZERO
+        totals = open_totals.get(card.pk, {})
+        card.outstanding = totals.get('total', ZERO)
+        # Faturas já fechadas e ainda não pagas
+        card.closed_bill = totals.get('closed', ZERO)
+        card.available_limit = card.limit - card.outstanding
+    return cards
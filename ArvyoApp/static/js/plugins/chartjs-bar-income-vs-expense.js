@@ -1,7 +1,7 @@
 //Transaction Graph 
 var ctx = document.getElementById("chartjsIncomeVsExpense")
 ctx.height = 100
-new Chart(ctx, {
+var incomeVsExpenseChart = new Chart(ctx, {
     type: 'bar',
     data: {
         labels: ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct"],
@@ -51,3 +51,17 @@ new Chart(ctx, {
         }
     }
 })
+
+// Com data-url no canvas, os dados reais vêm da API de análises (JSON em colunas)
+if (ctx.dataset.url) {
+    fetch(ctx.dataset.url, { credentials: "same-origin" })
+        .then(function (response) { return response.json() })
+        .then(function (payload) {
+            incomeVsExpenseChart.data.labels = payload.labels.map(function (label) { return label.slice(5, 7) + "/" + label.slice(0, 4) })
+            incomeVsExpenseChart.data.datasets[0].label = 'Receitas'
+            incomeVsExpenseChart.data.datasets[0].data = payload.income
+            incomeVsExpenseChart.data.datasets[1].label = 'Despesas'
+            incomeVsExpenseChart.data.datasets[1].data = payload.expense
+            incomeVsExpenseChart.update()
+        })
+}
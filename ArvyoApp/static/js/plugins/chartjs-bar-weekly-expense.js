@@ -1,7 +1,7 @@
 //Transaction Graph 
 var ctx = document.getElementById("chartjsWeeklyExpenses")
 ctx.height = 100
-new Chart(ctx, {
+var weeklyExpenseChart = new Chart(ctx, {
     type: 'bar',
     data: {
         labels: ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec", "Jan", "Feb", "Mar", "Apr", "May", "Jun"],
@@ -74,3 +74,18 @@ new Chart(ctx, {
         }
     }
 })
+
+// Com data-url no canvas, os dados reais vêm da API de análises (JSON em colunas)
+if (ctx.dataset.url) {
+    fetch(ctx.dataset.url, { credentials: "same-origin" })
+        .then(function (response) { return response.json() })
+        .then(function (payload) {
+            weeklyExpenseChart.data.labels = payload.labels.map(function (label) { return label.slice(8, 10) + "/" + label.slice(5, 7) })
+            weeklyExpenseChart.data.datasets = [{
+                label: 'Despesas',
+                data: payload.expense,
+                backgroundColor: 'rgba(217, 70, 239, 1)'
+            }]
+            weeklyExpenseChart.update()
+        })
+}
@@ -1,7 +1,7 @@
 //doughut chart
 var ctx = document.getElementById("chartjsDonut")
 // ctx.height = 175;
-new Chart(ctx, {
+var donutChart = new Chart(ctx, {
     type: "doughnut",
     data: {
         datasets: [
@@ -53,3 +53,17 @@ new Chart(ctx, {
         },
     },
 })
+
+// Com data-url no canvas, os dados reais vêm da API de análises (JSON em colunas)
+if (ctx.dataset.url) {
+    fetch(ctx.dataset.url, { credentials: "same-origin" })
+        .then(function (response) { return response.json() })
+        .then(function (payload) {
+            donutChart.data.labels = payload.labels
+            donutChart.data.datasets[0].data = payload.totals
+            donutChart.data.datasets[0].backgroundColor = payload.totals.map(function (total, index) {
+                return "rgba(22, 82, 240," + Math.max(1 - index * 0.2, 0.15) + ")"
+            })
+            donutChart.update()
+        })
+}
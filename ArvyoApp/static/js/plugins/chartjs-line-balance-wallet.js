@@ -1,7 +1,7 @@
 //Transaction Graph 
 var ctx = document.getElementById("chartjsBalanceWallet")
 ctx.height = 100
-var myChart = new Chart(ctx, {
+var balanceWalletChart = new Chart(ctx, {
     type: 'bar',
     data: {
         labels: ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M", "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z", "AA", "AB",],
@@ -44,3 +44,14 @@ var myChart = new Chart(ctx, {
         }
     }
 })
+
+// Com data-url no canvas, os dados reais vêm da API de análises (JSON em colunas)
+if (ctx.dataset.url) {
+    fetch(ctx.dataset.url, { credentials: "same-origin" })
+        .then(function (response) { return response.json() })
+        .then(function (payload) {
+            balanceWalletChart.data.labels = payload.accounts.labels
+            balanceWalletChart.data.datasets[0].data = payload.accounts.balances
+            balanceWalletChart.update()
+        })
+}
@@ -1,7 +1,7 @@
 //Transaction Graph 
 var ctx = document.getElementById("chartjsTotalBalance")
 ctx.height = 100
-var myChart = new Chart(ctx, {
+var totalBalanceChart = new Chart(ctx, {
     type: 'line',
     data: {
         labels: ["2010", "2011", "2012", "2013", "2014", "2015", "2016"],
@@ -73,3 +73,15 @@ var myChart = new Chart(ctx, {
         }
     }
 })
+
+// Com data-url no canvas, os dados reais vêm da API de análises (JSON em colunas)
+if (ctx.dataset.url) {
+    fetch(ctx.dataset.url, { credentials: "same-origin" })
+        .then(function (response) { return response.json() })
+        .then(function (payload) {
+            totalBalanceChart.data.labels = payload.labels.map(function (label) { return label.slice(5, 7) + "/" + label.slice(0, 4) })
+            totalBalanceChart.data.datasets[0].label = 'Saldo total'
+            totalBalanceChart.data.datasets[0].data = payload.total
+            totalBalanceChart.update()
+        })
+}
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import mimetypes
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .storage import ENCODINGS
+
+# Nomes com hash nunca mudam de conteúdo: o navegador não precisa nem revalidar
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Nomes sem hash (referências antigas, arquivos fora do manifesto) mudam a cada deploy
+SHORT_CACHE = 'public, max-age=60'
+
+CHUNK_SIZE = 64 * 1024
+TEXT_TYPES = ('application/javascript', 'application/json', 'image/svg+xml')
+
+
+def _accepted_encodings(header):
+    # "gzip, deflate, br;q=0.9" -> {'gzip', 'deflate', 'br'}; q=0 significa recusado
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if params.strip().replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, name, immutable):
+        stat = path.stat()
+        content_type, _ = mimetypes.guess_type(name)
+        content_type = content_type or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in TEXT_TYPES:
+            content_type += '; charset=utf-8'
+        self.headers = [
+            ('Content-Type', content_type),
+            ('Cache-Control', IMMUTABLE_CACHE if immutable else SHORT_CACHE),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+        ]
+
+        # (encoding, caminho, tamanho, etag) em ordem de preferência, terminando no original
+        tag = f'{stat.st_size:x}-{int(stat.st_mtime):x}'
+        self.variants = []
+        for encoding, suffix in ENCODINGS.items():
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                self.variants.append((encoding, str(variant), variant.stat().st_size, f'"{tag}-{encoding}"'))
+        if self.variants:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+        self.variants.append((None, str(path), stat.st_size, f'"{tag}"'))
+
+    def response(self, method, accept_encoding, if_none_match):
+        """(status, headers, caminho do corpo ou None) para um GET/HEAD."""
+        accepted = _accepted_encodings(accept_encoding)
+        encoding, path, size, etag = next(
+            variant for variant in self.variants if variant[0] is None or variant[0] in accepted
+        )
+        headers = self.headers + [('ETag', etag)]
+        if etag in if_none_match or if_none_match.strip() == '*':
+            return '304 Not Modified', headers, None
+        if encoding is not None:
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(size)))
+        return '200 OK', headers, path if method == 'GET' else None
+
+
+class StaticFiles:
+    """
+    Índice em memória do STATIC_ROOT gerado pelo `collectstatic`, montado uma vez na
+    inicialização do processo: cada requisição estática é uma busca num dicionário,
+    sem passar por middlewares, URLs ou views do Django. Com DEBUG o índice fica vazio
+    e o `runserver` continua servindo os arquivos do app.
+    """
+
+    def __init__(self, root=None, prefix=None):
+        self.prefix = prefix or urlsplit(settings.STATIC_URL).path
+        self.files = {}
+        root = root or settings.STATIC_ROOT
+        if root and not settings.DEBUG and Path(root).is_dir():
+            self._scan(Path(root))
+
+    def _scan(self, root):
+        manifest = root / 'staticfiles.json'
+        hashed = set(json.loads(manifest.read_text())['paths'].values()) if manifest.is_file() else set()
+        suffixes = tuple(ENCODINGS.values())
+        for path in root.rglob('*'):
+            if not path.is_file() or path.name.endswith(suffixes):
+                continue
+            name = path.relative_to(root).as_posix()
+            self.files[self.prefix + name] = StaticFile(path, name, name in hashed)
+
+    def find(self, method, path):
+        if method not in ('GET', 'HEAD'):
+            return None
+        return self.files.get(path)
+
+
+def _read_chunks(path):
+    with open(path, 'rb') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+class StaticFilesWSGI:
+    """Camada WSGI na frente da aplicação Django (ver `Arvyo/wsgi.py`)."""
+
+    def __init__(self, application, files=None):
+        self.application = application
+        self.files = files or StaticFiles()
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.find(environ['REQUEST_METHOD'], environ.get('PATH_INFO', ''))
+        if static_file is None:
+            return self.application(environ, start_response)
+        status, headers, path = static_file.response(
+            environ['REQUEST_METHOD'], environ.get('HTTP_ACCEPT_ENCODING', ''), environ.get('HTTP_IF_NONE_MATCH', '')
+        )
+        start_response(status, headers)
+        if path is None:
+            return []
+        # O servidor pode usar sendfile quando oferece wsgi.file_wrapper
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(open(path, 'rb'), CHUNK_SIZE)
+        return _read_chunks(path)
+
+
+class StaticFilesASGI:
+    """Camada ASGI na frente da aplicação Django (ver `Arvyo/asgi.py`)."""
+
+    def __init__(self, application, files=None):
+        self.application = application
+        self.files = files or StaticFiles()
+
+    async def __call__(self, scope, receive, send):
+        static_file = None
+        if scope['type'] == 'http':
+            static_file = self.files.find(scope['method'], scope['path'])
+        if static_file is None:
+            return await self.application(scope, receive, send)
+
+        request_headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        status, headers, path = static_file.response(
+            scope['method'], request_headers.get('accept-encoding', ''), request_headers.get('if-none-match', '')
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': int(status[:3]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        if path is None:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        # Leitura do disco fora do loop de eventos
+        chunks = _read_chunks(path)
+        try:
+            while chunk := await asyncio.to_thread(next, chunks, b''):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            chunks.close()
@@ -0,0 +1,75 @@
+import gzip
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    # brotli é opcional: sem ele só as variantes .gz são geradas
+    brotli = None
+
+# Formatos que já são comprimidos (imagens, fontes woff/woff2) não ganham nada
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.map', '.svg', '.html', '.txt', '.json', '.xml', '.ttf', '.eot', '.otf', '.ico'}
+# Variante só é gravada se ficar pelo menos 5% menor que o original
+MIN_SAVING = 0.95
+
+# Extensão de cada variante pré-comprimida, na ordem de preferência de `staticserve.py`
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def _compress(content):
+    variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    return variants
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Nomes com hash do conteúdo (ex: style.4f2a9c.css) mais as variantes .gz e .br de
+    cada arquivo de texto, geradas uma única vez no `collectstatic`. Em produção o
+    servidor só escolhe a variante pelo Accept-Encoding, sem comprimir nada por requisição.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Arquivo que não existe (há referências assim nos templates, e as imagens de
+            # bandeira são montadas pelo nome do cartão) fica com o nome sem hash, como antes,
+            # em vez de derrubar a página
+            return name
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def convert(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                # CSS/JS do tema citando um arquivo que não existe (imagem removida, .map não
+                # distribuído): a referência fica como está em vez de abortar o collectstatic
+                return matchobj.group(0)
+        return convert
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Originais e cópias com hash: as duas formas do nome continuam servidas
+        for name in set(self.hashed_files) | set(self.hashed_files.values()):
+            self._write_compressed(name)
+
+    def _write_compressed(self, name):
+        path = Path(self.path(name))
+        if path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS or not path.is_file():
+            return
+        content = path.read_bytes()
+        for encoding, compressed in _compress(content).items():
+            variant = path.with_name(path.name + ENCODINGS[encoding])
+            if len(compressed) < len(content) * MIN_SAVING:
+                variant.write_bytes(compressed)
+            else:
+                # Sem variante antiga de um conteúdo anterior do mesmo nome
+                variant.unlink(missing_ok=True)
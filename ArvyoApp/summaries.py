@@ -0,0 +1,152 @@
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils.dateparse import parse_date
+
+from .models import MonthlySummary, Transaction
+
+ZERO = Decimal('0.00')
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def as_date(value):
+    # `Transaction.date` pode chegar como string quando o objeto é criado com create(date='2025-01-01')
+    if isinstance(value, str):
+        return parse_date(value)
+    return value
+
+
+def month_of(value):
+    value = as_date(value)
+    return date(value.year, value.month, 1)
+
+
+# Campos de uma transação que determinam a sua contribuição para os resumos e o saldo
+SNAPSHOT_FIELDS = (
+    'user_id', 'account_id', 'card_id', 'date', 'amount',
+    'transaction_type', 'is_future_payment', 'is_paid',
+)
+
+
+def transaction_snapshot(transaction_obj):
+    return {field: getattr(transaction_obj, field) for field in SNAPSHOT_FIELDS}
+
+
+def _summary_key(snapshot):
+    return (
+        snapshot['user_id'],
+        snapshot['account_id'],
+        snapshot['card_id'],
+        month_of(snapshot['date']),
+    )
+
+
+def _apply_delta(key, income, expense, count):
+    user_id, account_id, card_id, month = key
+    lookup = {'user_id': user_id, 'account_id': account_id, 'card_id': card_id, 'month': month}
+    changes = {
+        'income': F('income') + income,
+        'expense': F('expense') + expense,
+        'count': F('count') + count,
+    }
+
+    with transaction.atomic():
+        if MonthlySummary.objects.filter(**lookup).update(**changes):
+            if count < 0:
+                # Remove o resumo quando a última transação do mês sai da carteira
+                MonthlySummary.objects.filter(**lookup, count__lte=0).delete()
+            return
+        if count < 0:
+            # Sem resumo para subtrair: a carteira está sendo excluída em cascata
+            return
+        try:
+            # Savepoint próprio: se outra requisição criou a linha ao mesmo tempo,
+            # a restrição única falha e a atualização é refeita sobre a linha existente
+            with transaction.atomic():
+                MonthlySummary.objects.create(**lookup, income=income, expense=expense, count=count)
+        except IntegrityError:
+            MonthlySummary.objects.filter(**lookup).update(**changes)
+
+
+def _deltas(snapshots, sign):
+    # Agrupa as contribuições por (usuário, conta, cartão, mês)
+    deltas = {}
+    for snapshot in snapshots:
+        amount = Decimal(snapshot['amount']) * sign
+        income, expense, count = deltas.get(_summary_key(snapshot), (ZERO, ZERO, 0))
+        if snapshot['transaction_type'] == 'income':
+            income += amount
+        elif snapshot['transaction_type'] == 'expense':
+            expense += amount
+        deltas[_summary_key(snapshot)] = (income, expense, count + sign)
+    return deltas
+
+
+def apply_to_summary(snapshot, sign=1):
+    """
+    Soma (sign=1) ou subtrai (sign=-1) uma transação do resumo mensal da sua carteira.
+    A atualização usa expressões F(), então escritas concorrentes não se sobrescrevem.
+    """
+    apply_many_to_summaries([snapshot], sign=sign)
+
+
+def apply_many_to_summaries(snapshots, sign=1):
+    """
+    Versão em lote de `apply_to_summary` para escritas que não disparam sinais
+    (bulk_create, exclusões em massa): uma atualização por resumo afetado,
+    não uma por transação.
+    """
+    with transaction.atomic():
+        for key, (income, expense, count) in _deltas(snapshots, sign).items():
+            _apply_delta(key, income, expense, count)
+
+
+def sum_of(transaction_type):
+    # Soma dos valores de um tipo de transação no grupo (zero se não houver nenhuma)
+    return Coalesce(
+        Sum('amount', filter=Q(transaction_type=transaction_type)),
+        Value(ZERO),
+        output_field=MONEY,
+    )
+
+
+def rebuild_monthly_summaries(user=None, batch_size=1000):
+    """
+    Recalcula os resumos mensais a partir das transações (de um usuário ou de todos)
+    com uma única consulta agrupada. Retorna a quantidade de resumos criados.
+    """
+    transactions = Transaction.objects.without_archived()
+    summaries = MonthlySummary.objects.all()
+    if user is not None:
+        transactions = transactions.for_user(user)
+        summaries = summaries.filter(user=user)
+
+    rows = (
+        transactions.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'account_id', 'card_id', 'month')
+        .annotate(income=sum_of('income'), expense=sum_of('expense'), count=Count('id'))
+    )
+
+    created = 0
+    with transaction.atomic():
+        summaries.delete()
+        pending = (MonthlySummary(**row) for row in rows.iterator(chunk_size=batch_size))
+        # bulk_create materializa a lista inteira, então os lotes são montados aqui
+        while batch := list(islice(pending, batch_size)):
+            MonthlySummary.objects.bulk_create(batch)
+            created += len(batch)
+    return created
+
+
+def monthly_totals(user, month, **filters):
+    """Receitas, despesas e quantidade de transações do usuário no mês, lidas dos resumos."""
+    return MonthlySummary.objects.filter(user=user, month=month_of(month), **filters).aggregate(
+        income=Coalesce(Sum('income'), Value(ZERO), output_field=MONEY),
+        expense=Coalesce(Sum('expense'), Value(ZERO), output_field=MONEY),
+        count=Coalesce(Sum('count'), Value(0)),
+    )
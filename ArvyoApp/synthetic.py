@@ -0,0 +1,196 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .ledger import SETTLED, SIGNED_AMOUNT, create_monthly_checkpoints
+from .models import Account, Card, Category, Transaction
+from .statements import rebuild_card_statements
+from .summaries import rebuild_monthly_summaries
+
+# Senha de todos os usuários sintéticos (usada pelo `benchmark_views` no signin)
+SYNTHETIC_PASSWORD = 'arvyo-sintetico'
+
+# Categorias de despesa: (nome, ícone, cor, faixa de valor em reais, peso, estabelecimentos)
+EXPENSE_CATEGORIES = (
+    ('Mercado', 'fi fi-rr-shopping-cart', 'bg-green-500', (30, 600), 20,
+     ('Supermercado Pão de Açúcar', 'Carrefour', 'Assaí Atacadista', 'Hortifruti', 'Dia Supermercado')),
+    ('Restaurantes', 'fi fi-rr-hamburger-soda', 'bg-orange-500', (15, 250), 18,
+     ('iFood', 'Outback', 'Padaria Real', 'Rappi', 'Burger King', 'Café Cultura')),
+    ('Transporte', 'fi fi-rr-car-side', 'bg-blue-500', (8, 180), 14,
+     ('Uber', '99 Táxi', 'Posto Shell', 'Posto Ipiranga', 'Sem Parar')),
+    ('Moradia', 'fi fi-rr-home', 'bg-indigo-500', (80, 3500), 5,
+     ('Aluguel', 'Condomínio', 'Enel Energia', 'Sabesp', 'Comgás')),
+    ('Assinaturas', 'fi fi-rr-clapperboard-play', 'bg-fuchsia-500', (10, 60), 8,
+     ('Netflix', 'Spotify', 'Amazon Prime', 'Disney Plus', 'Youtube Premium')),
+    ('Saúde', 'fi fi-rr-user-md', 'bg-pink-500', (20, 900), 6,
+     ('Drogasil', 'Droga Raia', 'Unimed', 'Laboratório Fleury')),
+    ('Educação', 'fi fi-rr-graduation-cap', 'bg-cyan-500', (40, 1500), 3,
+     ('Alura', 'Udemy', 'Escola Mundo Novo', 'Livraria Cultura')),
+    ('Compras', 'fi fi-rs-shopping-bag', 'bg-amber-500', (25, 1200), 10,
+     ('Mercado Livre', 'Amazon', 'Magazine Luiza', 'Renner', 'Shopee')),
+    ('Lazer', 'fi fi-rr-bowling', 'bg-lime-500', (20, 400), 6,
+     ('Cinemark', 'Ingresso.com', 'Parque Ibirapuera', 'Steam')),
+    ('Viagens', 'fi fi-rr-plane', 'bg-emerald-500', (150, 4000), 2,
+     ('Latam', 'Gol', 'Booking.com', 'Airbnb')),
+)
+
+# Receitas: (nome, ícone, cor, faixa de valor, peso, descrições)
+INCOME_CATEGORIES = (
+    ('Salário', 'fi fi-rr-sack-dollar', 'bg-green-500', (3000, 12000), 2, ('Salário', 'Adiantamento salarial')),
+    ('Freelance', 'fi fi-rr-briefcase', 'bg-blue-500', (300, 4000), 2, ('Freelance', 'Projeto', 'Consultoria')),
+    ('Rendimentos', 'fi fi-rr-arrow-trend-up', 'bg-emerald-500', (5, 600), 6, ('Rendimento CDB', 'Dividendos', 'Juros poupança')),
+    ('Transferências', 'fi fi-rr-replace', 'bg-cyan-500', (20, 2000), 6, ('PIX recebido', 'TED recebida', 'Reembolso')),
+)
+
+ACCOUNT_NAMES = ('Conta Corrente', 'Poupança', 'Conta Digital', 'Investimentos', 'Conta Salário')
+BANK_NAMES = ('Itaú', 'Bradesco', 'Nubank', 'Banco do Brasil', 'Caixa', 'Santander', 'Inter')
+CARD_BRANDS = ('visa', 'mastercard', 'elo', 'amex')
+
+# Proporções da massa gerada (receitas e despesas somam mais ou menos o mesmo no longo prazo)
+INCOME_SHARE = 0.2
+CARD_SHARE = 0.35
+FUTURE_SHARE = 0.02
+UNCATEGORIZED_SHARE = 0.2
+
+
+def _amount(rng, low, high):
+    # Valores pequenos são bem mais comuns que os grandes (distribuição log-uniforme)
+    value = low * (high / low) ** rng.random()
+    return Decimal(int(value * 100)) / 100
+
+
+def _description(rng, names):
+    name = rng.choice(names)
+    # Parte das descrições vem com o código da operação, como nos extratos
+    if rng.random() < 0.3:
+        return f'{name} {rng.randint(1000, 99999)}'
+    return name
+
+
+def _create_wallets(rng, user, accounts, cards):
+    wallets = [
+        Account.objects.create(
+            user=user,
+            name=ACCOUNT_NAMES[n % len(ACCOUNT_NAMES)],
+            bank_name=rng.choice(BANK_NAMES),
+            balance=_amount(rng, 100, 20000),
+        )
+        for n in range(accounts)
+    ]
+    wallet_cards = [
+        Card.objects.create(
+            user=user,
+            brand=rng.choice(CARD_BRANDS),
+            name_on_card=user.username.upper(),
+            card_name=f'Cartão {n + 1}',
+            card_number_masked=f'{rng.randint(0, 9999):04d}',
+            expiration_date=f'{rng.randint(1, 12):02d}/{rng.randint(27, 33)}',
+            limit=Decimal(rng.randrange(1000, 30000, 500)),
+            closing_day=rng.randint(1, 28),
+            due_day=rng.randint(1, 28),
+        )
+        for n in range(cards)
+    ]
+    return wallets, wallet_cards
+
+
+def _create_categories(user):
+    categories = []
+    for transaction_type, definitions in (('expense', EXPENSE_CATEGORIES), ('income', INCOME_CATEGORIES)):
+        created = Category.objects.bulk_create([
+            Category(user=user, name=name, icon_class=icon, color_class=color)
+            for name, icon, color, _, _, _ in definitions
+        ])
+        for category, (_, _, _, amounts, weight, descriptions) in zip(created, definitions):
+            categories.append((transaction_type, category, amounts, weight, descriptions))
+    return categories
+
+
+def _transactions(rng, user, accounts, cards, categories, count, years):
+    today = timezone.localdate()
+    days = 365 * years
+    expenses = [item for item in categories if item[0] == 'expense']
+    incomes = [item for item in categories if item[0] == 'income']
+    expense_weights = [item[3] for item in expenses]
+    income_weights = [item[3] for item in incomes]
+
+    for _ in range(count):
+        is_income = rng.random() < INCOME_SHARE
+        if is_income:
+            transaction_type, category, amounts, _, descriptions = rng.choices(incomes, income_weights)[0]
+        else:
+            transaction_type, category, amounts, _, descriptions = rng.choices(expenses, expense_weights)[0]
+        # Compras no cartão; receitas sempre caem numa conta
+        on_card = bool(cards) and not is_income and rng.random() < CARD_SHARE
+        is_future = rng.random() < FUTURE_SHARE
+        day = today - timedelta(days=rng.randint(0, days))
+        if is_future:
+            day = today + timedelta(days=rng.randint(1, 90))
+        yield Transaction(
+            user=user,
+            account=None if on_card else rng.choice(accounts),
+            card=rng.choice(cards) if on_card else None,
+            amount=_amount(rng, *amounts),
+            transaction_type=transaction_type,
+            description=_description(rng, descriptions),
+            category=None if rng.random() < UNCATEGORIZED_SHARE else category,
+            date=day,
+            is_future_payment=is_future,
+        )
+
+
+def _settle_balances(accounts):
+    # O saldo inicial sorteado vira o saldo antes da primeira transação
+    totals = dict(
+        Transaction.objects.filter(account__in=accounts).filter(SETTLED).order_by()
+        .values('account_id').annotate(total=Sum(SIGNED_AMOUNT)).values_list('account_id', 'total')
+    )
+    for account in accounts:
+        account.balance += totals.get(account.pk, 0)
+    Account.objects.bulk_update(accounts, ['balance'])
+
+
+def generate_user(username, password_hash, rng, accounts=3, cards=2, transactions=20_000, years=3, batch_size=10_000):
+    """
+    Cria um usuário com contas, cartões, categorias e `transactions` transações
+    espalhadas pelos últimos `years` anos. As transações entram por bulk_create, que
+    não dispara sinais: resumos mensais, faturas, saldos e checkpoints são
+    reconstruídos no final, como fazem os comandos `rebuild_*`.
+    """
+    with transaction.atomic():
+        user = User.objects.create(username=username, email=f'{username}@example.com', password=password_hash)
+        wallets, wallet_cards = _create_wallets(rng, user, max(accounts, 1), cards)
+        categories = _create_categories(user)
+
+        pending = _transactions(rng, user, wallets, wallet_cards, categories, transactions, years)
+        while batch := list(islice(pending, batch_size)):
+            Transaction.objects.bulk_create(batch)
+
+        rebuild_monthly_summaries(user=user)
+        rebuild_card_statements(wallet_cards)
+        _settle_balances(wallets)
+        for account in wallets:
+            create_monthly_checkpoints(account)
+        bump_data_version(user.pk)
+    return user
+
+
+def generate(users=10, prefix='synthetic', seed=42, **options):
+    """
+    Gera `users` usuários sintéticos ("<prefix>-0", "<prefix>-1", ...), todos com a
+    senha SYNTHETIC_PASSWORD. A mesma semente gera sempre a mesma massa
+    (com as datas contadas a partir de hoje).
+    """
+    rng = random.Random(seed)
+    # O hash da senha é caro de propósito: calculado uma vez para todos
+    password_hash = make_password(SYNTHETIC_PASSWORD)
+    for n in range(users):
+        yield generate_user(f'{prefix}-{n}', password_hash, rng, **options)
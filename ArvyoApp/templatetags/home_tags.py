@@ -1,7 +1,83 @@
 from django import template
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+from ArvyoApp.caching import CACHE_TIMEOUT, get_or_build
 
 register = template.Library()
 
 @register.filter
 def get_item(dictionary, key):
-    return dictionary.get(key)
\ No newline at end of file
+    return dictionary.get(key)
+
+
+class UserCacheNode(template.Node):
+    def __init__(self, nodelist, name, timeout):
+        self.nodelist = nodelist
+        self.name = name
+        self.timeout = timeout
+
+    def render(self, context):
+        request = context.get('request')
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return self.nodelist.render(context)
+
+        name = self.name.resolve(context)
+        timeout = self.timeout.resolve(context) if self.timeout else CACHE_TIMEOUT
+        html = get_or_build(f'fragment:{name}', user.pk, lambda: str(self.nodelist.render(context)), timeout)
+        return mark_safe(html)
+
+
+@register.tag
+def usercache(parser, token):
+    """
+    Guarda o HTML renderizado do bloco por usuário, versão dos dados e dia, ex:
+    {% usercache 'wallets' %} ... {% endusercache %}
+    O bloco é invalidado sozinho quando contas, cartões, transações ou categorias mudam
+    e na virada do dia (fatura atual, totais do mês).
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3):
+        raise template.TemplateSyntaxError(f"'{bits[0]}' recebe um nome e, opcionalmente, o timeout.")
+    nodelist = parser.parse(('endusercache',))
+    parser.delete_first_token()
+    timeout = parser.compile_filter(bits[2]) if len(bits) == 3 else None
+    return UserCacheNode(nodelist, parser.compile_filter(bits[1]), timeout)
+
+
+# HTML dos partials fixos do layout, renderizado uma vez por processo e nome
+_static_fragments = {}
+
+
+class StaticFragmentNode(template.Node):
+    def __init__(self, nodelist, name):
+        self.nodelist = nodelist
+        self.name = name
+
+    def render(self, context):
+        if settings.DEBUG:
+            # Em desenvolvimento os templates mudam sem reiniciar o processo
+            return self.nodelist.render(context)
+        name = self.name.resolve(context)
+        html = _static_fragments.get(name)
+        if html is None:
+            html = _static_fragments[name] = mark_safe(self.nodelist.render(context))
+        return html
+
+
+@register.tag
+def staticfragment(parser, token):
+    """
+    Guarda na memória do processo o HTML de um bloco que não depende do contexto
+    (cabeçalho, menu lateral, rodapé), ex:
+    {% staticfragment 'sidebar' %}{% include 'partials/sidebar.html' %}{% endstaticfragment %}
+    Diferente de `usercache`, não há consulta ao cache nem versão: o bloco só muda
+    com um novo deploy, que reinicia o processo.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' recebe só o nome do fragmento.")
+    nodelist = parser.parse(('endstaticfragment',))
+    parser.delete_first_token()
+    return StaticFragmentNode(nodelist, parser.compile_filter(bits[1]))
@@ -0,0 +1,745 @@
+import json
+from datetime import date
+from decimal import Decimal
+from functools import partial
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import forecast, recurring
+from .analytics import balance_history
+from .archiving import archive_wallet, purge_archived_wallets
+from .backends import FAILURE_LIMIT
+from .budgets import evaluate_budgets
+from .caching import data_version, get_or_build
+from .categorization import categorize_uncategorized
+from .icons import TRIMMED_CSS
+from .importers import StatementImporter, import_statement
+from .instrumentation import reset_stats, view_stats
+from .ledger import balance_at, balances_at, create_monthly_checkpoints, mark_paid
+from .models import (
+    CATEGORY_ICONS, Account, BalanceCheckpoint, Budget, Card, CardStatement, Category, CategoryRule, Goal,
+    MonthlySummary, RecurringRule, Transaction, TransactionSearch,
+)
+from .pagination import estimated_row_count
+from .search import description_match, match_expression, search_transactions
+from .summaries import rebuild_monthly_summaries
+from .wallets import get_wallets_context
+
+
+def summary_rows(user):
+    return sorted(
+        MonthlySummary.objects.filter(user=user)
+        .values_list('account_id', 'card_id', 'month', 'income', 'expense', 'count')
+    )
+
+
+class WalletsContextTests(TestCase):
+    def create_wallets(self, user, count):
+        for index in range(count):
+            account = Account.objects.create(user=user, name=f"Conta {index}")
+            card = Card.objects.create(
+                user=user, brand='Visa', name_on_card='Teste', card_number_masked='**** 1234',
+                expiration_date='12/30', limit=Decimal('1000.00'),
+            )
+            for wallet in ({'account': account}, {'card': card}):
+                Transaction.objects.create(
+                    user=user, amount=Decimal('10.00'), transaction_type='expense', date=date(2024, 1, 15), **wallet,
+                )
+
+    def test_query_count_does_not_grow_with_wallets(self):
+        # Contas + prefetch, cartões + prefetch, faturas dos dois ciclos + soma das faturas em aberto
+        for count in (1, 6):
+            with self.subTest(wallets=count):
+                user = User.objects.create_user(f'wallets-{count}')
+                self.create_wallets(user, count)
+                with self.assertNumQueries(6):
+                    context = get_wallets_context(user)
+                self.assertEqual(len(context['user_accounts']), count)
+                self.assertEqual(len(context['user_cards']), count)
+                self.assertEqual(set(context['expenses_by_account'].values()), {Decimal('10.00')})
+
+
+class MonthlySummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('summaries')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+
+    def assertMatchesRebuild(self):
+        incremental = summary_rows(self.user)
+        rebuild_monthly_summaries(self.user)
+        self.assertEqual(incremental, summary_rows(self.user))
+
+    def test_signals_keep_summaries_equal_to_a_rebuild(self):
+        salary = Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('3000.00'), transaction_type='income', date=date(2024, 1, 5),
+        )
+        rent = Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('1200.00'), transaction_type='expense', date=date(2024, 1, 10),
+        )
+        self.assertEqual(summary_rows(self.user), [
+            (self.account.pk, None, date(2024, 1, 1), Decimal('3000.00'), Decimal('1200.00'), 2),
+        ])
+
+        # Mudança de valor e de mês: sai de janeiro e entra em fevereiro
+        rent.amount = Decimal('1250.00')
+        rent.date = date(2024, 2, 10)
+        rent.save()
+        self.assertMatchesRebuild()
+
+        # A última transação do mês leva o resumo junto
+        salary.delete()
+        self.assertEqual(summary_rows(self.user), [
+            (self.account.pk, None, date(2024, 2, 1), Decimal('0.00'), Decimal('1250.00'), 1),
+        ])
+        self.assertMatchesRebuild()
+
+
+class BalanceCheckpointTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('checkpoints')
+        self.account = Account.objects.create(user=user, name="Conta", balance=Decimal('1000.00'))
+        self.transaction = partial(Transaction.objects.create, user=user, account=self.account)
+
+    def balances(self):
+        self.account.refresh_from_db()
+        checkpoints = dict(BalanceCheckpoint.objects.filter(account=self.account).values_list('date', 'balance'))
+        return self.account.balance, checkpoints
+
+    def test_writes_before_a_checkpoint_move_it_with_the_balance(self):
+        self.transaction(amount=Decimal('500.00'), transaction_type='income', date=date(2024, 1, 5))
+        self.assertEqual(create_monthly_checkpoints(self.account), 1)
+        self.assertEqual(self.balances(), (Decimal('1500.00'), {date(2024, 1, 31): Decimal('1500.00')}))
+
+        # Antes do checkpoint: saldo e checkpoint mudam; depois dele: só o saldo
+        rent = self.transaction(amount=Decimal('200.00'), transaction_type='expense', date=date(2024, 1, 20))
+        self.transaction(amount=Decimal('100.00'), transaction_type='expense', date=date(2024, 2, 3))
+        self.assertEqual(self.balances(), (Decimal('1200.00'), {date(2024, 1, 31): Decimal('1300.00')}))
+
+        # Pagamento futuro só movimenta a conta depois de pago
+        bill = self.transaction(
+            amount=Decimal('50.00'), transaction_type='expense', date=date(2024, 1, 25), is_future_payment=True,
+        )
+        self.assertEqual(self.balances()[0], Decimal('1200.00'))
+        self.assertEqual(mark_paid(Transaction.objects.filter(pk=bill.pk)), 1)
+        self.assertEqual(self.balances(), (Decimal('1150.00'), {date(2024, 1, 31): Decimal('1250.00')}))
+
+        rent.delete()
+        self.assertEqual(self.balances(), (Decimal('1350.00'), {date(2024, 1, 31): Decimal('1450.00')}))
+
+    def test_balance_at_starts_from_the_nearest_checkpoint(self):
+        self.transaction(amount=Decimal('500.00'), transaction_type='income', date=date(2024, 1, 5))
+        self.transaction(amount=Decimal('100.00'), transaction_type='expense', date=date(2024, 2, 3))
+        create_monthly_checkpoints(self.account)
+        self.assertEqual(balance_at(self.account, date(2024, 1, 4)), Decimal('1000.00'))
+        self.assertEqual(balance_at(self.account, date(2024, 1, 31)), Decimal('1500.00'))
+        self.assertEqual(balance_at(self.account, date(2024, 2, 10)), Decimal('1400.00'))
+
+
+class CardStatementTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('statements')
+        self.card = Card.objects.create(
+            user=user, brand='Visa', name_on_card='Teste', card_number_masked='**** 1234',
+            expiration_date='12/30', closing_day=25, due_day=5,
+        )
+        self.transaction = partial(Transaction.objects.create, user=user, card=self.card, transaction_type='expense')
+
+    def statements(self):
+        return list(
+            CardStatement.objects.filter(card=self.card).order_by('closing_date')
+            .values_list('closing_date', 'due_date', 'purchases', 'credits', 'count')
+        )
+
+    def test_transactions_go_to_the_statement_of_their_cycle(self):
+        self.transaction(amount=Decimal('100.00'), date=date(2024, 1, 24))
+        # No dia do fechamento a compra já entra na fatura seguinte
+        late = self.transaction(amount=Decimal('40.00'), date=date(2024, 1, 25))
+        self.transaction(amount=Decimal('15.00'), transaction_type='income', date=date(2024, 1, 10))
+        self.assertEqual(self.statements(), [
+            (date(2024, 1, 25), date(2024, 2, 5), Decimal('100.00'), Decimal('15.00'), 2),
+            (date(2024, 2, 25), date(2024, 3, 5), Decimal('40.00'), Decimal('0.00'), 1),
+        ])
+
+        # A última transação da fatura leva a fatura junto
+        late.delete()
+        self.assertEqual([row[0] for row in self.statements()], [date(2024, 1, 25)])
+
+    def test_changing_the_closing_day_redistributes_the_cycles(self):
+        self.transaction(amount=Decimal('100.00'), date=date(2024, 1, 12))
+        self.transaction(amount=Decimal('40.00'), date=date(2024, 1, 20))
+        self.card.closing_day = 15
+        self.card.save()
+        self.assertEqual(self.statements(), [
+            (date(2024, 1, 15), date(2024, 2, 5), Decimal('100.00'), Decimal('0.00'), 1),
+            (date(2024, 2, 15), date(2024, 3, 5), Decimal('40.00'), Decimal('0.00'), 1),
+        ])
+
+
+class StatementImportTests(TestCase):
+    CSV = [
+        'data,valor,descricao',
+        '2024-01-05,3000.00,Salario',
+        '2024-01-10,-120.50,Mercado',
+        '2024-01-12,-45.00,Farmacia',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_user('imports')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+
+    def import_csv(self, lines):
+        return import_statement(self.user, lines, 'csv', account=self.account)
+
+    def assertTotals(self, count, balance):
+        self.account.refresh_from_db()
+        self.assertEqual(Transaction.objects.filter(account=self.account).count(), count)
+        self.assertEqual(self.account.balance, balance)
+        incremental = summary_rows(self.user)
+        rebuild_monthly_summaries(self.user)
+        self.assertEqual(incremental, summary_rows(self.user))
+
+    def test_reimport_skips_duplicates(self):
+        self.assertEqual(str(self.import_csv(self.CSV)), "3 importadas, 0 duplicadas, 0 inválidas")
+        result = self.import_csv(self.CSV + ['2024-01-20,-10.00,Padaria'])
+        self.assertEqual((result.created, result.duplicates), (1, 3))
+        self.assertTotals(4, Decimal('2824.50'))
+
+    def test_rows_written_by_a_concurrent_import_are_not_counted_twice(self):
+        self.import_csv(self.CSV)
+        new_transactions = StatementImporter._new_transactions
+
+        def stale_read(importer, batch):
+            # A primeira leitura não vê as linhas que outra importação acabou de gravar
+            stale_read.calls += 1
+            if stale_read.calls == 1:
+                return [Transaction(user_id=importer.user.pk, **fields) for fields in batch]
+            return new_transactions(importer, batch)
+        stale_read.calls = 0
+
+        with mock.patch.object(StatementImporter, '_new_transactions', stale_read):
+            result = self.import_csv(self.CSV + ['2024-01-20,-10.00,Padaria'])
+        self.assertEqual((result.created, result.duplicates), (1, 3))
+        self.assertTotals(4, Decimal('2824.50'))
+
+    def test_view_rejects_invalid_wallet(self):
+        self.client.force_login(self.user)
+        for wallet in ('account:abc', 'account:', 'card:1.5', 'conta:1'):
+            with self.subTest(wallet=wallet):
+                statement = SimpleUploadedFile('extrato.csv', '\n'.join(self.CSV).encode())
+                response = self.client.post(reverse('importStatement'), {'statement': statement, 'wallet': wallet}, follow=True)
+                self.assertRedirects(response, reverse('importStatement'))
+                self.assertContains(response, "Carteira de destino inválida.")
+        self.assertFalse(Transaction.objects.exists())
+
+        statement = SimpleUploadedFile('extrato.csv', '\n'.join(self.CSV).encode())
+        self.client.post(reverse('importStatement'), {'statement': statement, 'wallet': f'account:{self.account.pk}'})
+        self.assertTotals(3, Decimal('2834.50'))
+
+
+class RecurringRuleTests(TestCase):
+    TODAY = date(2024, 1, 10)
+
+    def setUp(self):
+        self.user = User.objects.create_user('recurring')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+        self.rule = RecurringRule.objects.create(
+            user=self.user, account=self.account, amount=Decimal('100.00'), transaction_type='expense',
+            description="Aluguel", frequency='weekly', start_date=date(2024, 1, 1),
+        )
+
+    def materialize(self):
+        return recurring.materialize_recurring(today=self.TODAY, horizon_days=30)
+
+    def assertMaterialized(self, count):
+        occurrences = list(Transaction.objects.filter(recurring_rule=self.rule).values_list('occurrence', flat=True))
+        self.assertEqual(len(occurrences), count)
+        self.assertEqual(len(set(occurrences)), count)
+        incremental = summary_rows(self.user)
+        rebuild_monthly_summaries(self.user)
+        self.assertEqual(incremental, summary_rows(self.user))
+
+    def test_materializing_again_creates_nothing(self):
+        # Semanal a partir de 01/01: de 15/01 a 05/02 (as passadas não viram pendências)
+        self.assertEqual(self.materialize(), (1, 4))
+        self.assertEqual(self.materialize(), (0, 0))
+        self.assertMaterialized(4)
+
+        # Sem a marca de até onde a regra foi, as ocorrências existentes são puladas
+        RecurringRule.objects.filter(pk=self.rule.pk).update(materialized_until=None)
+        self.assertEqual(self.materialize(), (1, 0))
+        self.assertMaterialized(4)
+
+    def test_occurrences_written_by_a_concurrent_run_are_not_counted_twice(self):
+        self.materialize()
+        RecurringRule.objects.filter(pk=self.rule.pk).update(materialized_until=None)
+        not_materialized = recurring._not_materialized
+
+        def stale_read(rules, pending):
+            # A primeira leitura não vê as ocorrências que outra execução acabou de gravar
+            stale_read.calls += 1
+            return pending if stale_read.calls == 1 else not_materialized(rules, pending)
+        stale_read.calls = 0
+
+        with mock.patch.object(recurring, '_not_materialized', stale_read):
+            self.assertEqual(self.materialize(), (1, 0))
+        self.assertMaterialized(4)
+
+
+class BalanceHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('history')
+
+    def create_accounts(self, count):
+        for index in range(count):
+            account = Account.objects.create(user=self.user, name=f"Conta {index}", balance=Decimal('1000.00'))
+            for day, amount in ((date(2023, 11, 5), '300.00'), (date(2024, 2, 10), '50.00'), (date(2024, 4, 1), '20.00')):
+                Transaction.objects.create(
+                    user=self.user, account=account, amount=Decimal(amount), transaction_type='expense', date=day,
+                )
+            # Checkpoints antes da data, só depois dela ou nenhum
+            if index % 3 == 0:
+                create_monthly_checkpoints(account)
+            elif index % 3 == 1:
+                BalanceCheckpoint.objects.create(account=account, date=date(2024, 2, 29), balance=Decimal('650.00'))
+
+    def test_balances_at_matches_balance_at(self):
+        self.create_accounts(6)
+        accounts = Account.objects.filter(user=self.user).order_by('name')
+        for day in (date(2023, 10, 31), date(2024, 1, 31), date(2024, 3, 15), date(2024, 5, 1)):
+            with self.subTest(day=day):
+                self.assertEqual(
+                    {account.pk: balance for account, balance in balances_at(accounts, day).items()},
+                    {account.pk: balance_at(account, day) for account in accounts},
+                )
+
+    def test_query_count_does_not_grow_with_accounts(self):
+        # Contas com os checkpoints vizinhos, saldo de abertura e movimento mensal
+        for count in (1, 9):
+            with self.subTest(accounts=count):
+                Account.objects.filter(user=self.user).delete()
+                self.create_accounts(count)
+                with self.assertNumQueries(3):
+                    history = balance_history(self.user, date(2024, 4, 30), months=6)
+                self.assertEqual(len(history['accounts']['labels']), count)
+                self.assertEqual(history['total'][0], count * 700.0)
+
+
+class EstimatedRowCountTests(TestCase):
+    def test_estimate_uses_the_largest_index_count(self):
+        user = User.objects.create_user('admin-count')
+        account = Account.objects.create(user=user, name="Conta")
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=user, account=account, amount=Decimal('10.00'), transaction_type='expense',
+                date=date(2024, 1, 1 + index % 28), is_future_payment=index < 3,
+            )
+            for index in range(53)
+        )
+        # Sem ANALYZE: contagem exata
+        self.assertEqual(estimated_row_count(Transaction), 53)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute(
+                "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s AND idx = 'txn_pending_payment_idx'",
+                [Transaction._meta.db_table],
+            )
+            # O índice parcial só tem os pagamentos pendentes
+            self.assertEqual(cursor.fetchone(), (3,))
+        self.assertEqual(estimated_row_count(Transaction), 53)
+
+
+class CategoryIconTests(TestCase):
+    def test_every_category_icon_is_in_the_trimmed_css(self):
+        # Falha quando CATEGORY_ICONS muda sem rodar `manage.py trim_icon_fonts`
+        css = TRIMMED_CSS.read_text(encoding='utf-8')
+        for icon_class, _ in CATEGORY_ICONS:
+            glyph = icon_class.split()[-1]
+            with self.subTest(icon=glyph):
+                self.assertIn(f'.{glyph}:before{{', css)
+
+
+class ReadReplicaViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('replica')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+        Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('42.00'),
+            transaction_type='expense', date=date(2024, 1, 15),
+        )
+        self.client.force_login(self.user)
+
+    def test_views_see_uncommitted_test_data(self):
+        # Os dados do TestCase não foram confirmados: as leituras precisam ficar na conexão padrão
+        response = self.client.get(reverse('wallets'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['expenses_by_account'][self.account.pk], Decimal('42.00'))
+
+        response = self.client.get(reverse('wallet_detail', args=['account', self.account.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['transactions']), 1)
+
+        response = self.client.get(reverse('exportTransactions', args=['csv']))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('42', b''.join(response.streaming_content).decode())
+
+
+# Hash rápido: o custo do PBKDF2 não é o que se testa aqui
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SigninTests(TestCase):
+    password = 'senha-de-teste'
+
+    def setUp(self):
+        # Os contadores de falhas ficam no cache, que não é desfeito com a transação do teste
+        cache.clear()
+        self.user = User.objects.create_user('ana', email='Ana@Example.com', password=self.password)
+
+    def signin(self, identifier, password=None):
+        return self.client.post(reverse('signin'), {'email': identifier, 'password': password or self.password})
+
+    def test_login_by_email_or_username(self):
+        for identifier in ('ana@example.com', 'ana'):
+            with self.subTest(identifier=identifier):
+                response = self.signin(identifier)
+                self.assertRedirects(response, reverse('index'), fetch_redirect_response=False)
+                self.assertEqual(int(self.client.session['_auth_user_id']), self.user.pk)
+                self.client.logout()
+
+    def test_throttled_after_failure_limit(self):
+        for _ in range(FAILURE_LIMIT - 1):
+            self.assertEqual(self.signin('ana', 'errada').status_code, 200)
+        self.assertEqual(self.signin('ana', 'errada').status_code, 429)
+        # Nem a senha certa passa enquanto a janela não expira
+        self.assertEqual(self.signin('ana').status_code, 429)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_success_resets_failures(self):
+        for _ in range(FAILURE_LIMIT - 1):
+            self.signin('ana', 'errada')
+        self.assertEqual(self.signin('ana').status_code, 302)
+        self.client.logout()
+        for _ in range(FAILURE_LIMIT - 1):
+            self.assertEqual(self.signin('ana', 'errada').status_code, 200)
+        self.assertEqual(self.signin('ana').status_code, 302)
+
+    def test_deactivated_user_is_anonymous_on_next_request(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('wallets')).status_code, 200)
+        # `update()` não dispara sinais: o usuário da sessão precisa vir do banco
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.get(reverse('wallets'))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+
+class TransactionSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('busca')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+
+    def create(self, description, user=None):
+        user = user or self.user
+        account = self.account if user == self.user else Account.objects.create(user=user, name="Outra")
+        return Transaction.objects.create(
+            user=user, account=account, amount=Decimal('10.00'), transaction_type='expense',
+            date=date(2024, 1, 15), description=description,
+        )
+
+    def found(self, query):
+        return [item.pk for item in search_transactions(self.user, query)]
+
+    def test_match_lookup(self):
+        market = self.create("Supermercado Central")
+        self.create("Posto de gasolina")
+        other = self.create("Supermercado Central", user=User.objects.create_user('outro'))
+
+        matches = TransactionSearch.objects.filter(document__match=description_match(['supermercado']))
+        self.assertEqual(set(matches.values_list('transaction_id', flat=True)), {market.pk, other.pk})
+        # Com o dono na expressão o próprio índice descarta as linhas dos outros usuários
+        matches = TransactionSearch.objects.filter(document__match=match_expression(self.user.pk, ['supermercado']))
+        self.assertEqual(list(matches.values_list('transaction_id', flat=True)), [market.pk])
+
+    def test_triggers_follow_create_update_and_delete(self):
+        transaction = self.create("Farmácia do bairro")
+        self.assertEqual(self.found('farmacia'), [transaction.pk])
+
+        transaction.description = "Padaria do bairro"
+        transaction.save()
+        self.assertEqual(self.found('farmacia'), [])
+        self.assertEqual(self.found('padaria'), [transaction.pk])
+        self.assertEqual(self.found('bairro'), [transaction.pk])
+
+        transaction.delete()
+        self.assertEqual(self.found('padaria'), [])
+        self.assertEqual(self.found('bairro'), [])
+
+    def test_prefix_and_diacritics(self):
+        transaction = self.create("Café São João")
+        for query in ('caf', 'cafe', 'café', 'sao joao', 'SÃO', 'jo caf'):
+            with self.subTest(query=query):
+                self.assertEqual(self.found(query), [transaction.pk])
+        # Todos os termos precisam aparecer
+        self.assertEqual(self.found('cafe mercado'), [])
+
+    def test_queries_without_terms_are_empty(self):
+        self.create("Livraria \"Central\"")
+        for query in ('"', '""', '" "', '*', ''):
+            with self.subTest(query=query):
+                self.assertEqual(self.found(query), [])
+        # Aspas no meio dos termos não viram sintaxe do FTS5
+        self.assertEqual(len(self.found('"central')), 1)
+
+
+class BudgetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('orcamentos')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+        self.card = Card.objects.create(
+            user=self.user, brand='Visa', name_on_card='Teste', card_number_masked='**** 1234',
+            expiration_date='12/30', limit=Decimal('1000.00'),
+        )
+        # Categoria global: as transações de outros usuários não podem entrar no gasto
+        self.category = Category.objects.create(name="Mercado")
+        self.budget = Budget.objects.create(
+            user=self.user, category=self.category, amount=Decimal('500.00'),
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 31),
+        )
+
+    def expense(self, amount, day, user=None, **wallet):
+        return Transaction.objects.create(
+            user=user or self.user, amount=Decimal(amount), transaction_type='expense', date=day,
+            category=self.category, **(wallet or {'account': self.account}),
+        )
+
+    def test_spent_counts_only_the_budget_expenses(self):
+        self.expense('100.00', date(2024, 1, 10))
+        self.expense('50.00', date(2024, 1, 20), card=self.card)
+        # Fora do período, de outro usuário e receitas não contam
+        self.expense('70.00', date(2024, 2, 1))
+        other = User.objects.create_user('outro')
+        self.expense('30.00', date(2024, 1, 10), user=other, account=Account.objects.create(user=other, name="Outra"))
+        Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('900.00'), transaction_type='income',
+            date=date(2024, 1, 5), category=self.category,
+        )
+
+        [status] = evaluate_budgets(self.user, today=date(2024, 1, 16))
+        self.assertEqual(status['spent'], Decimal('150.00'))
+        self.assertEqual(status['remaining'], Decimal('350.00'))
+        self.assertEqual(status['percent_used'], Decimal('30.0'))
+        # 150 em 16 de 31 dias: projeção de 290.62, abaixo de 80% do orçamento
+        self.assertEqual(status['projected'], Decimal('290.62'))
+        self.assertEqual(status['status'], 'ok')
+
+    def test_archived_card_is_excluded(self):
+        self.expense('100.00', date(2024, 1, 10))
+        self.expense('450.00', date(2024, 1, 12), card=self.card)
+        [status] = evaluate_budgets(self.user, today=date(2024, 1, 16))
+        self.assertEqual(status['status'], 'exceeded')
+
+        archive_wallet(self.card)
+        [status] = evaluate_budgets(self.user, today=date(2024, 1, 16))
+        self.assertEqual(status['spent'], Decimal('100.00'))
+        self.assertEqual(status['status'], 'ok')
+
+
+class ForecastTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('projecao')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+        # Histórico de 90 dias: -900 dá uma média de -10 por dia
+        Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('900.00'), transaction_type='expense',
+            date=date(2024, 3, 1),
+        )
+        Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('500.00'), transaction_type='income',
+            date=date(2024, 4, 10), is_future_payment=True,
+        )
+        Goal.objects.create(user=self.user, name="Reserva", target_amount=Decimal('100.00'))
+        self.balance = float(Account.objects.get(pk=self.account.pk).balance)
+
+    def assertProjection(self, result):
+        balances = result['accounts']['balances'][0]
+        self.assertEqual(result['start'], date(2024, 3, 31))
+        self.assertEqual(result['days'], 365)
+        self.assertEqual(balances[0], self.balance - 10)
+        self.assertEqual(balances[9], self.balance - 100)
+        # O recebimento agendado entra no dia dele
+        self.assertEqual(balances[10], self.balance - 110 + 500)
+        self.assertEqual(result['total'], balances)
+        # Crescimento de 390 em 10/04 cobre os 100 da meta
+        [goal] = result['goals']
+        self.assertEqual(goal['reached_on'], date(2024, 4, 10))
+        self.assertTrue(goal['on_track'])
+
+    def test_projection_with_and_without_numpy(self):
+        with_numpy = forecast.forecast(self.user, today=date(2024, 3, 31))
+        self.assertProjection(with_numpy)
+        with mock.patch.object(forecast, 'np', None):
+            without_numpy = forecast.forecast(self.user, today=date(2024, 3, 31))
+        self.assertProjection(without_numpy)
+        self.assertEqual(with_numpy, without_numpy)
+
+
+class CategorizationTests(TestCase):
+    def setUp(self):
+        # O histórico e as regras ficam em cache pelo id do usuário, que se repete entre os testes
+        cache.clear()
+        self.user = User.objects.create_user('categorias')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+        self.transport = Category.objects.create(user=self.user, name="Transporte")
+        self.market = Category.objects.create(user=self.user, name="Mercado")
+        CategoryRule.objects.create(user=self.user, category=self.transport, pattern='uber')
+        for _ in range(3):
+            self.create("Supermercado Extra", category=self.market)
+
+    def create(self, description, category=None, **wallet):
+        return Transaction.objects.create(
+            user=self.user, amount=Decimal('20.00'), transaction_type='expense', date=date(2024, 1, 15),
+            description=description, category=category, **(wallet or {'account': self.account}),
+        )
+
+    def test_rules_then_history_in_batches(self):
+        by_rule = self.create("UBER *TRIP 8841")
+        by_history = self.create("SUPERMERCADO EXTRA 0055")
+        unknown = self.create("Loja qualquer")
+        card = Card.objects.create(
+            user=self.user, brand='Visa', name_on_card='Teste', card_number_masked='**** 1234',
+            expiration_date='12/30', limit=Decimal('1000.00'),
+        )
+        archived = self.create("Uber viagem", card=card)
+        archive_wallet(card)
+
+        # Lotes de 2: as três transações pendentes das carteiras ativas passam por dois lotes
+        self.assertEqual(categorize_uncategorized(self.user, batch_size=2), (3, 2))
+        categories = dict(Transaction.objects.values_list('pk', 'category_id'))
+        self.assertEqual(categories[by_rule.pk], self.transport.pk)
+        self.assertEqual(categories[by_history.pk], self.market.pk)
+        self.assertIsNone(categories[unknown.pk])
+        self.assertIsNone(categories[archived.pk])
+
+        # Nada novo para categorizar: só a que continua sem sugestão é examinada
+        self.assertEqual(categorize_uncategorized(self.user), (1, 0))
+
+
+class StaticPageTests(TestCase):
+    def test_etag_revalidation(self):
+        response = self.client.get(reverse('privacy'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('private', response['Cache-Control'])
+
+        response = self.client.get(reverse('privacy'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        # ETag de outra versão da página: o corpo inteiro volta
+        response = self.client.get(reverse('privacy'), HTTP_IF_NONE_MATCH='"outra"')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content)
+
+    def test_login_required_pages(self):
+        response = self.client.get(reverse('analytics'))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(User.objects.create_user('paginas'))
+        response = self.client.get(reverse('analytics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        response = self.client.get(reverse('analytics'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        reset_stats()
+        self.client.force_login(User.objects.create_user('metricas'))
+
+    def test_server_timing_and_query_count(self):
+        with CaptureQueriesContext(connection) as queries, self.assertLogs('ArvyoApp.requests', 'INFO') as logs:
+            response = self.client.get(reverse('wallets'))
+        self.assertEqual(response.status_code, 200)
+
+        timing = dict(metric.strip().split(';', 1) for metric in response['Server-Timing'].split(','))
+        self.assertEqual(set(timing), {'db', 'render', 'total'})
+        self.assertIn(f'desc="{len(queries)} queries"', timing['db'])
+
+        [entry] = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        self.assertEqual(entry['view'], 'wallets')
+        self.assertEqual(entry['queries'], len(queries))
+        self.assertGreater(entry['render_ms'], 0)
+        [stats] = view_stats()
+        self.assertEqual((stats['view'], stats['requests'], stats['queries']), ('wallets', 1, len(queries)))
+
+
+class ArchivingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('arquivo')
+        self.account = Account.objects.create(user=self.user, name="Conta")
+        self.card = Card.objects.create(
+            user=self.user, brand='Visa', name_on_card='Teste', card_number_masked='**** 1234',
+            expiration_date='12/30', limit=Decimal('1000.00'), closing_day=10, due_day=20,
+        )
+        for wallet in ({'account': self.account}, {'card': self.card}):
+            Transaction.objects.create(
+                user=self.user, amount=Decimal('25.00'), transaction_type='expense', date=date(2024, 1, 15),
+                description="Compra", **wallet,
+            )
+
+    def test_archive_then_purge(self):
+        self.assertTrue(CardStatement.objects.filter(card=self.card).exists())
+        archive_wallet(self.card)
+        self.assertFalse(Card.objects.filter(pk=self.card.pk).exists())
+        self.assertEqual(list(Transaction.objects.for_user(self.user).values_list('account_id', flat=True)), [self.account.pk])
+        self.assertFalse(MonthlySummary.objects.filter(card=self.card).exists())
+
+        self.assertEqual(purge_archived_wallets(), (1, 1))
+        self.assertFalse(Card.all_objects.filter(pk=self.card.pk).exists())
+        self.assertFalse(Transaction.objects.filter(card=self.card.pk).exists())
+        self.assertFalse(CardStatement.objects.filter(card=self.card.pk).exists())
+        self.assertFalse(MonthlySummary.objects.filter(card=self.card.pk).exists())
+        # O índice de busca acompanha o DELETE direto pelos triggers
+        self.assertEqual(TransactionSearch.objects.count(), 1)
+        # A conta continua intacta
+        self.assertEqual(summary_rows(self.user), [(self.account.pk, None, date(2024, 1, 1), Decimal('0.00'), Decimal('25.00'), 1)])
+        self.assertEqual(purge_archived_wallets(), (0, 0))
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cache')
+
+    def test_entries_expire_at_day_rollover(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return len(builds)
+
+        with mock.patch('ArvyoApp.caching.timezone.localdate', return_value=date(2024, 1, 31)):
+            self.assertEqual(get_or_build('teste', self.user.pk, build), 1)
+            self.assertEqual(get_or_build('teste', self.user.pk, build), 1)
+        # Virada do mês (e do ciclo da fatura) sem nenhuma escrita
+        with mock.patch('ArvyoApp.caching.timezone.localdate', return_value=date(2024, 2, 1)):
+            self.assertEqual(get_or_build('teste', self.user.pk, build), 2)
+
+    def test_rebuild_commands_bump_data_version(self):
+        for command in ('rebuild_monthly_summaries', 'rebuild_card_statements'):
+            with self.subTest(command=command):
+                version = data_version(self.user.pk)
+                with self.captureOnCommitCallbacks(execute=True):
+                    call_command(command, user=self.user.username, stdout=StringIO())
+                self.assertNotEqual(data_version(self.user.pk), version)
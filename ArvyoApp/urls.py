@@ -3,68 +3,78 @@ from ArvyoApp import homeViews
 
 # Remova a linha "from . import views"
 
+
+def page(route, name):
+    # Página de conteúdo fixo servida por `homeViews.static_page`
+    return path(route, homeViews.static_page, {'page': name}, name=name)
+
+
 urlpatterns = [
 
     # Home
     path('', homeViews.index, name='index'),
     path('add-bank', homeViews.addBank, name='addBank'),
     path('add-card', homeViews.addCard, name='addCard'),
-    path('add-new-account', homeViews.addNewAccount, name='addNewAccount'),
-    path('affiliates', homeViews.affiliates, name='affiliates'),
-    path('analytics', homeViews.analytics, name='analytics'),
-    path('analytics-balance', homeViews.analyticsBalance, name='analyticsBalance'),
-    path('analytics-expenses', homeViews.analyticsExpenses,
-         name='analyticsExpenses'),
-    path('analytics-income', homeViews.analyticsIncome, name='analyticsIncome'),
-    path('analytics-income-vs-expenses',
-         homeViews.analyticsIncomeVsExpenses, name='analyticsIncomeVsExpenses'),
-    path('analytics-transaction-history', homeViews.analyticsTransactionHistory,
-         name='analyticsTransactionHistory'),
-    path('bank-add-successful', homeViews.bankAddSuccessful,
-         name='bankAddSuccessful'),
-    path('blank', homeViews.blank, name='blank'),
+    page('add-new-account', 'addNewAccount'),
+    page('affiliates', 'affiliates'),
+    page('analytics', 'analytics'),
+    page('analytics-balance', 'analyticsBalance'),
+    page('analytics-expenses', 'analyticsExpenses'),
+    page('analytics-income', 'analyticsIncome'),
+    page('analytics-income-vs-expenses', 'analyticsIncomeVsExpenses'),
+    page('analytics-transaction-history', 'analyticsTransactionHistory'),
+    page('bank-add-successful', 'bankAddSuccessful'),
+    page('blank', 'blank'),
     path('budgets', homeViews.budgets, name='budgets'),
-    path('chart', homeViews.chart, name='chart'),
-    path('demo', homeViews.demo, name='demo'),
-    path('goals', homeViews.goals, name='goals'),
-    path('id-front-and-back-upload', homeViews.idFrontAndBackUpload,
-         name='idFrontAndBackUpload'),
+    page('chart', 'chart'),
+    page('demo', 'demo'),
+    page('goals', 'goals'),
+    page('id-front-and-back-upload', 'idFrontAndBackUpload'),
     path('index', homeViews.index, name='index'),
-    path('locked', homeViews.locked, name='locked'),
-    path('notifications', homeViews.notifications, name='notifications'),
-    path('otp-code', homeViews.otpCode, name='otpCode'),
-    path('otp-phone', homeViews.otpPhone, name='otpPhone'),
-    path('page-error', homeViews.pageError, name='pageError'),
-    path('privacy', homeViews.privacy, name='privacy'),
-    path('profile', homeViews.profile, name='profile'),
-    path('reset', homeViews.reset, name='reset'),
-    path('settings', homeViews.settings, name='settings'),
-    path('settings-api', homeViews.settingsApi, name='settingsApi'),
+    path('import-statement', homeViews.importStatement, name='importStatement'),
+    page('locked', 'locked'),
+    page('notifications', 'notifications'),
+    page('otp-code', 'otpCode'),
+    page('otp-phone', 'otpPhone'),
+    page('page-error', 'pageError'),
+    page('privacy', 'privacy'),
+    page('profile', 'profile'),
+    page('reset', 'reset'),
+    page('settings', 'settings'),
+    page('settings-api', 'settingsApi'),
     path('settings-bank', homeViews.settingsBank, name='settingsBank'),
-    path('settings-categories', homeViews.settingsCategories,
-         name='settingsCategories'),
-    path('settings-currencies', homeViews.settingsCurrencies,
-         name='settingsCurrencies'),
-    path('settings-general', homeViews.settingsGeneral, name='settingsGeneral'),
-    path('settings-profile', homeViews.settingsProfile, name='settingsProfile'),
-    path('settings-security', homeViews.settingsSecurity, name='settingsSecurity'),
-    path('settings-session', homeViews.settingsSession, name='settingsSession'),
+    page('settings-categories', 'settingsCategories'),
+    page('settings-currencies', 'settingsCurrencies'),
+    page('settings-general', 'settingsGeneral'),
+    page('settings-profile', 'settingsProfile'),
+    page('settings-security', 'settingsSecurity'),
+    page('settings-session', 'settingsSession'),
     path('signin', homeViews.signin, name='signin'),
-    path('signup', homeViews.signup, name='signup'),
-    path('support', homeViews.support, name='support'),
-    path('support-create-ticket', homeViews.supportCreateTicket,
-         name='supportCreateTicket'),
-    path('support-ticket-details', homeViews.supportTicketDetails,
-         name='supportTicketDetails'),
-    path('support-tickets', homeViews.supportTickets, name='supportTickets'),
-    path('verified-id', homeViews.verifiedId, name='verifiedId'),
-    path('verify-email', homeViews.verifyEmail, name='verifyEmail'),
-    path('verify-id', homeViews.verifyId, name='verifyId'),
-    path('verifying-id', homeViews.verifyingId, name='verifyingId'),
+    page('signup', 'signup'),
+    page('support', 'support'),
+    page('support-create-ticket', 'supportCreateTicket'),
+    page('support-ticket-details', 'supportTicketDetails'),
+    page('support-tickets', 'supportTickets'),
+    page('verified-id', 'verifiedId'),
+    page('verify-email', 'verifyEmail'),
+    page('verify-id', 'verifyId'),
+    page('verifying-id', 'verifyingId'),
     path('wallets', homeViews.wallets, name='wallets'),
     path('wallets/<str:wallet_type>/<int:pk>/', homeViews.wallet_detail, name='wallet_detail'),
+    path('wallets/<str:wallet_type>/<int:pk>/transactions/', homeViews.wallet_transactions_page, name='wallet_transactions_page'),
+    path('wallets/<str:wallet_type>/<int:pk>/export/<str:export_format>/', homeViews.export_wallet_transactions, name='exportWalletTransactions'),
+    path('export/<str:export_format>/', homeViews.export_transactions, name='exportTransactions'),
+    path('api/analytics/cashflow', homeViews.analytics_cashflow, name='analyticsCashflowData'),
+    path('api/analytics/categories/<str:transaction_type>', homeViews.analytics_categories, name='analyticsCategoriesData'),
+    path('api/analytics/balance', homeViews.analytics_balance, name='analyticsBalanceData'),
+    path('api/budgets', homeViews.budgets_data, name='budgetsData'),
+    path('api/forecast', homeViews.forecast_data, name='forecastData'),
+    path('api/search', homeViews.search_transactions, name='searchTransactions'),
+    path('metrics', homeViews.requestMetrics, name='requestMetrics'),
     
     # CORRIGIDO: Use 'homeViews' em vez de 'views'
     path('excluir-conta/<int:account_id>/', homeViews.delete_bank_account, name='deleteBankAccount'),
     path('excluir-cartao/<int:card_id>/', homeViews.delete_credit_card, name='deleteCreditCard'),
+    path('cartao/<int:card_id>/pagar-faturas/', homeViews.pay_card_statements, name='payCardStatements'),
+    path('transacoes/categorizar/', homeViews.categorize_transactions, name='categorizeTransactions'),
 ]
\ No newline at end of file
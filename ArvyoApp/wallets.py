@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+from django.db.models import DecimalField, Prefetch, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Account, Card, Transaction
+from .statements import attach_statement_totals
+
+# Quantidade de transações recentes exibidas por carteira na página de carteiras.
+# O histórico completo fica em `wallet_detail`.
+RECENT_TRANSACTIONS_PER_WALLET = 20
+
+
+def _expense_total(user):
+    # Soma condicional das despesas da carteira, calculada pelo banco em um único GROUP BY
+    return Coalesce(
+        Sum(
+            'transaction__amount',
+            filter=Q(transaction__user=user, transaction__transaction_type='expense'),
+        ),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def _recent_transactions(user, limit):
+    # Prefetch fatiado: o Django usa uma window function para trazer só as N
+    # transações mais recentes de cada carteira em uma única consulta
+    queryset = (
+        Transaction.objects.for_user(user)
+        .select_related('category')
+        .newest_first()[:limit]
+    )
+    return Prefetch('transaction_set', queryset=queryset, to_attr='recent_transactions')
+
+
+def accounts_with_totals(user, recent_limit=RECENT_TRANSACTIONS_PER_WALLET):
+    """Contas do usuário anotadas com `total_expense` e `recent_transactions`."""
+    return (
+        Account.objects.filter(user=user)
+        .annotate(total_expense=_expense_total(user))
+        .prefetch_related(_recent_transactions(user, recent_limit))
+        .order_by('id')
+    )
+
+
+def cards_with_totals(user, recent_limit=RECENT_TRANSACTIONS_PER_WALLET):
+    """
+    Cartões do usuário com `recent_transactions` e os totais das faturas
+    (`current_bill`, `next_bill`, `available_limit`, ver `attach_statement_totals`).
+    """
+    cards = (
+        Card.objects.filter(user=user)
+        .prefetch_related(_recent_transactions(user, recent_limit))
+        .order_by('id')
+    )
+    return attach_statement_totals(cards)
+
+
+def get_wallets_context(user, recent_limit=RECENT_TRANSACTIONS_PER_WALLET):
+    """
+    Monta o contexto da página de carteiras com um número fixo de consultas
+    (contas + prefetch, cartões + prefetch + faturas), independente de quantas
+    carteiras o usuário possui.
+    """
+    user_accounts = list(accounts_with_totals(user, recent_limit))
+    # O limite disponível vem das faturas em aberto, não da soma de todo o histórico
+    user_cards = cards_with_totals(user, recent_limit)
+
+    return {
+        'user_accounts': user_accounts,
+        'user_cards': user_cards,
+        'expenses_by_account': {account.id: account.total_expense for account in user_accounts},
+        'transactions_by_account': {account.id: account.recent_transactions for account in user_accounts},
+        'expenses_by_card': {card.id: card.current_bill for card in user_cards},
+        'transactions_by_card': {card.id: card.recent_transactions for card in user_cards},
+    }